@@ -1,17 +1,14 @@
 from crewai import Agent
-from .tools import ott_scrapers
 
-# Contract Researcher Agent
-contract_researcher = Agent(
-    role="OTT Contract Analyst",
-    goal="Analyze OTT platform contracts and identify any breaches.",
-    tools=ott_scrapers,
-    verbose=True
-)
 
-# Legal Expert Agent
-legal_expert = Agent(
-    role="Legal Compliance Checker",
-    goal="Compare extracted contract data with predefined contract terms and flag violations.",
-    verbose=True
-)
+def build_legal_expert():
+    """
+    Legal Expert Agent. A fresh agent per crew, so crews can run in parallel threads.
+
+    :return: Agent
+    """
+    return Agent(
+        role="Legal Compliance Checker",
+        goal="Compare extracted contract data with predefined contract terms and flag violations.",
+        verbose=True
+    )
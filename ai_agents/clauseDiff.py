@@ -0,0 +1,125 @@
+"""
+Clause-level diffing of contract terms against scraped platform terms.
+
+Every contract clause is paired with the platform passages most relevant to
+it, and the pair is fingerprinted. A clause only needs a fresh legal check
+when its fingerprint has no cached verdict, i.e. when the clause text or the
+platform passages it is judged against changed.
+"""
+import hashlib
+import json
+import re
+import os
+from dotenv import load_dotenv
+from ..apiFeatures.search import tokenize
+
+# Load environment variables
+load_dotenv()
+
+# Platform passages compared against each clause
+CLAUSE_PASSAGES = int(os.getenv("CLAUSE_PASSAGES", "3"))
+MAX_PASSAGE_CHARS = 1200
+
+# Bump when the check prompt or verdict format changes, to invalidate cached verdicts
+VERDICT_VERSION = "1"
+
+VERDICTS = {"compliant", "breach", "unclear"}
+
+
+def clause_key(term: dict):
+    """Normalized text of one contract clause"""
+    clause = " ".join(str(term.get("clause") or "").split())
+    description = " ".join(str(term.get("description") or "").split())
+    return f"{clause}: {description}".strip(": ")
+
+
+def split_passages(snapshots):
+    """
+    Splits platform page text into passages
+
+    :param snapshots: Dict of platform name -> PageSnapshot
+    :return: List of (platform, position, text, token set)
+    """
+    passages = []
+    for platform in sorted(snapshots):
+        for position, line in enumerate(snapshots[platform].text.split("\n")):
+            tokens = set(tokenize(line))
+            if tokens:
+                passages.append((platform, position, line[:MAX_PASSAGE_CHARS], tokens))
+    return passages
+
+
+def relevant_passages(term: dict, passages, limit: int = CLAUSE_PASSAGES):
+    """
+    Picks the passages sharing the most words with a clause
+
+    :return: List of {"platform", "text"} in page order
+    """
+    clause_tokens = set(tokenize(clause_key(term)))
+    scored = [(len(clause_tokens & tokens), platform, position, text)
+              for platform, position, text, tokens in passages]
+    best = sorted((item for item in scored if item[0] > 0), key=lambda item: (-item[0], item[1], item[2]))[:limit]
+    return [{"platform": platform, "text": text} for _, platform, _, text in sorted(best, key=lambda item: (item[1], item[2]))]
+
+
+def fingerprint(term: dict, passages):
+    """
+    Fingerprint of everything a clause verdict depends on
+
+    :param term: Contract clause
+    :param passages: Relevant platform passages
+    :return: Hex digest
+    """
+    payload = json.dumps([VERDICT_VERSION, clause_key(term), passages], sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def plan_clause_checks(terms, snapshots):
+    """
+    Pairs each clause with its passages and fingerprint
+
+    :param terms: Contract terms
+    :param snapshots: Dict of platform name -> PageSnapshot
+    :return: List of {"index", "clause", "description", "passages", "fingerprint"}
+    """
+    passages = split_passages(snapshots)
+    plan = []
+    for index, term in enumerate(terms or []):
+        if not clause_key(term):
+            continue
+        clause_passages = relevant_passages(term, passages)
+        plan.append({
+            "index": index,
+            "clause": term.get("clause"),
+            "description": term.get("description"),
+            "passages": clause_passages,
+            "fingerprint": fingerprint(term, clause_passages)
+        })
+    return plan
+
+
+def parse_verdicts(output: str, items):
+    """
+    Reads the legal expert's JSON verdicts
+
+    :param output: Crew output text
+    :param items: Clause check items that were sent, in order
+    :return: Dict of clause index -> {"verdict", "reason"}; clauses without a usable verdict are omitted
+    """
+    match = re.search(r"\[.*\]", output or "", re.DOTALL)
+    if not match:
+        return {}
+    try:
+        rows = json.loads(match.group(0))
+    except json.JSONDecodeError:
+        return {}
+
+    sent = {item["index"] for item in items}
+    verdicts = {}
+    for row in rows if isinstance(rows, list) else []:
+        if not isinstance(row, dict):
+            continue
+        verdict = str(row.get("verdict") or "").lower()
+        if row.get("index") in sent and verdict in VERDICTS:
+            verdicts[row["index"]] = {"verdict": verdict, "reason": str(row.get("reason") or "")}
+    return verdicts
@@ -1,16 +1,30 @@
 from crewai import Crew, Process
-from agents import contract_researcher, legal_expert
-from tasks import contract_scrape_task, contract_check_task
+from .agents import build_legal_expert
+from .tasks import build_clause_check_task
 
-# Define the Crew
-crew = Crew(
-    agents=[contract_researcher, legal_expert],
-    tasks=[contract_scrape_task, contract_check_task],
-    process=Process.sequential,
-    memory=True,
-    cache=True
-)
 
-# Start execution
-result = crew.kickoff()
-print(result)
+def build_clause_check_crew(items):
+    """
+    Builds a crew that checks a set of clauses against their platform passages.
+    Items may come from different contracts; each is judged on its own.
+
+    :param items: Clause check items from clauseDiff.plan_clause_checks
+    :return: Crew ready to kick off
+    """
+    legal_expert = build_legal_expert()
+    return Crew(
+        agents=[legal_expert],
+        tasks=[build_clause_check_task(legal_expert, items)],
+        process=Process.sequential,
+        cache=True
+    )
+
+
+def run_clause_check_crew(items):
+    """
+    Runs the legal expert over a set of changed clauses. Blocking; call it from a worker thread.
+
+    :param items: Clause check items from clauseDiff.plan_clause_checks
+    :return: Crew output as text (a JSON array of verdicts)
+    """
+    return str(build_clause_check_crew(items).kickoff())
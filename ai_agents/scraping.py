@@ -0,0 +1,310 @@
+"""
+Cached, conditional fetching of OTT platform terms-of-use pages.
+
+Each fetch sends the validators (ETag / Last-Modified) from the previous
+response, so unchanged pages cost a 304. Page text is stored as numbered
+snapshots per platform; a new snapshot is only written when the text
+actually changed, so callers can compare snapshot hashes to decide whether
+a platform's terms need to be re-analyzed.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, asdict
+from datetime import datetime, timezone
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Optional
+import threading
+import asyncio
+import hashlib
+import json
+import re
+import os
+import requests
+from dotenv import load_dotenv
+from ..services.outboundGovernor import get_governor
+from ..utils.logger import get_logger
+
+# Load environment variables
+load_dotenv()
+
+logger = get_logger("scraping")
+
+# name -> terms-of-use URL; override with SCRAPER_PLATFORMS="netflix=http://...,prime=http://..."
+DEFAULT_PLATFORMS = {
+    "netflix": "https://help.netflix.com/legal/termsofuse",
+    "prime": "https://www.primevideo.com/help?nodeId=202095490",
+    "hotstar": "https://www.hotstar.com/in/terms-of-use"
+}
+
+SCRAPE_CACHE_DIR = Path(os.getenv("SCRAPE_CACHE_DIR", "scrape_cache"))
+SCRAPER_TIMEOUT = float(os.getenv("SCRAPER_TIMEOUT", "20"))
+SCRAPER_FETCH_CONCURRENCY = int(os.getenv("SCRAPER_FETCH_CONCURRENCY", "4"))
+SCRAPER_USER_AGENT = os.getenv("SCRAPER_USER_AGENT", "SentientRolodex/1.0 (+terms monitoring)")
+
+# Per-site outbound limits
+SCRAPER_REQUESTS_PER_MINUTE = float(os.getenv("SCRAPER_REQUESTS_PER_MINUTE", "30"))
+SCRAPER_MAX_IN_FLIGHT = int(os.getenv("SCRAPER_MAX_IN_FLIGHT", "2"))
+
+
+def load_platforms():
+    """
+    Reads the platform registry from SCRAPER_PLATFORMS, falling back to the defaults
+
+    :return: Dict of platform name -> URL
+    """
+    configured = os.getenv("SCRAPER_PLATFORMS")
+    if not configured:
+        return dict(DEFAULT_PLATFORMS)
+    platforms = {}
+    for entry in configured.split(","):
+        name, _, url = entry.partition("=")
+        if name.strip() and url.strip():
+            platforms[name.strip().lower()] = url.strip()
+    return platforms
+
+
+PLATFORMS = load_platforms()
+
+
+@dataclass
+class PageSnapshot:
+    """One stored version of a platform's terms page"""
+    platform: str
+    url: str
+    version: int
+    content_hash: str
+    fetched_at: str
+    changed: bool = False
+    from_cache: bool = False
+    text: str = ""
+
+
+class _TextExtractor(HTMLParser):
+    """Collects visible text, skipping script/style/navigation chrome"""
+    SKIP = {"script", "style", "noscript", "template", "svg", "head", "nav", "footer"}
+    BLOCK = {"p", "div", "li", "br", "h1", "h2", "h3", "h4", "h5", "h6", "section", "article", "tr"}
+
+    def __init__(self):
+        super().__init__()
+        self.parts = []
+        self._skipping = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIP:
+            self._skipping += 1
+        elif tag in self.BLOCK:
+            self.parts.append("\n")
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIP and self._skipping:
+            self._skipping -= 1
+        elif tag in self.BLOCK:
+            self.parts.append("\n")
+
+    def handle_data(self, data):
+        if not self._skipping:
+            self.parts.append(data)
+
+
+def html_to_text(html: str):
+    """
+    Converts a page to normalized plain text, so markup-only changes don't count as changes
+
+    :param html: Page HTML
+    :return: Text with collapsed whitespace, one block per line
+    """
+    parser = _TextExtractor()
+    parser.feed(html)
+    lines = (re.sub(r"[ \t\r\f\v]+", " ", line).strip() for line in "".join(parser.parts).split("\n"))
+    return "\n".join(line for line in lines if line)
+
+
+class ScrapeCache:
+    """
+    On-disk HTTP cache and snapshot store:
+
+        <dir>/<platform>/meta.json        validators and latest version
+        <dir>/<platform>/v0001.txt ...     page text, one file per version
+    """
+
+    def __init__(self, directory: Path = SCRAPE_CACHE_DIR):
+        self.directory = Path(directory)
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+
+    def lock(self, platform: str):
+        with self._locks_guard:
+            return self._locks.setdefault(platform, threading.Lock())
+
+    def _dir(self, platform: str):
+        return self.directory / platform
+
+    def meta(self, platform: str):
+        try:
+            with open(self._dir(platform) / "meta.json") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _write_meta(self, platform: str, meta: dict):
+        path = self._dir(platform) / "meta.json"
+        with open(path.with_suffix(".tmp"), "w") as f:
+            json.dump(meta, f)
+        os.replace(path.with_suffix(".tmp"), path)
+
+    def read_snapshot(self, platform: str, version: int):
+        with open(self._dir(platform) / f"v{version:04d}.txt") as f:
+            return f.read()
+
+    def latest(self, platform: str, with_text: bool = True):
+        """
+        :return: The newest PageSnapshot for a platform, or None if it was never fetched
+        """
+        meta = self.meta(platform)
+        if not meta.get("version"):
+            return None
+        return PageSnapshot(
+            platform=platform,
+            url=meta["url"],
+            version=meta["version"],
+            content_hash=meta["content_hash"],
+            fetched_at=meta["fetched_at"],
+            from_cache=True,
+            text=self.read_snapshot(platform, meta["version"]) if with_text else ""
+        )
+
+    def record(self, platform: str, url: str, text: str, headers):
+        """
+        Stores a freshly downloaded page, adding a snapshot only if its text changed
+
+        :return: PageSnapshot
+        """
+        directory = self._dir(platform)
+        directory.mkdir(parents=True, exist_ok=True)
+        meta = self.meta(platform)
+        content_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        changed = content_hash != meta.get("content_hash")
+        version = meta.get("version", 0) + (1 if changed else 0)
+        if changed:
+            snapshot_path = directory / f"v{version:04d}.txt"
+            with open(snapshot_path.with_suffix(".tmp"), "w") as f:
+                f.write(text)
+            os.replace(snapshot_path.with_suffix(".tmp"), snapshot_path)
+
+        fetched_at = datetime.now(timezone.utc).isoformat()
+        self._write_meta(platform, {
+            "url": url,
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "version": version,
+            "content_hash": content_hash,
+            "fetched_at": fetched_at,
+            "changed_at": fetched_at if changed else meta.get("changed_at")
+        })
+        return PageSnapshot(platform, url, version, content_hash, fetched_at, changed=changed, text=text)
+
+    def touch(self, platform: str):
+        """Records a 304: the stored snapshot is still current"""
+        meta = self.meta(platform)
+        meta["fetched_at"] = datetime.now(timezone.utc).isoformat()
+        self._write_meta(platform, meta)
+
+
+scrape_cache = ScrapeCache()
+
+
+def _governor(platform: str):
+    return get_governor(
+        f"scraper:{platform}",
+        requests_per_minute=SCRAPER_REQUESTS_PER_MINUTE,
+        max_in_flight=SCRAPER_MAX_IN_FLIGHT
+    )
+
+
+def fetch_platform(platform: str, session: Optional[requests.Session] = None, cache: ScrapeCache = scrape_cache):
+    """
+    Fetches a platform's terms page with a conditional GET
+
+    :param platform: Platform name from the registry
+    :param session: Optional requests session to reuse connections
+    :param cache: Snapshot store
+    :return: PageSnapshot; changed is True only when the text differs from the previous version
+    :raises: KeyError for unknown platforms, requests.HTTPError for failed fetches
+    """
+    platform = platform.strip().lower()
+    url = PLATFORMS[platform]
+    http = session or requests
+
+    # One fetch per platform at a time, so concurrent callers share the result on disk
+    with cache.lock(platform):
+        meta = cache.meta(platform)
+        headers = {"User-Agent": SCRAPER_USER_AGENT}
+        if meta.get("version") and meta.get("url") == url:
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+
+        def get():
+            response = http.get(url, headers=headers, timeout=SCRAPER_TIMEOUT)
+            if response.status_code != 304:
+                response.raise_for_status()
+            return response
+
+        response = _governor(platform).call_sync(get)
+        if response.status_code == 304:
+            cache.touch(platform)
+            return cache.latest(platform)
+        return cache.record(platform, url, html_to_text(response.text), response.headers)
+
+
+def fetch_platforms(platforms=None, cache: ScrapeCache = scrape_cache):
+    """
+    Fetches several platforms concurrently. A platform whose fetch fails falls
+    back to its last snapshot when there is one.
+
+    :param platforms: Platform names (default: every registered platform)
+    :return: Dict of platform name -> PageSnapshot (platforms with no snapshot at all are omitted)
+    """
+    names = [name.strip().lower() for name in (platforms or PLATFORMS) if name.strip().lower() in PLATFORMS]
+    if not names:
+        return {}
+
+    snapshots = {}
+    with requests.Session() as session, \
+            ThreadPoolExecutor(max_workers=min(SCRAPER_FETCH_CONCURRENCY, len(names))) as pool:
+        futures = {name: pool.submit(fetch_platform, name, session, cache) for name in names}
+        for name, future in futures.items():
+            try:
+                snapshots[name] = future.result()
+            except Exception as e:
+                logger.warning("Scrape failed", extra={"platform": name, "error": str(e)})
+                stale = cache.latest(name)
+                if stale is not None:
+                    snapshots[name] = stale
+    return snapshots
+
+
+async def fetch_platforms_async(platforms=None):
+    """Event-loop friendly fetch_platforms"""
+    return await asyncio.to_thread(fetch_platforms, platforms)
+
+
+def platforms_for(platform_value: Optional[str]):
+    """
+    Maps a contract's free-form plartform value (e.g. "Netflix" or
+    "www.hotstar.com") to registered platform names
+
+    :return: Matching platform names, or every platform when nothing matches
+    """
+    value = (platform_value or "").lower()
+    matches = [name for name, url in PLATFORMS.items()
+               if name in value or (value and value.removeprefix("www.") in url.lower())]
+    return matches or list(PLATFORMS)
+
+
+def snapshot_summary(snapshot: PageSnapshot):
+    """Snapshot metadata without the page text"""
+    summary = asdict(snapshot)
+    summary.pop("text")
+    return summary
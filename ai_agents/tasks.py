@@ -1,28 +1,24 @@
+import json
 from crewai import Task
-from agents import contract_researcher, legal_expert
-from tools import ott_scrapers
 
-# Task to extract contract information
-contract_scrape_task = Task(
-    description="Scrape OTT platforms (Netflix, Prime, Hotstar) to extract contract agreement terms.",
-    expected_output="Raw contract text from OTT platforms.",
-    tools=ott_scrapers,
-    agent=contract_researcher
-)
 
-# Task to check for contract breaches
-contract_check_task = Task(
-    description="""Analyze contract agreements and check for breaches based on following
-     "terms": [
-                {
-                    "clause": "Payment Terms",
-                    "description": "Payment must be made within 30 days of invoice."
-                },
-                {
-                    "clause": "Confidentiality",
-                    "description": "Both parties agree to keep all shared information confidential."
-                }
-            ] """,
-    expected_output="A report highlighting any contract violations.",
-    agent=legal_expert
-)
+def build_clause_check_task(agent, items):
+    """
+    Task to check only the clauses whose inputs changed
+
+    :param agent: Legal expert agent
+    :param items: Clause check items ({"index", "clause", "description", "passages"})
+    :return: Check task for the legal expert
+    """
+    clauses = json.dumps(
+        [{key: item[key] for key in ("index", "clause", "description", "passages")} for item in items],
+        indent=2
+    )
+    return Task(
+        description=f"""For each contract clause below, decide whether the quoted OTT platform
+terms of use breach it. Judge each clause only against its own passages.
+Clauses: {clauses}""",
+        expected_output='A JSON array with one object per clause: '
+                        '{"index": <clause index>, "verdict": "compliant" | "breach" | "unclear", "reason": "<one sentence>"}',
+        agent=agent
+    )
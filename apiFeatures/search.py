@@ -1,35 +1,185 @@
-from motor.motor_asyncio import AsyncIOMotorClient
-import os
-from dotenv import load_dotenv
+import re
+from ..config.database import get_database, get_contract_spaces_collection, get_contracts_collection
+from ..utils.logger import get_logger
 
-# Load environment variables
-load_dotenv()
+logger = get_logger("search")
 
-# MongoDB connection setup
-MONGO_URI = os.getenv("DATABASE_URI")
-client = AsyncIOMotorClient(MONGO_URI)
-db = client["hackathon"]
-contract_spaces_collection = db["contract_spaces"]
+# Tokens shorter than this are not indexed or searched
+MIN_TOKEN_LENGTH = 2
 
-async def search_contract_spaces(keyword: str):
+# Prefixes are indexed up to this length; longer query tokens are truncated to match
+MAX_PREFIX_LENGTH = 15
+
+MAX_QUERY_TOKENS = 8
+MAX_PAGE_SIZE = 100
+
+# Relevance weight of an exact token match per field
+FIELD_WEIGHTS = {
+    "name": 5,
+    "title": 5,
+    "parties": 3,
+    "clauses": 1
+}
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def _collection():
+    return get_database()["search_index"]
+
+
+def tokenize(text: str):
+    """
+    Splits text into lowercase alphanumeric tokens
+
+    :param text: Text to tokenize
+    :return: List of unique tokens in order of appearance
+    """
+    if not text:
+        return []
+    tokens = TOKEN_PATTERN.findall(str(text).lower())
+    return list(dict.fromkeys(token for token in tokens if len(token) >= MIN_TOKEN_LENGTH))
+
+
+def _prefixes(tokens):
+    prefixes = set()
+    for token in tokens:
+        for length in range(MIN_TOKEN_LENGTH, min(len(token), MAX_PREFIX_LENGTH) + 1):
+            prefixes.add(token[:length])
+    return sorted(prefixes)
+
+
+def _entry(fields: dict, display: dict):
+    """Builds the indexed fields of a search entry from field name -> text"""
+    field_tokens = {name: tokenize(text) for name, text in fields.items()}
+    tokens = list(dict.fromkeys(token for values in field_tokens.values() for token in values))
+    return {
+        "display": display,
+        "fields": field_tokens,
+        "tokens": tokens,
+        "prefixes": _prefixes(tokens)
+    }
+
+
+async def index_contract_space(space: dict):
+    """
+    Adds or refreshes a contract space in the search index
+
+    :param space: Contract space document
+    """
+    space_id = str(space["_id"])
+    entry = _entry({"name": space.get("name", "")}, {"name": space.get("name", "")})
+    await _collection().update_one(
+        {"_id": f"space:{space_id}"},
+        {"$set": {**entry, "kind": "space", "ref_id": space_id, "space_ids": [space_id]}},
+        upsert=True
+    )
+
+
+async def index_contract(contract: dict, space_ids=None):
     """
-    Searches for contract spaces where the keyword matches either the name or contracts.
-    
-    :param keyword: The search term to match contract space names or contracts.
-    :return: List of matching contract spaces.
+    Adds or refreshes a contract in the search index
+
+    :param contract: Contract document
+    :param space_ids: Contract spaces the contract belongs to (added to those already indexed)
     """
+    contract_id = str(contract["_id"])
+    terms = contract.get("terms") or []
+    entry = _entry(
+        {
+            "title": contract.get("title") or "",
+            "parties": " ".join(contract.get("parties") or []),
+            "clauses": " ".join(f"{term.get('clause', '')} {term.get('description', '')}" for term in terms)
+        },
+        {
+            "title": contract.get("title"),
+            "parties": contract.get("parties") or [],
+            "status": contract.get("status"),
+            "platform": contract.get("plartform")
+        }
+    )
+    await _collection().update_one(
+        {"_id": f"contract:{contract_id}"},
+        {
+            "$set": {**entry, "kind": "contract", "ref_id": contract_id},
+            "$addToSet": {"space_ids": {"$each": [str(space_id) for space_id in space_ids or []]}}
+        },
+        upsert=True
+    )
+
+
+async def link_contract_space(contract_id: str, space_id: str):
+    """Records that an already indexed contract now also belongs to a space"""
+    await _collection().update_one(
+        {"_id": f"contract:{contract_id}"},
+        {"$addToSet": {"space_ids": str(space_id)}}
+    )
+
+
+async def remove_contract(contract_id: str):
+    """Removes a deleted contract from the search index"""
+    await _collection().delete_one({"_id": f"contract:{contract_id}"})
+
+
+async def rebuild_search_index():
+    """
+    Re-indexes every contract space and contract from scratch
+
+    :return: Number of entries indexed
+    """
+    count = 0
+    contract_spaces = {}
+    async for space in get_contract_spaces_collection().find({}, {"name": 1, "contracts": 1}):
+        await index_contract_space(space)
+        count += 1
+        for contract_id in space.get("contracts", []):
+            contract_spaces.setdefault(str(contract_id), []).append(str(space["_id"]))
+
+    async for contract in get_contracts_collection().find({}):
+        await index_contract(contract, contract_spaces.get(str(contract["_id"]), []))
+        count += 1
+    return count
+
+
+async def search_contract_spaces(keyword: str, space_ids=None, page: int = 1, page_size: int = 10):
+    """
+    Ranked prefix search over contract space names, contract titles, parties and clause text.
+
+    :param keyword: The search terms; each term matches words it is a prefix of.
+    :param space_ids: Restrict results to these contract spaces (None searches everything).
+    :param page: 1-based page number.
+    :param page_size: Results per page.
+    :return: List of matching contract spaces and contracts, best match first.
+    """
+    tokens = tokenize(keyword)[:MAX_QUERY_TOKENS]
+    if not tokens:
+        return []
+
+    page = max(page, 1)
+    page_size = max(1, min(page_size, MAX_PAGE_SIZE))
+
+    match = {"prefixes": {"$all": [token[:MAX_PREFIX_LENGTH] for token in tokens]}}
+    if space_ids is not None:
+        match["space_ids"] = {"$in": [str(space_id) for space_id in space_ids]}
+
+    # Exact word matches score by field weight; prefix-only matches just qualify
+    score = {"$add": [
+        {"$multiply": [weight, {"$size": {"$setIntersection": [{"$ifNull": [f"$fields.{field}", []]}, tokens]}}]}
+        for field, weight in FIELD_WEIGHTS.items()
+    ]}
+
     try:
-        search_results = await contract_spaces_collection.find(
-            {
-                "$or": [
-                    {"name": {"$regex": keyword, "$options": "i"}},  # Case-insensitive search in name
-                    {"contracts": {"$regex": keyword, "$options": "i"}}  # Case-insensitive search in contracts list
-                ]
-            }
-        ).to_list(length=10)  # Limit results to 10
-        
+        search_results = await _collection().aggregate([
+            {"$match": match},
+            {"$addFields": {"score": score}},
+            {"$sort": {"score": -1, "_id": 1}},
+            {"$skip": (page - 1) * page_size},
+            {"$limit": page_size},
+            {"$project": {"_id": 0, "kind": 1, "ref_id": 1, "space_ids": 1, "display": 1, "score": 1}}
+        ]).to_list(length=page_size)
+
         return search_results
     except Exception as e:
         # Log the error and return empty list
-        print(f"Search error: {str(e)}")
-        return []
\ No newline at end of file
+        logger.error("Search failed", extra={"error": str(e)})
+        return []
@@ -0,0 +1,315 @@
+from pathlib import Path
+from contextlib import contextmanager
+import threading
+import asyncio
+import fcntl
+import json
+import os
+import numpy as np
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# CPU-runnable sentence embedding model
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "64"))
+
+# Where the clause index segments are persisted
+VECTOR_INDEX_DIR = Path(os.getenv("VECTOR_INDEX_DIR", "vector_index"))
+
+# Full compaction once this many contracts were replaced or removed and they make up half the rows
+INDEX_COMPACT_TOMBSTONES = int(os.getenv("VECTOR_INDEX_COMPACT_TOMBSTONES", "1000"))
+
+# Safety cap on segments; the merge policy normally keeps them logarithmic in the index size
+INDEX_MAX_SEGMENTS = int(os.getenv("VECTOR_INDEX_MAX_SEGMENTS", "64"))
+
+MAX_TOP_K = 50
+
+
+def clause_text(term: dict):
+    """Text embedded for one contract clause"""
+    return f"{term.get('clause', '')}: {term.get('description', '')}".strip(": ")
+
+
+class _Rows:
+    """
+    Clause rows built by applying segments in order. A segment first
+    tombstones its `removed` contracts in the rows before it, then appends its own rows.
+    """
+
+    def __init__(self):
+        self.vectors = None
+        self.contract_ids = np.array([], dtype=object)
+        self.clauses = np.array([], dtype=object)
+        self.descriptions = np.array([], dtype=object)
+        self.alive = np.array([], dtype=bool)
+        self.offsets = []  # Row where each applied segment starts
+
+    def apply(self, segment: dict):
+        if len(segment["removed"]) and len(self.contract_ids):
+            self.alive &= ~np.isin(self.contract_ids, segment["removed"])
+        self.offsets.append(len(self.contract_ids))
+        if not len(segment["contract_ids"]):
+            return
+        vectors = segment["vectors"]
+        self.vectors = vectors if self.vectors is None or not len(self.vectors) else np.vstack([self.vectors, vectors])
+        self.contract_ids = np.concatenate([self.contract_ids, segment["contract_ids"]])
+        self.clauses = np.concatenate([self.clauses, segment["clauses"]])
+        self.descriptions = np.concatenate([self.descriptions, segment["descriptions"]])
+        self.alive = np.concatenate([self.alive, np.ones(len(segment["contract_ids"]), dtype=bool)])
+
+    def truncate(self, segments: int):
+        """Drops the rows of every segment from the given position on"""
+        if segments >= len(self.offsets):
+            return
+        cut = self.offsets[segments]
+        self.vectors = self.vectors[:cut] if self.vectors is not None else None
+        self.contract_ids = self.contract_ids[:cut]
+        self.clauses = self.clauses[:cut]
+        self.descriptions = self.descriptions[:cut]
+        self.alive = self.alive[:cut]
+        self.offsets = self.offsets[:segments]
+
+    def live_segment(self, removed):
+        """The surviving rows as one segment carrying the given tombstones"""
+        keep = self.alive
+        return {
+            "vectors": self.vectors[keep] if self.vectors is not None and len(self.vectors) else np.zeros((0, 0), np.float32),
+            "contract_ids": self.contract_ids[keep],
+            "clauses": self.clauses[keep],
+            "descriptions": self.descriptions[keep],
+            "removed": np.array(sorted(removed), dtype=object)
+        }
+
+
+class ClauseVectorIndex:
+    """
+    Flat inner-product index over L2-normalised clause embeddings, persisted
+    as append-only segments (one .npz per write) listed in manifest.json.
+
+    Writes append a segment under an exclusive file lock, merging small
+    trailing segments so their number stays logarithmic, and compact
+    everything once replaced or removed contracts make up half the index.
+    Readers load only the segments they haven't seen, under a shared lock,
+    so several worker processes can share one index directory.
+    """
+
+    def __init__(self, directory: Path = VECTOR_INDEX_DIR):
+        self.directory = Path(directory)
+        self.manifest_path = self.directory / "manifest.json"
+        self.lock_path = self.directory / "index.lock"
+        self._rows = _Rows()
+        self._segments = []  # Names of the segments applied to _rows
+        self._loaded_mtime = None
+        self._embeddings = None
+        self._lock = threading.Lock()
+
+    def _model(self):
+        if self._embeddings is None:
+            # langchain_huggingface pulls in torch and transformers; load them only when embedding
+            from langchain_huggingface import HuggingFaceEmbeddings
+            self._embeddings = HuggingFaceEmbeddings(
+                model_name=EMBEDDING_MODEL,
+                model_kwargs={"device": "cpu"},
+                encode_kwargs={"batch_size": EMBEDDING_BATCH_SIZE, "normalize_embeddings": False}
+            )
+        return self._embeddings
+
+    def embed(self, texts):
+        """
+        Embeds texts in batches and L2-normalises them
+
+        :param texts: List of strings
+        :return: float32 matrix of shape (len(texts), dim)
+        """
+        matrix = np.asarray(self._model().embed_documents(list(texts)), dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.maximum(norms, 1e-12)
+
+    # Files
+    @contextmanager
+    def _file_lock(self, mode):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(self.lock_path, "w") as lock_file:
+            fcntl.flock(lock_file, mode)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _mtime(self):
+        # Every write replaces the manifest with a new file, so the inode changes even within one mtime tick
+        try:
+            stat = self.manifest_path.stat()
+            return stat.st_ino, stat.st_mtime_ns, stat.st_size
+        except FileNotFoundError:
+            return None
+
+    def _read_manifest(self):
+        try:
+            with open(self.manifest_path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {"segments": [], "next_id": 1, "tombstones": 0}
+
+    def _write_manifest(self, manifest: dict):
+        # Write then rename: the manifest switch is what makes a write visible
+        with open(self.manifest_path.with_suffix(".tmp"), "w") as f:
+            json.dump(manifest, f)
+        os.replace(self.manifest_path.with_suffix(".tmp"), self.manifest_path)
+
+    def _read_segment(self, name: str):
+        with np.load(self.directory / name, allow_pickle=False) as data:
+            return {
+                "vectors": data["vectors"],
+                "contract_ids": data["contract_ids"].astype(object),
+                "clauses": data["clauses"].astype(object),
+                "descriptions": data["descriptions"].astype(object),
+                "removed": data["removed"].astype(object)
+            }
+
+    def _write_segment(self, manifest: dict, segment: dict):
+        """Writes a new segment file and returns its manifest entry"""
+        name = f"seg-{manifest['next_id']:08d}.npz"
+        manifest["next_id"] += 1
+        path = self.directory / name
+        with open(path.with_suffix(".tmp"), "wb") as f:
+            np.savez(f, **{key: value.astype(str) if value.dtype == object else value
+                           for key, value in segment.items()})
+        os.replace(path.with_suffix(".tmp"), path)
+        return {"name": name, "rows": len(segment["contract_ids"]), "removed": len(segment["removed"])}
+
+    # Reading
+    def _refresh(self):
+        """Applies segments written since the last refresh (call with self._lock held)"""
+        mtime = self._mtime()
+        if mtime == self._loaded_mtime:
+            return
+        with self._file_lock(fcntl.LOCK_SH):
+            manifest = self._read_manifest()
+            names = [entry["name"] for entry in manifest["segments"]]
+            # Segments merged away since the last refresh are replaced by their merge, which carries their tombstones
+            common = 0
+            while common < min(len(names), len(self._segments)) and names[common] == self._segments[common]:
+                common += 1
+            self._rows.truncate(common)
+            for name in names[common:]:
+                self._rows.apply(self._read_segment(name))
+            self._segments = names
+            self._loaded_mtime = self._mtime()
+
+    # Writing
+    def _append(self, segment: dict):
+        """Appends a segment, then merges trailing segments or compacts as needed"""
+        with self._file_lock(fcntl.LOCK_EX):
+            manifest = self._read_manifest()
+            manifest["segments"].append(self._write_segment(manifest, segment))
+            manifest["tombstones"] += len(segment["removed"])
+
+            entries = manifest["segments"]
+            rows = sum(entry["rows"] for entry in entries)
+            if len(entries) > INDEX_MAX_SEGMENTS or \
+                    (manifest["tombstones"] > INDEX_COMPACT_TOMBSTONES and manifest["tombstones"] * 2 > rows):
+                merge = len(entries)
+            else:
+                # Merge the tail while it is at least as large as the segment before it
+                merge, size = 1, entries[-1]["rows"]
+                while merge < len(entries) and size >= entries[-merge - 1]["rows"]:
+                    size += entries[-merge - 1]["rows"]
+                    merge += 1
+
+            obsolete = []
+            if merge > 1:
+                merged = _Rows()
+                removed = set()
+                for entry in entries[-merge:]:
+                    part = self._read_segment(entry["name"])
+                    merged.apply(part)
+                    removed.update(part["removed"])
+                if merge == len(entries):
+                    # Nothing before the merge for tombstones to apply to
+                    removed = set()
+                    manifest["tombstones"] = 0
+                obsolete = [entry["name"] for entry in entries[-merge:]]
+                manifest["segments"] = entries[:-merge] + [self._write_segment(manifest, merged.live_segment(removed))]
+
+            self._write_manifest(manifest)
+            # Safe under the exclusive lock: readers only open segment files while holding the shared lock
+            for name in obsolete:
+                (self.directory / name).unlink(missing_ok=True)
+
+    def add_contracts(self, contracts):
+        """
+        Embeds and indexes several contracts' clauses with one embedding call
+        and one appended segment, replacing any previous ones
+
+        :param contracts: List of (contract ID, terms) pairs
+        :return: Number of clauses indexed
+        """
+        # The last entry wins when a contract is listed twice
+        latest = {str(contract_id): terms for contract_id, terms in contracts}
+        rows = [(contract_id, term) for contract_id, terms in latest.items() for term in terms or [] if clause_text(term)]
+        contract_ids = set(latest)
+        if not contract_ids:
+            return 0
+        self._append({
+            "vectors": self.embed([clause_text(term) for _, term in rows]) if rows else np.zeros((0, 0), np.float32),
+            "contract_ids": np.array([contract_id for contract_id, _ in rows], dtype=object),
+            "clauses": np.array([str(term.get("clause") or "") for _, term in rows], dtype=object),
+            "descriptions": np.array([str(term.get("description") or "") for _, term in rows], dtype=object),
+            "removed": np.array(sorted(contract_ids), dtype=object)
+        })
+        return len(rows)
+
+    def remove_contract(self, contract_id: str):
+        """Removes a contract's clauses from the index"""
+        self._append({
+            "vectors": np.zeros((0, 0), np.float32),
+            "contract_ids": np.array([], dtype=object),
+            "clauses": np.array([], dtype=object),
+            "descriptions": np.array([], dtype=object),
+            "removed": np.array([str(contract_id)], dtype=object)
+        })
+
+    def search(self, query: str, contract_ids, k: int = 10):
+        """
+        Finds the clauses most similar to the query
+
+        :param query: Natural-language query
+        :param contract_ids: Only clauses of these contracts are considered
+        :param k: Number of results
+        :return: List of clause dicts with a cosine similarity score, best first
+        """
+        with self._lock:
+            self._refresh()
+            rows = self._rows
+            vectors, owners, alive = rows.vectors, rows.contract_ids, rows.alive
+            clauses, descriptions = rows.clauses, rows.descriptions
+        if vectors is None or not len(vectors) or not contract_ids:
+            return []
+
+        candidates = np.flatnonzero(alive & np.isin(owners, np.array([str(i) for i in contract_ids], dtype=object)))
+        if not len(candidates):
+            return []
+
+        query_vector = self.embed([query])[0]
+        scores = vectors[candidates] @ query_vector
+        k = min(k, len(candidates))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [{"contract_id": owners[candidates[i]], "clause": clauses[candidates[i]],
+                 "description": descriptions[candidates[i]], "score": float(scores[i])} for i in top]
+
+    # Async wrappers keep embedding and disk I/O off the event loop
+    async def add_contracts_async(self, contracts):
+        return await asyncio.to_thread(self.add_contracts, contracts)
+
+    async def remove_contract_async(self, contract_id: str):
+        return await asyncio.to_thread(self.remove_contract, contract_id)
+
+    async def search_async(self, query: str, contract_ids, k: int = 10):
+        return await asyncio.to_thread(self.search, query, contract_ids, max(1, min(k, MAX_TOP_K)))
+
+
+clause_index = ClauseVectorIndex()
@@ -0,0 +1,133 @@
+"""
+Fixture contract PDFs for benchmarks, generated without any PDF library.
+
+Each PDF is a single-font text document laid out like the contracts the
+fake LLM backend understands (title, "between X and Y", ISO dates,
+"Clause: description" lines, a platform domain). Varying the index
+varies the parties and clause text, so every fixture has a distinct
+content hash and misses the extraction cache.
+
+Write a set to disk (run from the directory containing the package):
+
+    python -m <package>.benchmarks.fixturePdfs --count 20 --out fixtures
+"""
+from pathlib import Path
+import argparse
+
+PARTIES = ["Acme Media", "Globex Studios", "Initech Pictures", "Umbrella Streaming", "Stark Broadcasting",
+           "Wayne Entertainment", "Hooli Video", "Vandelay Films"]
+PLATFORMS = ["www.netflix.com", "www.primevideo.com", "www.hotstar.com"]
+CLAUSES = [
+    ("Payment Terms", "Licensee pays the licence fee within {days} days of each invoice."),
+    ("Territory", "The licence covers {region} only, excluding airline and hotel exhibition."),
+    ("Exclusivity", "Licensor grants exclusive streaming rights for {months} months from launch."),
+    ("Termination", "Either party may terminate on {days} days written notice after a material breach."),
+    ("Content Rating", "Titles are delivered with ratings certified for {region}."),
+    ("Confidentiality", "Neither party discloses the terms of this agreement for {months} months."),
+    ("Governing Law", "This agreement is governed by the laws of {region}.")
+]
+REGIONS = ["India", "the United Kingdom", "Singapore", "Canada", "Australia"]
+
+LINE_HEIGHT = 16
+PAGE_TOP = 760
+PAGE_LINES = 44
+
+
+def contract_lines(index: int):
+    """
+    :param index: Fixture number; any non-negative int gives a distinct contract
+    :return: Text lines of the contract
+    """
+    licensor = PARTIES[index % len(PARTIES)]
+    licensee = PARTIES[(index * 3 + 1) % len(PARTIES)]
+    if licensee == licensor:
+        licensee = PARTIES[(index + 1) % len(PARTIES)]
+    year = 2020 + index % 6
+    values = {"days": 15 + index % 60, "months": 6 + index % 30, "region": REGIONS[index % len(REGIONS)]}
+
+    lines = [
+        f"Content Licence Agreement No. {index:05d}",
+        f"This agreement is made between {licensor} and {licensee}, effective {year}-01-{1 + index % 28:02d}.",
+        f"Distribution platform: {PLATFORMS[index % len(PLATFORMS)]}",
+        ""
+    ]
+    for number, (clause, description) in enumerate(CLAUSES, start=1):
+        lines.append(f"{number}. {clause}: {description.format(**values)}")
+    lines += ["", f"This agreement expires on {year + 3}-12-31 unless renewed in writing."]
+    return lines
+
+
+def _escape(text: str):
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def build_pdf(lines, title: str = "Contract"):
+    """
+    Lays text lines out on as many Letter pages as needed
+
+    :param lines: Text lines (Latin-1 characters only)
+    :param title: Document title metadata
+    :return: PDF bytes
+    """
+    pages = [lines[start:start + PAGE_LINES] for start in range(0, len(lines), PAGE_LINES)] or [[]]
+    font_id = 3
+    first_page_id = 4
+    objects = {
+        1: "<< /Type /Catalog /Pages 2 0 R >>",
+        font_id: "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>"
+    }
+    kids = []
+    for page_number, page_lines in enumerate(pages):
+        page_id = first_page_id + page_number * 2
+        content_id = page_id + 1
+        kids.append(f"{page_id} 0 R")
+        commands = ["BT", "/F1 11 Tf", f"{LINE_HEIGHT} TL", f"72 {PAGE_TOP} Td"]
+        commands += [f"({_escape(line)}) Tj T*" for line in page_lines]
+        commands.append("ET")
+        stream = "\n".join(commands)
+        objects[page_id] = (f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                            f"/Resources << /Font << /F1 {font_id} 0 R >> >> /Contents {content_id} 0 R >>")
+        objects[content_id] = f"<< /Length {len(stream.encode('latin-1'))} >>\nstream\n{stream}\nendstream"
+    objects[2] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+    info_id = max(objects) + 1
+    objects[info_id] = f"<< /Title ({_escape(title)}) /Producer (SentientRolodex benchmarks) >>"
+
+    output = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    offsets = {}
+    for object_id in sorted(objects):
+        offsets[object_id] = len(output)
+        output += f"{object_id} 0 obj\n{objects[object_id]}\nendobj\n".encode("latin-1")
+    xref_offset = len(output)
+    output += f"xref\n0 {info_id + 1}\n0000000000 65535 f \n".encode("latin-1")
+    for object_id in range(1, info_id + 1):
+        output += f"{offsets[object_id]:010d} 00000 n \n".encode("latin-1")
+    output += (f"trailer\n<< /Size {info_id + 1} /Root 1 0 R /Info {info_id} 0 R >>\n"
+               f"startxref\n{xref_offset}\n%%EOF\n").encode("latin-1")
+    return bytes(output)
+
+
+def contract_pdf(index: int):
+    """
+    :param index: Fixture number
+    :return: (filename, PDF bytes) of a distinct fixture contract
+    """
+    lines = contract_lines(index)
+    return f"contract_{index:05d}.pdf", build_pdf(lines, lines[0])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write fixture contract PDFs")
+    parser.add_argument("--count", type=int, default=10)
+    parser.add_argument("--start", type=int, default=0, help="First fixture number")
+    parser.add_argument("--out", type=Path, default=Path("fixtures"))
+    args = parser.parse_args()
+
+    args.out.mkdir(parents=True, exist_ok=True)
+    for index in range(args.start, args.start + args.count):
+        filename, content = contract_pdf(index)
+        (args.out / filename).write_bytes(content)
+    print(f"Wrote {args.count} fixture PDFs to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,386 @@
+"""
+Load test for the main API routes.
+
+Boots the FastAPI app in-process (against mongomock or a local mongod, with
+the fake LLM backend and fixture PDFs) or drives an already running server,
+then exercises, phase by phase and at a fixed concurrency:
+
+    registration -> sign-in -> create-space -> upload (+ ingestion to completion)
+    -> get-user -> get-contracts -> search
+
+Each route reports throughput and p50/p95/p99 latency. Results can be saved
+as a JSON baseline and compared against a previous one, so a scaling change
+can be checked against the commit before it.
+
+Run from the directory containing the package:
+
+    python -m <package>.benchmarks.loadTest --backend mongomock --save baselines/main.json
+    python -m <package>.benchmarks.loadTest --backend mongod --uri mongodb://localhost:27017 --compare baselines/main.json
+    python -m <package>.benchmarks.loadTest --url http://localhost:8000 --users 100 --concurrency 25
+
+In-process runs need `pip install httpx mongomock-motor`. A server driven
+with --url should itself run with LLM_BACKEND=fake. mongomock lacks some
+aggregation operators the search route uses, so benchmark search against
+mongod.
+"""
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+import subprocess
+import argparse
+import platform
+import tempfile
+import asyncio
+import time
+import json
+import uuid
+import os
+import sys
+
+# In-process runs use the offline LLM and in-memory job store; set before the app is imported
+os.environ.setdefault("LLM_BACKEND", "fake")
+os.environ.setdefault("JOB_STORE_BACKEND", "memory")
+os.environ.setdefault("JWT_KEY", "load-test-signing-key-0123456789abcdef")
+os.environ.setdefault("JWT_ALGORITHM", "HS256")
+os.environ.setdefault("VECTOR_INDEX_DIR", tempfile.mkdtemp(prefix="loadtest_vectors_"))
+
+import httpx
+from .fixturePdfs import contract_pdf
+from .userDetailsBenchmark import build_client, BENCHMARK_DATABASE
+
+ROUTES = ["registration", "sign-in", "create-space", "upload", "ingestion", "get-user", "get-contracts", "search"]
+
+SEARCH_QUERIES = ["licence", "payment terms", "globex", "territory india", "confid", "streaming rights"]
+
+FINISHED_STATES = ("completed", "failed", "cancelled")
+JOB_POLL_SECONDS = 0.05
+
+PASSWORD = "load-test-password"
+
+
+@dataclass
+class RouteStats:
+    """Latency samples and error count for one route"""
+    route: str
+    samples: list = field(default_factory=list)
+    errors: int = 0
+    statuses: dict = field(default_factory=dict)
+    elapsed: float = 0.0
+
+    def record(self, seconds: float, status: int):
+        self.samples.append(seconds * 1000)
+        self.statuses[str(status)] = self.statuses.get(str(status), 0) + 1
+        if status >= 400:
+            self.errors += 1
+
+    def summary(self):
+        ordered = sorted(self.samples)
+        return {
+            "count": len(ordered),
+            "errors": self.errors,
+            "statuses": self.statuses,
+            "throughput_rps": round(len(ordered) / self.elapsed, 2) if self.elapsed else 0.0,
+            "mean_ms": round(sum(ordered) / len(ordered), 2) if ordered else None,
+            "p50_ms": percentile(ordered, 50),
+            "p95_ms": percentile(ordered, 95),
+            "p99_ms": percentile(ordered, 99),
+            "max_ms": round(ordered[-1], 2) if ordered else None
+        }
+
+
+@dataclass
+class VirtualUser:
+    """A registered account and the state the later phases need"""
+    index: int
+    email: str
+    token: str = None
+    space_id: str = None
+    jobs: list = field(default_factory=list)
+
+    def auth(self):
+        return {"Cookie": f"access_token={self.token}"} if self.token else {}
+
+
+def percentile(ordered, pct: float):
+    """
+    Nearest-rank percentile
+
+    :param ordered: Sorted samples
+    :param pct: Percentile, 0-100
+    :return: Sample value rounded to 0.01, or None without samples
+    """
+    if not ordered:
+        return None
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return round(ordered[rank], 2)
+
+
+async def drive(route: str, calls, concurrency: int):
+    """
+    Runs one phase: every call, at most `concurrency` at a time
+
+    :param route: Route name for the report
+    :param calls: Zero-argument callables returning coroutines that resolve to an httpx.Response
+    :param concurrency: Maximum requests in flight
+    :return: (RouteStats, responses in call order)
+    """
+    stats = RouteStats(route)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def timed(call):
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                response = await call()
+                status = response.status_code
+            except httpx.HTTPError:
+                response, status = None, 599
+            stats.record(time.perf_counter() - started, status)
+            return response
+
+    started = time.perf_counter()
+    responses = await asyncio.gather(*(timed(call) for call in calls))
+    stats.elapsed = time.perf_counter() - started
+    return stats, responses
+
+
+def _json(response):
+    if response is None or response.status_code >= 400:
+        return {}
+    try:
+        return response.json()
+    except ValueError:
+        return {}
+
+
+async def wait_for_jobs(client: httpx.AsyncClient, users, timeout: float):
+    """
+    Polls every upload's ingestion job until it finishes, timing submit -> finished
+
+    :return: RouteStats for the "ingestion" pseudo-route (status 200 completed, 500 failed, 504 timed out)
+    """
+    stats = RouteStats("ingestion")
+    deadline = time.perf_counter() + timeout
+
+    async def follow(job_id: str, submitted: float):
+        while time.perf_counter() < deadline:
+            job = _json(await client.get(f"/api/v1/contracts/jobs/{job_id}"))
+            if job.get("status") in FINISHED_STATES:
+                stats.record(time.perf_counter() - submitted, 200 if job["status"] == "completed" else 500)
+                return
+            await asyncio.sleep(JOB_POLL_SECONDS)
+        stats.record(time.perf_counter() - submitted, 504)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(follow(job_id, submitted) for user in users for job_id, submitted in user.jobs))
+    stats.elapsed = time.perf_counter() - started
+    return stats
+
+
+async def run_scenario(client: httpx.AsyncClient, args):
+    """
+    Runs every phase against the client
+
+    :return: Dict of route name -> RouteStats
+    """
+    run_id = uuid.uuid4().hex[:8]
+    users = [VirtualUser(index, f"loadtest-{run_id}-{index}@example.com") for index in range(args.users)]
+    results = {}
+
+    def phase(route, calls):
+        print(f"  {route:<14} {len(calls):>6} requests", flush=True)
+        return drive(route, calls, args.concurrency)
+
+    results["registration"], _ = await phase("registration", [
+        (lambda user=user: client.post("/api/v1/auth/registration", json={"email": user.email, "password": PASSWORD}))
+        for user in users
+    ])
+
+    results["sign-in"], responses = await phase("sign-in", [
+        (lambda user=user: client.post("/api/v1/auth/sign-in", json={"email": user.email, "password": PASSWORD}))
+        for user in users
+    ])
+    for user, response in zip(users, responses):
+        user.token = _json(response).get("token")
+    users = [user for user in users if user.token]
+    if not users:
+        raise SystemExit("No user could sign in; check the server logs")
+
+    results["create-space"], responses = await phase("create-space", [
+        (lambda user=user: client.post("/api/v1/contracts/create-space", json={"name": f"Load test {user.index}"},
+                                       headers=user.auth()))
+        for user in users
+    ])
+    for user, response in zip(users, responses):
+        user.space_id = _json(response).get("contract_space_id")
+    users = [user for user in users if user.space_id]
+
+    # Every upload is a distinct fixture, so none is served from the extraction cache
+    uploads = []
+    for user in users:
+        for number in range(args.uploads):
+            filename, content = contract_pdf(args.fixture_start + user.index * args.uploads + number)
+            uploads.append((user, filename, content))
+
+    async def upload(user, filename, content):
+        submitted = time.perf_counter()
+        response = await client.post(f"/api/v1/contracts/add_contracts/{user.space_id}",
+                                     files={"file": (filename, content, "application/pdf")})
+        job_id = _json(response).get("job_id")
+        if job_id:
+            user.jobs.append((job_id, submitted))
+        return response
+
+    results["upload"], _ = await phase("upload", [
+        (lambda entry=entry: upload(*entry)) for entry in uploads
+    ])
+    print(f"  {'ingestion':<14} {sum(len(user.jobs) for user in users):>6} jobs", flush=True)
+    results["ingestion"] = await wait_for_jobs(client, users, args.job_timeout)
+
+    def spread(make_call):
+        return [(lambda user=users[n % len(users)], n=n: make_call(user, n)) for n in range(args.requests)]
+
+    results["get-user"], _ = await phase("get-user", spread(
+        lambda user, n: client.get("/api/v1/auth/get-user", headers=user.auth())
+    ))
+    results["get-contracts"], _ = await phase("get-contracts", spread(
+        lambda user, n: client.get(f"/api/v1/contracts/{user.space_id}", params={"limit": args.page_size})
+    ))
+    results["search"], _ = await phase("search", spread(
+        lambda user, n: client.get("/api/v1/search", params={"q": SEARCH_QUERIES[n % len(SEARCH_QUERIES)]},
+                                   headers=user.auth())
+    ))
+    return results
+
+
+async def run_in_process(args):
+    """Boots the app with its lifespan against the chosen Mongo backend and runs the scenario"""
+    from ..config.database import connect_to_mongo
+    from ..main import app
+
+    # Connecting first makes the lifespan reuse this client instead of DATABASE_URI
+    mongo_client = build_client(args.backend, args.uri)
+    await connect_to_mongo(mongo_client, BENCHMARK_DATABASE)
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=args.timeout) as client:
+            try:
+                return await run_scenario(client, args)
+            finally:
+                await mongo_client.drop_database(BENCHMARK_DATABASE)
+
+
+async def run_against_server(args):
+    limits = httpx.Limits(max_connections=args.concurrency * 2, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout, limits=limits) as client:
+        return await run_scenario(client, args)
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def build_report(results, args):
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "commit": git_commit(),
+            "target": args.url or f"in-process/{args.backend}",
+            "users": args.users,
+            "concurrency": args.concurrency,
+            "uploads_per_user": args.uploads,
+            "requests_per_read_route": args.requests,
+            "python": platform.python_version(),
+            "cpus": os.cpu_count()
+        },
+        "routes": {route: results[route].summary() for route in ROUTES if route in results}
+    }
+
+
+def print_report(report):
+    print(f"\n{'route':<14} {'count':>6} {'errors':>6} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for route, stats in report["routes"].items():
+        cells = [f"{stats[key]:>9.2f}" if stats[key] is not None else f"{'-':>9}"
+                 for key in ("throughput_rps", "p50_ms", "p95_ms", "p99_ms")]
+        print(f"{route:<14} {stats['count']:>6} {stats['errors']:>6} {' '.join(cells)}")
+
+
+def compare(report, baseline, max_regression: float):
+    """
+    Prints p95 and throughput changes against a baseline
+
+    :param max_regression: Allowed relative slowdown, e.g. 0.2 for 20%
+    :return: Routes that regressed beyond the allowance
+    """
+    meta = baseline.get("meta", {})
+    print(f"\nAgainst baseline {meta.get('commit') or '?'} ({meta.get('timestamp', '?')}, {meta.get('target', '?')})")
+    if (meta.get("users"), meta.get("concurrency")) != (report["meta"]["users"], report["meta"]["concurrency"]):
+        print("  note: users/concurrency differ from the baseline, so numbers are not directly comparable")
+    print(f"{'route':<14} {'p95 ms':>9} {'baseline':>9} {'change':>8} {'req/s':>9} {'baseline':>9} {'change':>8}")
+
+    regressions = []
+    for route, stats in report["routes"].items():
+        previous = baseline.get("routes", {}).get(route)
+        if not previous or not previous.get("p95_ms") or not stats.get("p95_ms"):
+            continue
+        latency_change = stats["p95_ms"] / previous["p95_ms"] - 1
+        throughput_change = (stats["throughput_rps"] / previous["throughput_rps"] - 1
+                             if previous.get("throughput_rps") else 0.0)
+        regressed = latency_change > max_regression or throughput_change < -max_regression
+        if regressed:
+            regressions.append(route)
+        print(f"{route:<14} {stats['p95_ms']:>9.2f} {previous['p95_ms']:>9.2f} {latency_change:>+8.0%} "
+              f"{stats['throughput_rps']:>9.2f} {previous['throughput_rps']:>9.2f} {throughput_change:>+8.0%}"
+              f"{'  REGRESSED' if regressed else ''}")
+    return regressions
+
+
+async def run(args):
+    print(f"Load test: {args.users} users, concurrency {args.concurrency}, "
+          f"{args.uploads} upload(s) per user, {args.requests} requests per read route")
+    if not args.url and args.backend == "mongomock":
+        print("  note: search is not representative on mongomock; use --backend mongod for search numbers")
+    results = await (run_against_server(args) if args.url else run_in_process(args))
+    report = build_report(results, args)
+    print_report(report)
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nSaved baseline to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(report, json.load(f), args.max_regression)
+        if regressions:
+            print(f"\nRegressed beyond {args.max_regression:.0%}: {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the API routes and compare against a baseline")
+    parser.add_argument("--url", help="Drive a running server instead of booting the app in-process")
+    parser.add_argument("--backend", choices=["mongomock", "mongod"], default="mongomock")
+    parser.add_argument("--uri", default="mongodb://localhost:27017")
+    parser.add_argument("--users", type=int, default=20, help="Accounts to register, sign in and give a space")
+    parser.add_argument("--concurrency", type=int, default=10, help="Requests in flight per phase")
+    parser.add_argument("--uploads", type=int, default=2, help="Contract PDFs uploaded per user")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per read route (get-user, get-contracts, search)")
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--fixture-start", type=int, default=0, help="First fixture number (vary to dodge a warm extraction cache)")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Per-request timeout in seconds")
+    parser.add_argument("--job-timeout", type=float, default=300.0, help="Seconds to wait for ingestion jobs")
+    parser.add_argument("--save", help="Write the results as a JSON baseline")
+    parser.add_argument("--compare", help="Baseline JSON to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.2,
+                        help="Relative p95 increase or throughput drop that fails the comparison")
+    sys.exit(asyncio.run(run(parser.parse_args())))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+Local stand-in for the OTT terms-of-use sites.
+
+Serves one page per platform with ETag and Last-Modified headers and answers
+conditional GETs with 304. POST /<platform>/bump publishes a new version of
+that platform's terms.
+
+Serve the fixtures and point the scrapers at them:
+
+    python -m <package>.benchmarks.scrapeFixtureServer --port 8765
+    SCRAPER_PLATFORMS="netflix=http://127.0.0.1:8765/netflix,prime=http://127.0.0.1:8765/prime,hotstar=http://127.0.0.1:8765/hotstar"
+
+Or time a cold fetch against revalidation (304s) and a changed page:
+
+    python -m <package>.benchmarks.scrapeFixtureServer --demo
+"""
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import argparse
+import hashlib
+import tempfile
+import threading
+import time
+import os
+
+FIXTURE_PLATFORMS = ("netflix", "prime", "hotstar")
+
+PAGE_TEMPLATE = """<html><head><title>{name} Terms of Use</title><style>body {{}}</style></head>
+<body><nav>Home | Help</nav>
+<h1>{name} Terms of Use (revision {revision})</h1>
+{clauses}
+<footer>Copyright</footer></body></html>"""
+
+CLAUSE_COUNT = 200
+
+
+class FixtureSite:
+    """Page content and validators for every fixture platform"""
+
+    def __init__(self):
+        self.revisions = {name: 1 for name in FIXTURE_PLATFORMS}
+        self.modified = {name: time.time() for name in FIXTURE_PLATFORMS}
+        self.requests = {"200": 0, "304": 0}
+        self.lock = threading.Lock()
+
+    def page(self, name: str):
+        revision = self.revisions[name]
+        clauses = "\n".join(
+            f"<p>{index}. Clause {index}: Subscribers of {name} agree to term {index} "
+            f"(rev {revision if index == 1 else 1}).</p>"
+            for index in range(1, CLAUSE_COUNT + 1)
+        )
+        return PAGE_TEMPLATE.format(name=name.title(), revision=revision, clauses=clauses).encode()
+
+    def bump(self, name: str):
+        with self.lock:
+            self.revisions[name] += 1
+            self.modified[name] = time.time()
+
+
+def make_handler(site: FixtureSite):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def _platform(self):
+            return self.path.strip("/").split("/")[0]
+
+        def do_GET(self):
+            name = self._platform()
+            if name not in site.revisions:
+                self.send_error(404)
+                return
+            body = site.page(name)
+            etag = f'"{hashlib.sha256(body).hexdigest()[:16]}"'
+            last_modified = formatdate(site.modified[name], usegmt=True)
+            if self.headers.get("If-None-Match") == etag or \
+                    (not self.headers.get("If-None-Match") and self.headers.get("If-Modified-Since") == last_modified):
+                with site.lock:
+                    site.requests["304"] += 1
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+            with site.lock:
+                site.requests["200"] += 1
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("ETag", etag)
+            self.send_header("Last-Modified", last_modified)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            name = self._platform()
+            if name not in site.revisions or not self.path.endswith("/bump"):
+                self.send_error(404)
+                return
+            site.bump(name)
+            self.send_response(204)
+            self.end_headers()
+
+    return Handler
+
+
+def start_fixture_server(port: int = 0):
+    """
+    Starts the fixture server on a background thread
+
+    :param port: Port to listen on (0 picks a free one)
+    :return: (server, site, base URL)
+    """
+    site = FixtureSite()
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(site))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, site, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def platforms_env(base_url: str):
+    """SCRAPER_PLATFORMS value pointing every platform at the fixture server"""
+    return ",".join(f"{name}={base_url}/{name}" for name in FIXTURE_PLATFORMS)
+
+
+def _timed(label: str, fetch, site: FixtureSite):
+    before = dict(site.requests)
+    started = time.perf_counter()
+    snapshots = fetch()
+    elapsed = (time.perf_counter() - started) * 1000
+    changed = sorted(name for name, snapshot in snapshots.items() if snapshot.changed)
+    print(f"{label:<28} {elapsed:8.1f} ms  200s={site.requests['200'] - before['200']}"
+          f"  304s={site.requests['304'] - before['304']}  changed={changed}")
+
+
+def run_demo():
+    server, site, base_url = start_fixture_server()
+    # The scraping module reads its registry and cache directory at import time
+    os.environ["SCRAPER_PLATFORMS"] = platforms_env(base_url)
+    os.environ["SCRAPE_CACHE_DIR"] = tempfile.mkdtemp(prefix="scrape_cache_")
+    # Measure fetch cost, not the per-site rate limit
+    os.environ.setdefault("SCRAPER_REQUESTS_PER_MINUTE", "6000")
+    from ..ai_agents.scraping import fetch_platforms
+
+    try:
+        _timed("cold fetch", fetch_platforms, site)
+        _timed("revalidate (unchanged)", fetch_platforms, site)
+        site.bump("prime")
+        _timed("revalidate (prime changed)", fetch_platforms, site)
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="OTT terms-of-use fixture server")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--demo", action="store_true", help="Time cold, revalidated and changed fetches, then exit")
+    args = parser.parse_args()
+    if args.demo:
+        run_demo()
+    else:
+        server, _, base_url = start_fixture_server(args.port)
+        print(f"Serving fixtures at {base_url}")
+        print(f'SCRAPER_PLATFORMS="{platforms_env(base_url)}"')
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            server.shutdown()
@@ -0,0 +1,123 @@
+"""
+Serialization benchmark for the large list responses (get-contracts, get-user).
+
+Compares, as the list grows:
+
+    legacy     rewrite each _id to str, then jsonable_encoder + json.dumps
+               (FastAPI's path for a route without a response model)
+    model      validate into the response model and dump JSON bytes in
+               pydantic-core (FastAPI's path with a response model)
+    orjson     validate into the response model, dump to Python, then orjson
+               (only if orjson is installed)
+
+Run from the directory containing the package:
+
+    python -m <package>.benchmarks.serializationBenchmark
+    python -m <package>.benchmarks.serializationBenchmark --sizes 100 1000 10000 --payload user
+"""
+import argparse
+import statistics
+import time
+import json
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from ..models.Model import ContractPageResponse, UserDetailsResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def contract_page(size: int):
+    """A get-contracts payload of raw Mongo documents"""
+    contracts = [
+        {
+            "_id": ObjectId(),
+            "id": f"contract_{index:012x}",
+            "title": f"Content Licence Agreement No. {index:05d}",
+            "parties": ["Acme Media", "Globex Studios"],
+            "effective_date": "2024-01-01",
+            "expiration_date": "2027-12-31",
+            "terms": [{"clause": f"Clause {number}", "description": "Licensee pays within 30 days. " * 4}
+                      for number in range(6)],
+            "status": "Active",
+            "plartform": "www.netflix.com"
+        }
+        for index in range(size)
+    ]
+    return {"message": "Contracts retrieved successfully", "contracts": contracts, "next_cursor": contracts[-1]["_id"]}
+
+
+def user_details(size: int, spaces: int = 10):
+    """A get-user payload with `size` contract summaries spread over the spaces"""
+    per_space = max(1, size // spaces)
+    return {
+        "user_id": ObjectId(),
+        "email": "bench@example.com",
+        "contract_spaces": [
+            {
+                "space_id": ObjectId(),
+                "name": f"Space {space}",
+                "contracts": [{"contract_id": str(ObjectId()), "title": f"Agreement {space}-{index}",
+                               "parties": ["Acme Media", "Globex Studios"], "status": "Active",
+                               "platform": "www.netflix.com"} for index in range(per_space)]
+            }
+            for space in range(spaces)
+        ]
+    }
+
+
+def _stringify_ids(value):
+    # What handlers did before the response models: rewrite every ObjectId by hand
+    if isinstance(value, dict):
+        return {key: _stringify_ids(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_stringify_ids(item) for item in value]
+    return str(value) if isinstance(value, ObjectId) else value
+
+
+def encoders(model):
+    adapter = TypeAdapter(model)
+    candidates = {
+        "legacy": lambda payload: json.dumps(jsonable_encoder(_stringify_ids(payload))).encode(),
+        "model": lambda payload: adapter.dump_json(adapter.validate_python(payload), by_alias=True, exclude_unset=True)
+    }
+    if orjson is not None:
+        candidates["orjson"] = lambda payload: orjson.dumps(
+            adapter.dump_python(adapter.validate_python(payload), mode="json", by_alias=True, exclude_unset=True)
+        )
+    return candidates
+
+
+def time_encoder(encode, payload, iterations: int):
+    encode(payload)
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        encode(payload)
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark response serialization cost versus list size")
+    parser.add_argument("--payload", choices=["contracts", "user"], default="contracts")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 5000])
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+
+    build, model = (contract_page, ContractPageResponse) if args.payload == "contracts" else (user_details, UserDetailsResponse)
+    candidates = encoders(model)
+
+    print(f"{'items':>7} " + " ".join(f"{name + ' ms':>11}" for name in candidates) + f" {'speedup':>8}")
+    for size in args.sizes:
+        payload = build(size)
+        timings = {name: time_encoder(encode, payload, args.iterations) for name, encode in candidates.items()}
+        speedup = timings["legacy"] / min(timing for name, timing in timings.items() if name != "legacy")
+        print(f"{size:>7} " + " ".join(f"{timing:>11.2f}" for timing in timings.values()) + f" {speedup:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Worker startup benchmark: import time and baseline RSS of the app.
+
+Each run starts a fresh interpreter (as a uvicorn worker would), imports
+main, and records the wall time, resident memory and whether any of the
+heavy AI/PDF dependencies were loaded. It then imports those dependencies
+one by one to show the cost that is deferred to first use.
+
+Run from the directory containing the package:
+
+    python -m <package>.benchmarks.startupBenchmark --runs 5
+    python -m <package>.benchmarks.startupBenchmark --save startup.json
+"""
+import statistics
+import subprocess
+import argparse
+import json
+import os
+import sys
+
+PACKAGE = __package__.split(".")[0]
+
+# Loaded on first use only; none of these should appear after importing main
+HEAVY_MODULES = ["pdfplumber", "google.generativeai", "crewai", "langchain_huggingface", "torch"]
+
+PROBE = """
+import importlib
+import json
+import sys
+import time
+
+def rss_mb():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+baseline = rss_mb()
+started = time.perf_counter()
+import {package}.main
+result = {{
+    "import_seconds": time.perf_counter() - started,
+    "interpreter_rss_mb": baseline,
+    "rss_mb": rss_mb(),
+    "modules": len(sys.modules),
+    "heavy_loaded": [name for name in {heavy!r} if name in sys.modules]
+}}
+
+deferred = {{}}
+for name in ({heavy!r} if {deferred!r} else []):
+    before = rss_mb()
+    started = time.perf_counter()
+    try:
+        importlib.import_module(name)
+    except Exception:
+        continue
+    deferred[name] = {{"seconds": time.perf_counter() - started, "rss_mb": rss_mb() - before}}
+result["deferred"] = deferred
+print(json.dumps(result))
+"""
+
+
+def probe(deferred: bool):
+    """
+    Imports the app in a fresh interpreter
+
+    :param deferred: Also import the heavy dependencies afterwards and time each
+    :return: Probe result dict
+    """
+    code = PROBE.format(package=PACKAGE, heavy=HEAVY_MODULES, deferred=deferred)
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    completed = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True)
+    if completed.returncode != 0:
+        raise SystemExit(f"Probe failed:\n{completed.stderr}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure app import time and baseline RSS per worker")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--save", help="Write the results as JSON")
+    args = parser.parse_args()
+
+    # Deferred imports would inflate the first run's numbers, so they get a run of their own
+    deferred = probe(deferred=True)["deferred"]
+    runs = [probe(deferred=False) for _ in range(args.runs)]
+    import_ms = sorted(run["import_seconds"] * 1000 for run in runs)
+    rss = sorted(run["rss_mb"] for run in runs)
+    report = {
+        "runs": args.runs,
+        "import_ms_median": round(statistics.median(import_ms), 1),
+        "import_ms_max": round(import_ms[-1], 1),
+        "interpreter_rss_mb": round(statistics.median(run["interpreter_rss_mb"] for run in runs), 1),
+        "rss_mb_median": round(statistics.median(rss), 1),
+        "modules": runs[0]["modules"],
+        "heavy_loaded_at_startup": runs[0]["heavy_loaded"],
+        "deferred": {name: {"ms": round(cost["seconds"] * 1000, 1), "rss_mb": round(cost["rss_mb"], 1)}
+                     for name, cost in deferred.items()}
+    }
+
+    print(f"import main: median {report['import_ms_median']} ms, max {report['import_ms_max']} ms over {args.runs} runs")
+    print(f"RSS after import: {report['rss_mb_median']} MB (bare interpreter {report['interpreter_rss_mb']} MB), "
+          f"{report['modules']} modules")
+    print(f"heavy modules loaded at startup: {', '.join(report['heavy_loaded_at_startup']) or 'none'}")
+    if report["deferred"]:
+        print("deferred to first use (imported after main, in order):")
+        for name, cost in report["deferred"].items():
+            print(f"  {name:<24} {cost['ms']:>9.1f} ms {cost['rss_mb']:>8.1f} MB")
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Saved to {args.save}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Benchmark for the /api/v1/auth/get-user data path.
+
+Seeds one user with N contract spaces of M contracts each and times
+build_user_info() as N and M grow.
+
+Run from the directory containing the package:
+
+    python -m <package>.benchmarks.userDetailsBenchmark --backend mongomock
+    python -m <package>.benchmarks.userDetailsBenchmark --backend mongod --uri mongodb://localhost:27017
+
+The mongomock backend needs `pip install mongomock-motor`.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from motor.motor_asyncio import AsyncIOMotorClient
+from ..config.database import connect_to_mongo, close_mongo_connection, get_database
+from ..controller.authController import build_user_info
+from ..services.contractSummaries import contract_summary
+
+BENCHMARK_DATABASE = "sentient_benchmark"
+
+
+def build_client(backend: str, uri: str):
+    """
+    Creates the Motor (or Motor-compatible) client for the chosen backend
+
+    :param backend: "mongomock" or "mongod"
+    :param uri: MongoDB URI for the mongod backend
+    :return: Client instance
+    """
+    if backend == "mongomock":
+        try:
+            from mongomock_motor import AsyncMongoMockClient
+        except ImportError:
+            raise SystemExit("mongomock backend requires: pip install mongomock-motor")
+        return AsyncMongoMockClient()
+    return AsyncIOMotorClient(uri)
+
+
+async def seed(spaces: int, contracts_per_space: int, summaries: bool = True):
+    """
+    Seeds a fresh user with N spaces x M contracts
+
+    :param summaries: Store contract summaries on the spaces (False measures the fallback path)
+
+    :return: The seeded user document
+    """
+    db = get_database()
+    for name in ("users", "contract_spaces", "contracts"):
+        await db[name].delete_many({})
+
+    space_ids = []
+    for space_index in range(spaces):
+        contracts = [
+            {
+                "id": f"contract_{space_index}_{contract_index}",
+                "title": f"Agreement {space_index}-{contract_index}",
+                "parties": ["Company A", "Company B"],
+                "terms": [{"clause": "Payment Terms", "description": "Net 30." * 20}],
+                "status": "Active",
+                "plartform": "www.example.com"
+            }
+            for contract_index in range(contracts_per_space)
+        ]
+        contract_ids = []
+        if contracts:
+            result = await db["contracts"].insert_many(contracts)
+            contract_ids = [str(inserted_id) for inserted_id in result.inserted_ids]
+        space_doc = {"name": f"Space {space_index}", "contracts": contract_ids}
+        if summaries:
+            space_doc["summaries"] = {contract_id: contract_summary(contract)
+                                      for contract_id, contract in zip(contract_ids, contracts)}
+        space = await db["contract_spaces"].insert_one(space_doc)
+        space_ids.append(str(space.inserted_id))
+
+    user = {"email": "bench@example.com", "password": "x", "contractSpace": space_ids}
+    result = await db["users"].insert_one(user)
+    user["_id"] = result.inserted_id
+    return user
+
+
+async def run(args):
+    client = build_client(args.backend, args.uri)
+    await connect_to_mongo(client, BENCHMARK_DATABASE)
+
+    print(f"{'spaces':>7} {'contracts':>10} {'docs':>7} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9}")
+    try:
+        for spaces in args.spaces:
+            for contracts_per_space in args.contracts:
+                user = await seed(spaces, contracts_per_space, not args.no_summaries)
+
+                # Warm up once before measuring
+                await build_user_info(user)
+                samples = []
+                for _ in range(args.iterations):
+                    started = time.perf_counter()
+                    await build_user_info(user)
+                    samples.append((time.perf_counter() - started) * 1000)
+
+                samples.sort()
+                p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+                print(f"{spaces:>7} {contracts_per_space:>10} {spaces * contracts_per_space:>7} "
+                      f"{statistics.mean(samples):>9.2f} {statistics.median(samples):>9.2f} {p95:>9.2f}")
+    finally:
+        await client.drop_database(BENCHMARK_DATABASE)
+        await close_mongo_connection()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark get-user latency as spaces and contracts grow")
+    parser.add_argument("--backend", choices=["mongomock", "mongod"], default="mongomock")
+    parser.add_argument("--uri", default="mongodb://localhost:27017")
+    parser.add_argument("--spaces", type=int, nargs="+", default=[1, 5, 20])
+    parser.add_argument("--contracts", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--no-summaries", action="store_true", help="Seed spaces without contract summaries")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,25 +1,99 @@
-from pymongo import MongoClient
+from motor.motor_asyncio import AsyncIOMotorClient
+from typing import Optional
 import os
 from dotenv import load_dotenv
+from ..utils.metrics import MongoCommandListener
+from ..utils.logger import get_logger
 
 # Load environment variables
 load_dotenv()
 
+logger = get_logger("database")
+
 # MongoDB Connection URL from environment variables
 MONGO_URI = os.getenv("DATABASE_URI")
+DATABASE_NAME = os.getenv("DATABASE_NAME", "hackathon")
+
+# Connection pool tuning (shared by every request on this worker)
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "100"))
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", "0"))
+MONGO_MAX_IDLE_TIME_MS = int(os.getenv("MONGO_MAX_IDLE_TIME_MS", "60000"))
+MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", "5000"))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000"))
+
+
+class Database:
+    """Holds the process-wide Motor client and selected database"""
+    client: Optional[AsyncIOMotorClient] = None
+    db = None
+
+
+database = Database()
+
+
+async def connect_to_mongo(client=None, database_name: str = DATABASE_NAME):
+    """
+    Creates the shared, pooled Motor client. Called once from the FastAPI lifespan.
+
+    :param client: Optional pre-built client (e.g. an in-memory stand-in for benchmarks)
+    :param database_name: Database to select
+    """
+    if database.client is not None:
+        return
+
+    try:
+        # Create a connection pool
+        database.client = client or AsyncIOMotorClient(
+            MONGO_URI,
+            maxPoolSize=MONGO_MAX_POOL_SIZE,
+            minPoolSize=MONGO_MIN_POOL_SIZE,
+            maxIdleTimeMS=MONGO_MAX_IDLE_TIME_MS,
+            waitQueueTimeoutMS=MONGO_WAIT_QUEUE_TIMEOUT_MS,
+            serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS,
+            # Per-command latency for /metrics
+            event_listeners=[MongoCommandListener()],
+        )
+
+        # Select Database
+        database.db = database.client[database_name]
+    except Exception as e:
+        logger.error("Database connection error", extra={"error": str(e)})
+        # Re-raise to ensure app doesn't start with broken DB connection
+        raise
+
+
+async def close_mongo_connection():
+    """Closes the shared Motor client on application shutdown"""
+    if database.client is not None:
+        database.client.close()
+    database.client = None
+    database.db = None
+
+
+def get_database():
+    """
+    Returns the shared database handle
+
+    :return: Motor database
+    :raises: RuntimeError if the application has not connected yet
+    """
+    if database.db is None:
+        raise RuntimeError("Database is not connected; connect_to_mongo() must run at startup")
+    return database.db
+
+
+# Collection accessors
+def get_users_collection():
+    return get_database()["users"]
+
+
+def get_contract_spaces_collection():
+    return get_database()["contract_spaces"]
+
+
+def get_contracts_collection():
+    return get_database()["contracts"]
+
 
-try:
-    # Create a connection
-    client = MongoClient(MONGO_URI)
-    
-    # Select Database
-    db = client["hackathon"]
-    
-    # Select Collections
-    users_collection = db["users"]
-    contract_spaces_collection = db["contract_spaces"]  # Fixed variable name
-    contracts_collection = db["contracts"]  # Fixed variable name
-except Exception as e:
-    print(f"Database connection error: {str(e)}")
-    # Re-raise to ensure app doesn't start with broken DB connection
-    raise
\ No newline at end of file
+def get_clause_verdicts_collection():
+    return get_database()["clause_verdicts"]
@@ -0,0 +1,273 @@
+"""
+Declarative indexes and data migrations. Indexes are ensured at startup;
+migrations run in a background task after it (or only through the migrate
+command with MIGRATE_ON_START=false).
+
+Report index usage from the command line (run from the directory containing the package):
+
+    python -m <package>.config.indexes stats
+    python -m <package>.config.indexes ensure
+    python -m <package>.config.indexes migrate
+"""
+from datetime import datetime, timedelta, timezone
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import DuplicateKeyError, OperationFailure
+import argparse
+import asyncio
+import os
+from dotenv import load_dotenv
+from .database import get_database, connect_to_mongo, close_mongo_connection
+from ..utils.logger import get_logger
+
+# Load environment variables
+load_dotenv()
+
+logger = get_logger("indexes")
+
+EXTRACTION_CACHE_TTL_DAYS = int(os.getenv("EXTRACTION_CACHE_TTL_DAYS", "90"))
+
+# A running migration renews its claim well within this; a claim left to lapse belonged to a crashed worker
+MIGRATION_LEASE_SECONDS = int(os.getenv("MIGRATION_LEASE_SECONDS", "300"))
+
+# Apply pending migrations in the background at startup; when off, run them with the migrate command
+MIGRATE_ON_START = os.getenv("MIGRATE_ON_START", "true").lower() == "true"
+
+# collection -> indexes it must have
+INDEXES = {
+    "users": [
+        # Registration, sign-in and auth look users up by email
+        IndexModel([("email", ASCENDING)], unique=True),
+    ],
+    "contract_spaces": [
+        # Reverse lookup: which spaces contain a contract
+        IndexModel([("contracts", ASCENDING)]),
+    ],
+    "search_index": [
+        IndexModel([("prefixes", ASCENDING)]),
+        IndexModel([("space_ids", ASCENDING)]),
+        IndexModel([("kind", ASCENDING), ("ref_id", ASCENDING)]),
+    ],
+    "extraction_cache": [
+        IndexModel([("last_used_at", ASCENDING)], expireAfterSeconds=EXTRACTION_CACHE_TTL_DAYS * 24 * 3600),
+        IndexModel([("contract_id", ASCENDING)]),
+    ],
+    "jobs": [
+        IndexModel([("status", ASCENDING)]),
+        IndexModel([("kind", ASCENDING), ("created_at", DESCENDING)]),
+    ],
+}
+
+
+async def ensure_indexes():
+    """
+    Creates every declared index. Existing indexes are left alone; a failure on
+    one index (e.g. duplicate emails blocking the unique index) is reported
+    without stopping the others.
+
+    :return: List of (collection, index name, error) for indexes that failed
+    """
+    db = get_database()
+    failures = []
+    for collection, indexes in INDEXES.items():
+        for index in indexes:
+            try:
+                await db[collection].create_indexes([index])
+            except OperationFailure as e:
+                name = index.document["name"]
+                logger.error("Index could not be created", extra={"collection": collection, "index": name, "error": str(e)})
+                failures.append((collection, name, str(e)))
+    return failures
+
+
+async def _backfill_search_index():
+    from ..apiFeatures.search import rebuild_search_index
+    await rebuild_search_index()
+
+
+async def _backfill_contract_summaries():
+    from ..services.contractSummaries import repair_contract_summaries
+    await repair_contract_summaries()
+
+
+async def _backfill_clause_index():
+    from ..services.clauseIndexing import rebuild_clause_index
+    await rebuild_clause_index()
+
+
+# Ordered, append-only list of (id, description, coroutine function)
+MIGRATIONS = [
+    ("0001_backfill_search_index", "Index existing spaces and contracts for search", _backfill_search_index),
+    ("0002_backfill_contract_summaries", "Store contract summaries on contract spaces", _backfill_contract_summaries),
+    ("0003_backfill_clause_index", "Embed clauses of contracts stored before semantic search", _backfill_clause_index),
+]
+
+
+async def _claim_migration(collection, migration_id: str, description: str):
+    """
+    Claims a migration for this worker: a fresh claim, or one whose lease has
+    lapsed because the worker running it died
+
+    :return: True if this worker should run the migration
+    """
+    now = datetime.now(timezone.utc)
+    lease_expires_at = now + timedelta(seconds=MIGRATION_LEASE_SECONDS)
+    try:
+        await collection.insert_one({
+            "_id": migration_id,
+            "description": description,
+            "status": "running",
+            "started_at": now,
+            "lease_expires_at": lease_expires_at
+        })
+        return True
+    except DuplicateKeyError:
+        pass  # Applied, being applied, or abandoned
+
+    stale = await collection.find_one_and_update(
+        {
+            "_id": migration_id,
+            "status": "running",
+            "$or": [
+                {"lease_expires_at": {"$lt": now}},
+                # Claims recorded before leases existed
+                {"lease_expires_at": {"$exists": False},
+                 "started_at": {"$lt": now - timedelta(seconds=MIGRATION_LEASE_SECONDS)}}
+            ]
+        },
+        {"$set": {"started_at": now, "lease_expires_at": lease_expires_at}}
+    )
+    if stale:
+        logger.warning("Reclaimed abandoned migration", extra={"migration": migration_id,
+                                                              "abandoned_at": str(stale.get("started_at"))})
+    return stale is not None
+
+
+async def _renew_lease(collection, migration_id: str):
+    # Keeps the claim alive while the migration runs, however long it takes
+    while True:
+        await asyncio.sleep(MIGRATION_LEASE_SECONDS / 3)
+        await collection.update_one(
+            {"_id": migration_id, "status": "running"},
+            {"$set": {"lease_expires_at": datetime.now(timezone.utc) + timedelta(seconds=MIGRATION_LEASE_SECONDS)}}
+        )
+
+
+async def run_migrations():
+    """
+    Applies migrations not yet recorded in schema_migrations. Each migration is
+    claimed with an insert so only one worker runs it; the claim is a lease
+    renewed while the migration runs, so a crashed worker's claim is taken
+    over once it lapses.
+
+    :return: IDs of migrations applied by this call
+    """
+    migrations_collection = get_database()["schema_migrations"]
+    applied = []
+    for migration_id, description, migrate in MIGRATIONS:
+        if not await _claim_migration(migrations_collection, migration_id, description):
+            continue  # Already applied, or being applied by another worker
+
+        renewal = asyncio.create_task(_renew_lease(migrations_collection, migration_id))
+        try:
+            await migrate()
+        except asyncio.CancelledError:
+            # Worker shutting down: hand the migration to the next worker straight away
+            await migrations_collection.delete_one({"_id": migration_id})
+            raise
+        except Exception as e:
+            # Release the claim so the next startup retries
+            await migrations_collection.delete_one({"_id": migration_id})
+            logger.error("Migration failed", extra={"migration": migration_id, "error": str(e)})
+            raise
+        finally:
+            renewal.cancel()
+        await migrations_collection.update_one(
+            {"_id": migration_id},
+            {"$set": {"status": "applied", "applied_at": datetime.now(timezone.utc)},
+             "$unset": {"lease_expires_at": ""}}
+        )
+        applied.append(migration_id)
+    return applied
+
+
+async def _run_migrations_in_background():
+    try:
+        await run_migrations()
+    except Exception:
+        # Already logged; retried on the next start or with the migrate command
+        pass
+
+
+async def ensure_schema():
+    """
+    Startup hook: creates indexes, then starts pending migrations in the
+    background so a long backfill never holds up serving (or health checks)
+
+    :return: The migration task (cancel it on shutdown), or None when MIGRATE_ON_START is off
+    """
+    await ensure_indexes()
+    if not MIGRATE_ON_START:
+        return None
+    return asyncio.create_task(_run_migrations_in_background())
+
+
+async def index_usage_stats():
+    """
+    Collects $indexStats for every declared collection
+
+    :return: List of dicts with collection, index, ops, since and whether the index is declared
+    """
+    db = get_database()
+    rows = []
+    for collection, indexes in INDEXES.items():
+        declared = {index.document["name"] for index in indexes} | {"_id_"}
+        seen = set()
+        async for stat in db[collection].aggregate([{"$indexStats": {}}]):
+            seen.add(stat["name"])
+            rows.append({
+                "collection": collection,
+                "index": stat["name"],
+                "ops": stat["accesses"]["ops"],
+                "since": stat["accesses"]["since"],
+                "declared": stat["name"] in declared
+            })
+        for name in sorted(declared - seen):
+            rows.append({"collection": collection, "index": name, "ops": None, "since": None, "declared": True})
+    return rows
+
+
+def _print_stats(rows):
+    print(f"{'collection':<18} {'index':<22} {'ops':>10}  {'since':<26} note")
+    for row in rows:
+        if row["ops"] is None:
+            note = "MISSING"
+        elif not row["declared"]:
+            note = "not declared"
+        elif row["ops"] == 0:
+            note = "unused"
+        else:
+            note = ""
+        ops = "-" if row["ops"] is None else row["ops"]
+        since = row["since"].isoformat() if row["since"] else "-"
+        print(f"{row['collection']:<18} {row['index']:<22} {ops:>10}  {since:<26} {note}")
+
+
+async def _main(command: str):
+    await connect_to_mongo()
+    try:
+        if command == "ensure":
+            failures = await ensure_indexes()
+            print("Indexes up to date" if not failures else f"{len(failures)} index(es) failed")
+        elif command == "migrate":
+            applied = await run_migrations()
+            print(f"Applied: {', '.join(applied)}" if applied else "No pending migrations")
+        else:
+            _print_stats(await index_usage_stats())
+    finally:
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage MongoDB indexes and migrations")
+    parser.add_argument("command", choices=["stats", "ensure", "migrate"], nargs="?", default="stats")
+    asyncio.run(_main(parser.parse_args().command))
@@ -0,0 +1,264 @@
+from fastapi import HTTPException
+from datetime import datetime, timezone
+import asyncio
+import os
+from dotenv import load_dotenv
+from ..repository.contractRepository import find_contract, find_contracts, find_contract_space, update_contracts
+from ..repository.clauseVerdictRepository import find_verdicts, save_verdicts
+from ..services.jobManager import job_manager, JobContext, JobCancelled
+from ..ai_agents.scraping import fetch_platforms_async, platforms_for, snapshot_summary
+from ..ai_agents.clauseDiff import plan_clause_checks, parse_verdicts, VERDICTS
+from ..utils.logger import get_logger
+
+# Load environment variables
+load_dotenv()
+
+logger = get_logger("agents")
+
+# Job kinds for a crew run over one contract and over many
+CONTRACT_AGENT_JOB = "contract_agent"
+CONTRACT_BATCH_AGENT_JOB = "contract_agent_batch"
+
+# Crews running at once per batch, and changed clauses sent to one crew
+AGENT_CREW_WORKERS = int(os.getenv("AGENT_CREW_WORKERS", "4"))
+CLAUSE_CHECK_BATCH = int(os.getenv("CLAUSE_CHECK_BATCH", "20"))
+AGENT_BATCH_MAX_CONTRACTS = int(os.getenv("AGENT_BATCH_MAX_CONTRACTS", "1000"))
+
+CONTRACT_CHECK_PROJECTION = {"terms": 1, "plartform": 1}
+
+
+def _crew_runner():
+    """
+    crewai is imported on the first agent run, not at startup,
+    so workers that never run agents don't load them
+
+    :return: ai_agents.crew.run_clause_check_crew
+    """
+    from ..ai_agents.crew import run_clause_check_crew
+    return run_clause_check_crew
+
+
+async def _check_clauses(items, ctx: JobContext):
+    """
+    Sends changed clauses to the legal expert in batches, running up to
+    AGENT_CREW_WORKERS crews in parallel threads. Verdicts are saved as each
+    batch finishes, so a cancelled or failed run keeps the work already done.
+
+    :param items: Unique clause check items (one per fingerprint)
+    :return: Dict of fingerprint -> verdict
+    """
+    batches = [items[start:start + CLAUSE_CHECK_BATCH] for start in range(0, len(items), CLAUSE_CHECK_BATCH)]
+    slots = asyncio.Semaphore(AGENT_CREW_WORKERS)
+    verdicts = {}
+    done = 0
+
+    async def run(batch):
+        nonlocal done
+        async with slots:
+            ctx.check_cancelled()
+            # Number the clauses within the batch; they may come from different contracts
+            sent = [{**item, "index": number} for number, item in enumerate(batch)]
+            output = await asyncio.to_thread(_crew_runner(), sent)
+        fresh = [{"fingerprint": batch[number]["fingerprint"], "clause": batch[number]["clause"], **verdict}
+                 for number, verdict in parse_verdicts(output, sent).items()]
+        await save_verdicts(fresh)
+        verdicts.update((verdict["fingerprint"], verdict) for verdict in fresh)
+        done += 1
+        await ctx.progress(0.4 + 0.5 * done / len(batches), f"Checked {done}/{len(batches)} clause batches")
+
+    outcomes = await asyncio.gather(*(run(batch) for batch in batches), return_exceptions=True)
+    for outcome in outcomes:
+        if isinstance(outcome, JobCancelled):
+            raise outcome
+        if isinstance(outcome, Exception):
+            # Those clauses stay unverdicted and uncached; the next run retries them
+            logger.error("Clause check batch failed", extra={"error": str(outcome)})
+    return verdicts
+
+
+async def check_contracts(contracts, ctx: JobContext):
+    """
+    Checks contracts' clauses against their platforms' terms. Each platform is
+    fetched once for all contracts that target it, identical clause/passage
+    pairs are checked once, and only clauses without a cached verdict reach
+    the legal expert.
+
+    :param contracts: Contract documents with terms and plartform
+    :param ctx: Job context for progress and cancellation
+    :return: (list of per-contract results, snapshots used)
+    """
+    contract_platforms = {str(contract["_id"]): platforms_for(contract.get("plartform")) for contract in contracts}
+    wanted = sorted({name for names in contract_platforms.values() for name in names})
+    snapshots = await fetch_platforms_async(wanted)
+    if not snapshots:
+        raise ValueError("No platform terms could be fetched")
+    await ctx.progress(0.2, f"Fetched terms for {', '.join(snapshots)}")
+
+    plans = {}
+    for contract in contracts:
+        contract_id = str(contract["_id"])
+        own = {name: snapshots[name] for name in contract_platforms[contract_id] if name in snapshots}
+        plans[contract_id] = plan_clause_checks(contract.get("terms"), own or snapshots)
+
+    cached = await find_verdicts({item["fingerprint"] for plan in plans.values() for item in plan})
+    changed = {}
+    for plan in plans.values():
+        for item in plan:
+            if item["fingerprint"] not in cached:
+                changed.setdefault(item["fingerprint"], item)
+    await ctx.progress(0.4, f"{len(changed)} changed clauses to check")
+    fresh = await _check_clauses(list(changed.values()), ctx) if changed else {}
+
+    results = []
+    checks = {}
+    checked_at = datetime.now(timezone.utc)
+    for contract_id, plan in plans.items():
+        clauses = []
+        for item in plan:
+            verdict = cached.get(item["fingerprint"]) or fresh.get(item["fingerprint"]) \
+                or {"verdict": "unclear", "reason": "No verdict returned"}
+            clauses.append({
+                "index": item["index"],
+                "clause": item["clause"],
+                "verdict": verdict["verdict"],
+                "reason": verdict.get("reason", ""),
+                "reused": item["fingerprint"] in cached
+            })
+        counts = {verdict: sum(1 for clause in clauses if clause["verdict"] == verdict) for verdict in sorted(VERDICTS)}
+        checks[contract_id] = {"terms_check": {
+            "counts": counts,
+            "snapshots": {name: snapshots[name].version for name in contract_platforms[contract_id] if name in snapshots},
+            "checked_at": checked_at
+        }}
+        results.append({
+            "contract_id": contract_id,
+            "clauses": clauses,
+            "counts": counts,
+            "checked": sum(1 for clause in clauses if not clause["reused"]),
+            "reused": sum(1 for clause in clauses if clause["reused"])
+        })
+    # Every contract's check summary is written in one round trip
+    await update_contracts(checks)
+    return results, snapshots
+
+
+async def run_contract_agent(params: dict, ctx: JobContext):
+    """
+    Job handler that checks one contract's clauses against its platform's terms.
+    Only clauses whose text or relevant platform passages changed are sent to
+    the legal expert; the rest reuse their cached verdicts.
+
+    :param params: Job parameters with contract_id
+    :param ctx: Job context for progress and cancellation
+    :return: Per-clause verdicts
+    """
+    contract_id = params["contract_id"]
+    contract = await find_contract(contract_id, CONTRACT_CHECK_PROJECTION)
+    if not contract:
+        raise ValueError(f"Contract {contract_id} not found")
+    await ctx.progress(0.1, f"Loaded contract {contract_id}")
+
+    results, snapshots = await check_contracts([contract], ctx)
+    return {**results[0], "snapshots": [snapshot_summary(snapshot) for snapshot in snapshots.values()]}
+
+
+async def run_contract_batch_agent(params: dict, ctx: JobContext):
+    """
+    Job handler that checks many contracts in one run
+
+    :param params: Job parameters with contract_ids
+    :param ctx: Job context for progress and cancellation
+    :return: Per-contract verdict counts and breached clauses
+    """
+    contracts = await find_contracts(params["contract_ids"], CONTRACT_CHECK_PROJECTION)
+    await ctx.progress(0.1, f"Loaded {len(contracts)} contracts")
+    found = {str(contract["_id"]) for contract in contracts}
+    results, snapshots = await check_contracts(contracts, ctx) if contracts else ([], {})
+
+    # Keep the stored job result small: breaches only, full verdicts are per-contract runs
+    return {
+        "contracts": [
+            {
+                "contract_id": result["contract_id"],
+                "counts": result["counts"],
+                "checked": result["checked"],
+                "reused": result["reused"],
+                "breaches": [clause for clause in result["clauses"] if clause["verdict"] == "breach"]
+            }
+            for result in results
+        ],
+        "missing": [contract_id for contract_id in params["contract_ids"] if contract_id not in found],
+        "checked": sum(result["checked"] for result in results),
+        "reused": sum(result["reused"] for result in results),
+        "snapshots": [snapshot_summary(snapshot) for snapshot in snapshots.values()]
+    }
+
+
+job_manager.register(CONTRACT_AGENT_JOB, run_contract_agent)
+job_manager.register(CONTRACT_BATCH_AGENT_JOB, run_contract_batch_agent)
+
+
+async def initiate_agent(contract_id: str):
+    """
+    Queues a crew run for a contract
+
+    :param contract_id: Contract ID
+    :return: Agent status
+    """
+    contract = await find_contract(contract_id, {"_id": 1})
+    if not contract:
+        raise HTTPException(status_code=404, detail="Contract not found")
+    try:
+        return await job_manager.submit(CONTRACT_AGENT_JOB, {"contract_id": contract_id})
+    except asyncio.QueueFull:
+        raise HTTPException(status_code=503, detail="Agent queue is full, retry later")
+
+
+async def initiate_batch_agent(contract_ids=None, contract_space_id: str = None):
+    """
+    Queues one crew run over many contracts
+
+    :param contract_ids: Contract IDs to check
+    :param contract_space_id: Check every contract in this space instead
+    :return: Agent status
+    """
+    if contract_space_id:
+        space = await find_contract_space(contract_space_id, {"contracts": 1})
+        if not space:
+            raise HTTPException(status_code=404, detail="Contract space not found")
+        contract_ids = space.get("contracts", [])
+    contract_ids = list(dict.fromkeys(str(contract_id) for contract_id in contract_ids or []))
+    if not contract_ids:
+        raise HTTPException(status_code=400, detail="No contracts to check")
+    if len(contract_ids) > AGENT_BATCH_MAX_CONTRACTS:
+        raise HTTPException(status_code=413, detail=f"At most {AGENT_BATCH_MAX_CONTRACTS} contracts per batch")
+    try:
+        return await job_manager.submit(CONTRACT_BATCH_AGENT_JOB, {"contract_ids": contract_ids})
+    except asyncio.QueueFull:
+        raise HTTPException(status_code=503, detail="Agent queue is full, retry later")
+
+
+async def get_agent_status(agent_id: str):
+    """
+    Gets the status of an agent run
+
+    :param agent_id: Agent (job) ID
+    :return: Agent status
+    """
+    status = await job_manager.get(agent_id)
+    if not status:
+        raise HTTPException(status_code=404, detail="Agent not found")
+    return status
+
+
+async def cancel_agent(agent_id: str):
+    """
+    Cancels a queued or running agent
+
+    :param agent_id: Agent (job) ID
+    :return: Agent status
+    """
+    status = await job_manager.cancel(agent_id)
+    if not status:
+        raise HTTPException(status_code=404, detail="Agent not found")
+    return status
@@ -1,28 +1,29 @@
-from passlib.context import CryptContext
 from fastapi import HTTPException, Response
+from pymongo.errors import DuplicateKeyError
 import os
 from dotenv import load_dotenv
 import jwt
 import datetime
-from ..config.database import users_collection
+from ..repository.userRepository import find_user_by_email, insert_user, update_user_password
+from ..repository.contractRepository import find_contract_spaces
 from ..models.Model import UserModel, LoginModel
-
-from fastapi import Request
-from ..middleware.authMiddleware import verify_access_token
-from bson import ObjectId
-from ..config.database import contract_spaces_collection, contracts_collection
+from ..services.passwordHasher import password_hasher
+from ..services.contractSummaries import summaries_for
+from ..utils.logger import get_logger
 
 # Load environment variables
 load_dotenv()
 
-# Password hashing configuration
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+logger = get_logger("auth")
 
 # JWT configuration
 SECRET_KEY = os.getenv("JWT_KEY")  # Fixed variable name to match middleware
 ALGORITHM = os.getenv("JWT_ALGORITHM")
 ACCESS_TOKEN_EXPIRE_MINUTES = 60*24*7  # 7 days
 
+# Only the fields the dashboard returns
+CONTRACT_SPACE_PROJECTION = {"name": 1, "contracts": 1, "summaries": 1}
+
 def create_access_token(data: dict, expires_delta: int = ACCESS_TOKEN_EXPIRE_MINUTES):
     """
     Creates a JWT token with expiration time
@@ -49,20 +50,23 @@ async def user_registration(user: UserModel):
     """
     try:
         # Check if user already exists
-        existing_user = users_collection.find_one({"email": user.email})
+        existing_user = await find_user_by_email(user.email)
         if existing_user:
             raise HTTPException(status_code=400, detail="Email already exists")
 
         # Hash password before storing
-        hashed_password = pwd_context.hash(user.password)
+        hashed_password = await password_hasher.hash(user.password)
         
         # Convert Pydantic model to dict and update password
         user_data = {**user.dict(), "password": hashed_password}
         
-        # Insert user into MongoDB
-        new_user = users_collection.insert_one(user_data)
+        # Insert user into MongoDB; the unique email index catches a concurrent registration
+        try:
+            new_user_id = await insert_user(user_data)
+        except DuplicateKeyError:
+            raise HTTPException(status_code=400, detail="Email already exists")
         
-        return {"message": "User registered successfully", "user_id": str(new_user.inserted_id)}
+        return {"message": "User registered successfully", "user_id": new_user_id}
     except HTTPException:
         # Re-raise HTTP exceptions
         raise
@@ -80,19 +84,22 @@ async def user_signin(response: Response, user: LoginModel):
     """
     try:
         # Find user by email
-        existing_user = users_collection.find_one({"email": user.email})
+        existing_user = await find_user_by_email(user.email)
         if not existing_user:
             raise HTTPException(status_code=401, detail="Invalid credentials")
         
         # Verify password
-        verify_password = pwd_context.verify(user.password, existing_user["password"])
+        verify_password, new_hash = await password_hasher.verify_and_update(user.password, existing_user["password"])
         if not verify_password:
             raise HTTPException(status_code=401, detail="Invalid credentials")
+
+        # Upgrade hashes made with old cost parameters
+        if new_hash:
+            await update_user_password(existing_user["_id"], new_hash)
             
         # Create JWT token
         access_token = create_access_token({"sub": user.email})
 
-        print(access_token)
         # Store token in HTTP-only cookie
         response.set_cookie(key="access_token", value=access_token, httponly=True)
 
@@ -103,7 +110,7 @@ async def user_signin(response: Response, user: LoginModel):
         raise
     except Exception as e:
         # Handle other exceptions
-        print (e)
+        logger.error("Sign-in failed", extra={"error": str(e)})
         raise HTTPException(status_code=500, detail=f"Authentication error: {str(e)}")
 
 async def user_signout(response: Response):
@@ -117,78 +124,70 @@ async def user_signout(response: Response):
     return {"message": "Logged out successfully"}
 
 
-async def get_user_details(request: Request):
+async def build_user_info(user: dict):
+    """
+    Builds the user dashboard payload from the contract summaries stored on
+    the user's spaces: one query, plus one for any contracts whose summary
+    is missing (spaces written before summaries existed)
+
+    :param user: Authenticated user document
+    :return: Aggregated user data with contract spaces and contracts
+    """
+    # Create user info dict without sensitive data
+    user_info = {
+        "user_id": user["_id"],
+        "email": user["email"],
+        "contract_spaces": []
+    }
+
+    # Get all contract spaces for this user, with their summaries, in one query
+    contract_space_ids = user.get("contractSpace", [])
+    spaces = await find_contract_spaces(contract_space_ids, CONTRACT_SPACE_PROJECTION)
+    spaces_by_id = {str(space["_id"]): space for space in spaces}
+
+    # Fall back to the contracts collection only for unsummarized contracts
+    missing = [str(contract_id) for space in spaces for contract_id in space.get("contracts", [])
+               if str(contract_id) not in (space.get("summaries") or {})]
+    fallback = await summaries_for(missing) if missing else {}
+
+    # Keep the order in which spaces and contracts were added
+    for space_id in contract_space_ids:
+        space = spaces_by_id.get(str(space_id))
+        if not space:
+            continue
+
+        space_info = {
+            "space_id": space["_id"],
+            "name": space["name"],
+            "contracts": []
+        }
+
+        summaries = space.get("summaries") or {}
+        for contract_id in space.get("contracts", []):
+            summary = summaries.get(str(contract_id)) or fallback.get(str(contract_id))
+            if summary:
+                space_info["contracts"].append({
+                    "contract_id": str(contract_id),
+                    "title": summary.get("title") or "Untitled",
+                    "parties": summary.get("parties") or [],
+                    "status": summary.get("status") or "Unknown",
+                    "platform": summary.get("platform") or ""
+                })
+
+        user_info["contract_spaces"].append(space_info)
+
+    return user_info
+
+
+async def get_user_details(user: dict):
     """
     Get authenticated user details including all contract spaces and their contracts
     
-    :param request: FastAPI request object with access token
+    :param user: Authenticated user from the get_current_user dependency
     :return: Aggregated user data with contract spaces and contracts
     """
     try:
-        # Verify user authentication using access token
-        user = await verify_access_token(request)
-        if not user:
-            raise HTTPException(status_code=401, detail="Not authenticated")
-        
-        # Create user info dict without sensitive data
-        user_info = {
-            "user_id": str(user["_id"]),
-            "email": user["email"],
-            "contract_spaces": []
-        }
-        
-        print(user_info)
-        # Get all contract spaces for this user
-        contract_space_ids = user.get("contractSpace", [])
-        
-        # Fetch each contract space and its contracts
-        for space_id in contract_space_ids:
-            try:
-                # Convert string ID to ObjectId if needed
-                space_obj_id = ObjectId(space_id) if not isinstance(space_id, ObjectId) else space_id
-                
-                # Find the contract space
-                space =  contract_spaces_collection.find_one({"_id": space_obj_id})
-                
-                if space:
-                    # Create contract space info without _id field
-                    space_info = {
-                        "space_id": str(space["_id"]),
-                        "name": space["name"],
-                        "contracts": []
-                    }
-                    
-                    # Get all contracts for this space
-                    contract_ids = space.get("contracts", [])
-                    
-                    # Fetch each contract
-                    for contract_id in contract_ids:
-                        try:
-                            # Convert string ID to ObjectId if needed
-                            contract_obj_id = ObjectId(contract_id) if not isinstance(contract_id, ObjectId) else contract_id
-                            
-                            # Find the contract
-                            contract =  contracts_collection.find_one({"_id": contract_obj_id})
-                            
-                            if contract:
-                                # Create contract info
-                                contract_info = {
-                                    "contract_id": str(contract["_id"]),
-                                    "title": contract.get("title", "Untitled"),
-                                    "parties": contract.get("parties", []),
-                                    "status": contract.get("status", "Unknown"),
-                                    "platform": contract.get("plartform", "")  # Note the misspelling in the model
-                                }
-                                
-                                space_info["contracts"].append(contract_info)
-                        except Exception as contract_err:
-                            print(f"Error fetching contract {contract_id}: {str(contract_err)}")
-                    
-                    user_info["contract_spaces"].append(space_info)
-            except Exception as space_err:
-                print(f"Error fetching contract space {space_id}: {str(space_err)}")
-        
-        return user_info
+        return await build_user_info(user)
     
     except HTTPException:
         # Re-raise HTTP exceptions
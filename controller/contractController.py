@@ -1,185 +1,225 @@
-from fastapi import File, UploadFile, HTTPException, Request
+from fastapi import File, UploadFile, HTTPException
 from pathlib import Path
-from tempfile import NamedTemporaryFile
-import pdfplumber
-import shutil
+from typing import List
+import asyncio
+import uuid
 import os
 from dotenv import load_dotenv
-from bson import ObjectId
-import asyncio
-import google.generativeai as genai
-from ..config.database import contract_spaces_collection, users_collection, contracts_collection  # Fixed variable names
-from ..models.Model import contractSpaceModel
-from ..middleware.authMiddleware import verify_access_token
+from ..repository.contractRepository import (
+    insert_contract_space,
+    find_contract_space,
+    update_contract_space as update_contract_space_fields,
+    link_contract_to_space,
+    insert_contract,
+    find_contract,
+    find_contracts_page,
+    update_contract,
+    delete_contract_by_id,
+    set_contract_summary,
+    unlink_contract_from_spaces
+)
+from ..repository.userRepository import push_contract_space
+from ..models.Model import contractSpaceModel, ContractMetadataModel
+from ..middleware.authMiddleware import invalidate_user
+from ..services.ingestionPipeline import (
+    ingestion_pipeline,
+    save_upload,
+    unpack_zip,
+    INGESTION_JOB,
+    BULK_INGESTION_JOB,
+    BULK_MAX_FILES
+)
+from ..services.jobManager import job_manager
+from ..services.extractionCache import extraction_cache
+from ..services.contractSummaries import contract_summary, SUMMARY_PROJECTION, SUMMARY_SOURCE_FIELDS
+from ..apiFeatures.search import index_contract_space, index_contract, link_contract_space, remove_contract
+from ..services.clauseIndexing import index_clauses, unindex_clauses
+from ..utils.logger import get_logger
 
 # Load environment variables
 load_dotenv()
 
-# Configure Gemini API
-API_KEY = os.getenv("GOOGLE_API_KEY")
-genai.configure(api_key=API_KEY)
+logger = get_logger("contracts")
 
 # Set upload directory
 UPLOAD_DIR = Path("uploads")
 UPLOAD_DIR.mkdir(parents=True, exist_ok=True)  # Ensure directory exists
 
-def extract_text_from_pdf(pdf_path):
-    """
-    Extracts text content from a PDF file
-    
-    :param pdf_path: Path to the PDF file
-    :return: Extracted text as a string
-    """
-    try:
-        text = ""
-        with pdfplumber.open(pdf_path) as pdf:
-            for page in pdf.pages:
-                text += page.extract_text() + "\n"
-        return text.strip() if text else "No text found in PDF."
-    except Exception as e:
-        print(f"PDF extraction error: {str(e)}")
-        return f"Error extracting PDF: {str(e)}"
-
-def process_with_gemini(text):
-    """
-    Processes text with Google's Gemini API
-    
-    :param text: Text to process
-    :return: Gemini API response
-    """
-    try:
-        model = genai.GenerativeModel("gemini-1.5-flash")
-        response = model.generate_content(f"Give the detail exactly in JSON format: {text}")
-        return response.text
-    except Exception as e:
-        print(f"Gemini API error: {str(e)}")
-        return f"Error processing with Gemini: {str(e)}"
+# Pagination for contract listings
+DEFAULT_PAGE_SIZE = int(os.getenv("CONTRACTS_PAGE_SIZE", "50"))
+MAX_PAGE_SIZE = int(os.getenv("CONTRACTS_MAX_PAGE_SIZE", "500"))
 
+# Fields that can be requested through a projection
+CONTRACT_FIELDS = set(ContractMetadataModel.__fields__)
 
 
 async def upload_contracts(contract_space_id: str, file: UploadFile = File(...)):
     """
-    Uploads a contract PDF file and processes it with Gemini
+    Uploads a contract PDF file and queues it for extraction and processing
     
     :param contract_space_id: ID of the contract space to add the contract to
     :param file: Uploaded PDF file
-    :return: Processed contract data
+    :return: Ingestion job ID to poll for the result
     """
+    temp_file_path = UPLOAD_DIR / f"temp_{uuid.uuid4().hex}_{Path(file.filename or 'upload.pdf').name}"
     try:
-        # Create a temporary file path
-        temp_file_path = UPLOAD_DIR / f"temp_{file.filename}"
-        
-        # Save the upload file to the temporary location
-        with open(temp_file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-        
-        # Make sure the file is closed before processing
-        file.file.close()
-        
-        # Extract text from PDF
-        extracted_text = extract_text_from_pdf(temp_file_path)
-        
-        # Process text with Gemini API
-        gemini_response = process_with_gemini(extracted_text)
-        
-        # Create dummy contract data
-        dummy_contract = {
-            "id": "contract_12345",
-            "title": "Service Agreement",
-            "parties": ["Company A", "Company B"],
-            "effective_date": "2025-01-01",
-            "expiration_date": "2026-01-01",
-            "terms": [
-                {
-                    "clause": "Payment Terms",
-                    "description": "Payment must be made within 30 days of invoice."
-                },
-                {
-                    "clause": "Confidentiality",
-                    "description": "Both parties agree to keep all shared information confidential."
-                }
-            ],
-            "status": "Active",
-            "plartform": "www.youtube.com"
-        }
-        
-        # Convert to ContractMetadataModel instance and then to dict for DB storage
-        from ..models.Model import ContractMetadataModel
-        from bson import ObjectId
-        
-        contract_model = ContractMetadataModel(**dummy_contract)
-        
-        # Save to database
-        contract_dict = contract_model.dict()
-        new_contract = contracts_collection.insert_one(contract_dict)
-        contract_id = str(new_contract.inserted_id)
-        
-        # Print for debugging
-        print(f"Contract ID: {contract_id}")
-        print(f"Contract Space ID: {contract_space_id}")
-        
-        # Convert string ID to ObjectId for MongoDB query
-        try:
-            space_id = ObjectId(contract_space_id)
-        except:
-            space_id = contract_space_id  # Keep as string if it's not a valid ObjectId
-        
-        # Update the contract space to include this contract
-        update_result = contract_spaces_collection.update_one(
-            {"_id": space_id},
-            {"$push": {"contracts": contract_id}}
-        )
-        
-        print(f"Update result: {update_result.modified_count} document(s) modified")
-        
-        # Clean up temp file after processing
-        if os.path.exists(temp_file_path):
+        # Stream the upload to a temporary location
+        content_hash = await save_upload(file, temp_file_path)
+
+        # Same file seen before: reuse its extraction instead of re-running pdfplumber and the LLM
+        cached = await extraction_cache.lookup(content_hash)
+        if cached is not None:
             os.unlink(temp_file_path)
+            contract_id = await link_cached_contract(cached, content_hash, contract_space_id)
+            return {
+                "message": "Contract already processed, linked existing extraction",
+                "contract_id": contract_id,
+                "contract_space_id": contract_space_id,
+                "status": "completed",
+                "cached": True
+            }
+        
+        # Hand the file to the ingestion pipeline and return immediately
+        job = await ingestion_pipeline.submit(contract_space_id, temp_file_path, file.filename, content_hash)
         
         return {
-            "message": "Contract uploaded successfully",
-            "contract_id": contract_id,
+            "message": "Contract upload accepted",
+            "job_id": job.id,
             "contract_space_id": contract_space_id,
-            "update_result": {
-                "acknowledged": update_result.acknowledged,
-                "modified_count": update_result.modified_count
-            }
+            "status": job.status
         }
         
     except Exception as e:
         # Ensure file cleanup in case of error
-        if 'temp_file_path' in locals() and os.path.exists(temp_file_path):
+        if os.path.exists(temp_file_path):
             try:
                 os.unlink(temp_file_path)
-            except:
+            except OSError:
                 pass  # Ignore errors during cleanup
-        print(f"Error: {str(e)}")
+        if isinstance(e, HTTPException):
+            raise
+        logger.error("Contract request failed", extra={"error": str(e)})
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+async def upload_contracts_bulk(contract_space_id: str, files: List[UploadFile]):
+    """
+    Uploads many contract PDFs (or zip archives of PDFs) and processes them as one batch
+    
+    :param contract_space_id: ID of the contract space to add the contracts to
+    :param files: Uploaded PDF and/or zip files
+    :return: Job ID whose result lists the outcome per file
+    """
+    items = []
+    try:
+        for file in files:
+            name = Path(file.filename or "upload.pdf").name
+            temp_file_path = UPLOAD_DIR / f"temp_{uuid.uuid4().hex}_{name}"
+            content_hash = await save_upload(file, temp_file_path)
+
+            if name.lower().endswith(".zip"):
+                try:
+                    items.extend(await asyncio.to_thread(
+                        unpack_zip, temp_file_path, UPLOAD_DIR, BULK_MAX_FILES - len(items)
+                    ))
+                except ValueError as e:
+                    raise HTTPException(status_code=400, detail=f"Invalid archive {name}: {str(e)}")
+                finally:
+                    os.unlink(temp_file_path)
+            else:
+                items.append({"filename": name, "file_path": str(temp_file_path), "content_hash": content_hash})
+
+            if len(items) > BULK_MAX_FILES:
+                raise HTTPException(status_code=413, detail=f"At most {BULK_MAX_FILES} files per batch")
+
+        if not items:
+            raise HTTPException(status_code=400, detail="No PDF files in upload")
+
+        job = await job_manager.submit(BULK_INGESTION_JOB, {"contract_space_id": contract_space_id, "files": items})
+        return {
+            "message": "Contract batch accepted",
+            "job_id": job.id,
+            "contract_space_id": contract_space_id,
+            "file_count": len(items),
+            "status": job.status
+        }
+    except Exception as e:
+        # Nothing was queued, so remove everything saved so far
+        for item in items:
+            if os.path.exists(item["file_path"]):
+                os.unlink(item["file_path"])
+        if isinstance(e, HTTPException):
+            raise
+        if isinstance(e, asyncio.QueueFull):
+            raise HTTPException(status_code=503, detail="Job queue is full, retry later")
+        logger.error("Contract request failed", extra={"error": str(e)})
         raise HTTPException(status_code=500, detail=str(e))
+
+
+async def link_cached_contract(cached: dict, content_hash: str, contract_space_id: str):
+    """
+    Links a previously extracted contract into a space, re-creating the
+    contract from the cached metadata if the original was deleted
+
+    :param cached: Extraction cache entry
+    :param content_hash: SHA-256 of the upload
+    :param contract_space_id: Contract space to link into
+    :return: Contract ID
+    """
+    contract_id = cached.get("contract_id")
+    contract = await find_contract(contract_id, SUMMARY_PROJECTION) if contract_id else None
+    if not contract:
+        contract = cached["metadata"]
+        contract_id = await insert_contract(dict(contract))
+        await extraction_cache.link_contract(content_hash, contract_id)
+        await index_contract({**contract, "_id": contract_id}, [contract_space_id])
+        await index_clauses([(contract_id, contract.get("terms"))])
+    else:
+        await link_contract_space(contract_id, contract_space_id)
+
+    await link_contract_to_space(contract_space_id, contract_id, contract_summary(contract))
+    return contract_id
+
+
+async def get_extraction_cache_stats():
+    """
+    Gets extraction cache hit/miss counters for this worker
+    
+    :return: Cache statistics
+    """
+    return extraction_cache.stats()
+
+
+async def get_ingestion_job(job_id: str):
+    """
+    Gets the status of a contract ingestion job
     
-async def create_contract_space(details: contractSpaceModel, request: Request):
+    :param job_id: Job ID returned by upload_contracts
+    :return: Job status and, once completed, the stored contract
+    """
+    job = await job_manager.get(job_id)
+    if not job or job.kind not in (INGESTION_JOB, BULK_INGESTION_JOB):
+        raise HTTPException(status_code=404, detail="Ingestion job not found")
+    return job
+
+
+async def create_contract_space(details: contractSpaceModel, user: dict):
     """
     Creates a new contract space
     
     :param details: Contract space details
-    :param request: FastAPI request object for auth
+    :param user: Authenticated user from the get_current_user dependency
     :return: Success message and contract space ID
     """
     try:
-        # Verify user authentication
-        user = await verify_access_token(request) 
-        if not user:
-            raise HTTPException(status_code=401, detail="Not Authenticated")
-        
         # Create contract space
         contract_space_data = details.dict()
-        new_space = contract_spaces_collection.insert_one(contract_space_data)# Fixed variable name
-        new_space_id = str(new_space.inserted_id)
+        new_space_id = await insert_contract_space(contract_space_data)
+        await index_contract_space(contract_space_data)
         
         # Update user document to include contract space ID
-        users_collection.update_one(
-    {"_id": user["_id"]}, 
-    {"$push": {"contractSpace": new_space_id}}
-)
+        await push_contract_space(user["_id"], new_space_id)
+        invalidate_user(user["email"])
 
         return {"message": "Contract space created successfully", "contract_space_id": new_space_id}
     except HTTPException:
@@ -189,54 +229,48 @@ async def create_contract_space(details: contractSpaceModel, request: Request):
         # Handle other exceptions
         raise HTTPException(status_code=500, detail=f"Error creating contract space: {str(e)}")
 
-async def get_contracts_by_space_id(space_id: str):
+async def get_contracts_by_space_id(space_id: str, fields: str = None, limit: int = DEFAULT_PAGE_SIZE, after: str = None):
     """
-    Gets contracts under a particular space
+    Gets one page of contracts under a particular space
     
     :param space_id: Contract space ID
-    :return: List of contracts
+    :param fields: Optional comma-separated list of contract fields to return
+    :param limit: Page size
+    :param after: Cursor returned as next_cursor by the previous page
+    :return: List of contracts and the cursor for the next page
     """
     try:
-        print(f"Looking for space with ID: {space_id}")
+        logger.debug("Looking up contract space", extra={"space_id": space_id})
+
+        # Build the projection from the requested fields
+        projection = None
+        if fields:
+            requested = [field.strip() for field in fields.split(",") if field.strip()]
+            unknown = [field for field in requested if field not in CONTRACT_FIELDS]
+            if unknown:
+                raise HTTPException(status_code=400, detail=f"Unknown contract fields: {', '.join(unknown)}")
+            projection = {field: 1 for field in requested}
+
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
         
-        # Convert string ID to ObjectId for MongoDB query
-        try:
-            # Try to convert to ObjectId if it's in the correct format
-            space_obj_id = ObjectId(space_id)
-        except:
-            # If conversion fails, keep as string
-            space_obj_id = space_id
-            
         # Find the contract space
-        space = contract_spaces_collection.find_one({"_id": space_obj_id})
+        space = await find_contract_space(space_id, {"contracts": 1})
         
         if not space:
             raise HTTPException(status_code=404, detail="Contract space not found")
             
-        # Get contracts for this space
-        contract_ids = space.get("contracts", [])
-        contracts = []
-        
-        for contract_id in contract_ids:
-            try:
-                # Try to convert to ObjectId if it's in the correct format
-                contract_obj_id = ObjectId(contract_id) if not isinstance(contract_id, ObjectId) else contract_id
-                
-                # Find the contract
-                contract = contracts_collection.find_one({"_id": contract_obj_id})
-                if contract:
-                    # Convert ObjectId to string for JSON serialization
-                    contract["_id"] = str(contract["_id"])
-                    contracts.append(contract)
-            except Exception as contract_err:
-                print(f"Error fetching contract {contract_id}: {str(contract_err)}")
+        # Fetch this page of contracts in a single query
+        # Raw documents: the ContractPageResponse model turns ObjectIds into strings while serializing
+        contracts = await find_contracts_page(space.get("contracts", []), after, limit, projection)
+
+        next_cursor = contracts[-1]["_id"] if len(contracts) == limit else None
                 
-        return {"message": "Contracts retrieved successfully", "contracts": contracts}
+        return {"message": "Contracts retrieved successfully", "contracts": contracts, "next_cursor": next_cursor}
     except HTTPException:
         # Re-raise HTTP exceptions
         raise
     except Exception as e:
-        print(f"Error in get_contracts_by_space_id: {str(e)}")
+        logger.error("get_contracts_by_space_id failed", extra={"space_id": space_id, "error": str(e)})
         raise HTTPException(status_code=500, detail=str(e))
     
 
@@ -249,35 +283,26 @@ async def update_contract_space(space_id: str, details: dict):
     :return: Success message
     """
     try:
-        # Convert string ID to ObjectId for MongoDB query
-        from bson import ObjectId
-        try:
-            # Try to convert to ObjectId if it's in the correct format
-            space_obj_id = ObjectId(space_id)
-        except:
-            # If conversion fails, keep as string
-            space_obj_id = space_id
-            
-        print(f"Updating space with ID: {space_obj_id}")
-        print(f"Update details: {details}")
+        logger.debug("Updating contract space", extra={"space_id": space_id, "details": details})
         
-        # Remove await since contract_spaces_collection.update_one is synchronous
-        result = contract_spaces_collection.update_one(
-            {"_id": space_obj_id},
-            {"$set": details}
-        )
+        result = await update_contract_space_fields(space_id, details)
         
-        print(f"Update result: {result.matched_count} document(s) matched, {result.modified_count} document(s) modified")
+        logger.debug("Update result", extra={"matched": result.matched_count, "modified": result.modified_count})
         
         if result.matched_count == 0:
             raise HTTPException(status_code=404, detail="Contract space not found")
+
+        # Keep the search index in step with renamed spaces
+        space = await find_contract_space(space_id, {"name": 1})
+        if space:
+            await index_contract_space(space)
             
         return {"message": "Contract space updated successfully"}
     except HTTPException:
         # Re-raise HTTP exceptions
         raise
     except Exception as e:
-        print(f"Error in update_contract_space: {str(e)}")
+        logger.error("update_contract_space failed", extra={"space_id": space_id, "error": str(e)})
         raise HTTPException(status_code=500, detail=str(e))
     
 
@@ -291,30 +316,29 @@ async def update_contract_metadata(contract_id: str, metadata: dict):
     :return: Success message
     """
     try:
-        # Convert string ID to ObjectId for MongoDB query
-        try:
-            contract_obj_id = ObjectId(contract_id)
-        except:
-            contract_obj_id = contract_id
-        
-        print(f"Updating contract with ID: {contract_obj_id}")
-        print(f"Update metadata: {metadata}")
+        logger.debug("Updating contract", extra={"contract_id": contract_id, "metadata": metadata})
 
-        result = contracts_collection.update_one(
-            {"_id": contract_obj_id},
-            {"$set": metadata}
-        )
+        result = await update_contract(contract_id, metadata)
         
-        print(f"Update result: {result.matched_count} document(s) matched, {result.modified_count} document(s) modified")
+        logger.debug("Update result", extra={"matched": result.matched_count, "modified": result.modified_count})
 
         if result.matched_count == 0:
             raise HTTPException(status_code=404, detail="Contract not found")
+
+        # Re-index the overridden contract
+        contract = await find_contract(contract_id)
+        if contract:
+            await index_contract(contract)
+            if SUMMARY_SOURCE_FIELDS & metadata.keys():
+                await set_contract_summary(contract_id, contract_summary(contract))
+            if "terms" in metadata:
+                await index_clauses([(contract_id, contract.get("terms"))])
             
         return {"message": "Contract metadata updated successfully"}
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error in update_contract_metadata: {str(e)}")
+        logger.error("update_contract_metadata failed", extra={"contract_id": contract_id, "error": str(e)})
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -326,20 +350,18 @@ async def delete_contract(contract_id: str):
     :return: Success message
     """
     try:
-       
-        
-        # Try to convert to ObjectId if it's a valid ID format
-        try:
-            obj_id = ObjectId(contract_id)
-        except:
-            # If conversion fails, use the string as is
-            obj_id = contract_id
-            
-        # Use the converted ID in the query
-        result = contracts_collection.delete_one({"_id": obj_id})
+        result = await delete_contract_by_id(contract_id)
         
         if result.deleted_count == 0:
             raise HTTPException(status_code=404, detail="Contract not found")
+
+        # Drop it from its spaces (and their dashboard summaries)
+        await unlink_contract_from_spaces(contract_id)
+
+        # Keep the cached extraction but stop pointing re-uploads at this contract
+        await extraction_cache.forget_contract(contract_id)
+        await remove_contract(contract_id)
+        await unindex_clauses(contract_id)
             
         return {"message": "Contract deleted successfully"}
     except HTTPException:
@@ -0,0 +1,158 @@
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+from datetime import datetime, timezone
+import csv
+import io
+import json
+import re
+import os
+from dotenv import load_dotenv
+from ..repository.contractRepository import find_contract_spaces, iter_contracts
+from ..utils.logger import get_logger
+
+# Load environment variables
+load_dotenv()
+
+logger = get_logger("export")
+
+# Contract IDs per $in query and documents per cursor batch
+EXPORT_ID_CHUNK = int(os.getenv("EXPORT_ID_CHUNK", "1000"))
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "500"))
+
+# Rows buffered into one chunk of the response body
+EXPORT_ROWS_PER_CHUNK = 200
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv"
+}
+
+CSV_COLUMNS = ["contract_id", "contract_space_id", "title", "parties", "status", "platform",
+               "effective_date", "expiration_date", "terms_count"]
+
+EXPORT_PROJECTION = {"title": 1, "parties": 1, "status": 1, "plartform": 1,
+                     "effective_date": 1, "expiration_date": 1, "terms": 1}
+
+DATE_PATTERN = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+
+def build_export_query(status: str = None, date_from: str = None, date_to: str = None):
+    """
+    Builds the contract filter for an export
+
+    :param status: Only contracts with this status
+    :param date_from: Only contracts effective on or after this date (YYYY-MM-DD)
+    :param date_to: Only contracts effective on or before this date (YYYY-MM-DD)
+    :return: Mongo filter
+    """
+    query = {}
+    if status:
+        query["status"] = status
+    effective = {}
+    for operator, value in (("$gte", date_from), ("$lte", date_to)):
+        if value:
+            if not DATE_PATTERN.match(value):
+                raise HTTPException(status_code=400, detail=f"Invalid date '{value}', expected YYYY-MM-DD")
+            # Dates are stored as ISO strings, so string comparison orders them correctly
+            effective[operator] = value
+    if effective:
+        query["effective_date"] = effective
+    return query
+
+
+def _row(contract: dict, space_id: str):
+    return {
+        "contract_id": str(contract["_id"]),
+        "contract_space_id": space_id,
+        "title": contract.get("title"),
+        "parties": contract.get("parties") or [],
+        "status": contract.get("status"),
+        "platform": contract.get("plartform"),
+        "effective_date": contract.get("effective_date"),
+        "expiration_date": contract.get("expiration_date"),
+        "terms": contract.get("terms") or []
+    }
+
+
+def _ndjson_line(row: dict):
+    return json.dumps(row, default=str) + "\n"
+
+
+def _csv_line(row: dict):
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow([
+        row["contract_id"], row["contract_space_id"], row["title"], "; ".join(row["parties"]),
+        row["status"], row["platform"], row["effective_date"], row["expiration_date"], len(row["terms"])
+    ])
+    return buffer.getvalue()
+
+
+async def stream_export(spaces, query: dict, fmt: str):
+    """
+    Yields export rows space by space, reading contracts through cursors in
+    ID chunks so memory stays constant however many contracts there are
+
+    :param spaces: Contract space documents with their contract IDs
+    :param query: Contract filter
+    :param fmt: "ndjson" or "csv"
+    """
+    format_line = _csv_line if fmt == "csv" else _ndjson_line
+    if fmt == "csv":
+        buffer = io.StringIO()
+        csv.writer(buffer).writerow(CSV_COLUMNS)
+        yield buffer.getvalue()
+
+    lines = []
+    for space in spaces:
+        space_id = str(space["_id"])
+        contract_ids = space.get("contracts", [])
+        for start in range(0, len(contract_ids), EXPORT_ID_CHUNK):
+            async for contract in iter_contracts(contract_ids[start:start + EXPORT_ID_CHUNK], query,
+                                                 EXPORT_PROJECTION, EXPORT_BATCH_SIZE):
+                lines.append(format_line(_row(contract, space_id)))
+                if len(lines) >= EXPORT_ROWS_PER_CHUNK:
+                    yield "".join(lines)
+                    lines = []
+    if lines:
+        yield "".join(lines)
+
+
+async def export_contracts(user: dict, fmt: str = "ndjson", space_id: str = None, status: str = None,
+                           date_from: str = None, date_to: str = None):
+    """
+    Streams the user's contracts as NDJSON or CSV
+
+    :param user: Authenticated user
+    :param fmt: "ndjson" or "csv"
+    :param space_id: Only this contract space (must belong to the user)
+    :param status: Only contracts with this status
+    :param date_from: Earliest effective date (YYYY-MM-DD)
+    :param date_to: Latest effective date (YYYY-MM-DD)
+    :return: StreamingResponse
+    """
+    try:
+        if fmt not in EXPORT_FORMATS:
+            raise HTTPException(status_code=400, detail=f"Unsupported format '{fmt}', use one of: {', '.join(EXPORT_FORMATS)}")
+        query = build_export_query(status, date_from, date_to)
+
+        space_ids = [str(user_space) for user_space in user.get("contractSpace", [])]
+        if space_id:
+            if space_id not in space_ids:
+                raise HTTPException(status_code=404, detail="Contract space not found")
+            space_ids = [space_id]
+
+        # Only the spaces' contract ID lists are held in memory, never the contracts
+        spaces = await find_contract_spaces(space_ids, {"contracts": 1})
+
+        timestamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        return StreamingResponse(
+            stream_export(spaces, query, fmt),
+            media_type=EXPORT_FORMATS[fmt],
+            headers={"Content-Disposition": f'attachment; filename="contracts_{timestamp}.{fmt}"'}
+        )
+    except HTTPException:
+        # Re-raise HTTP exceptions
+        raise
+    except Exception as e:
+        logger.error("Export failed", extra={"error": str(e)})
+        raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,35 @@
+from fastapi import HTTPException
+from fastapi.responses import FileResponse
+from ..services.profiler import profile_store, profiling_enabled, PROFILE_MAX_FILES
+
+# Download content types per profile format
+PROFILE_MEDIA_TYPES = {
+    ".folded": "text/plain; charset=utf-8",
+    ".prof": "application/octet-stream"
+}
+
+
+async def list_profiles():
+    """
+    Lists the profiles kept in the ring buffer
+
+    :return: Profile metadata, newest first
+    """
+    try:
+        profiles = profile_store.list()
+        return {"enabled": profiling_enabled(), "capacity": PROFILE_MAX_FILES, "profiles": profiles}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+async def download_profile(profile_id: str):
+    """
+    Downloads one profile: folded stacks (.folded) or a pstats dump (.prof)
+
+    :param profile_id: Profile ID from the listing or the X-Profile-Id response header
+    :return: FileResponse
+    """
+    path = profile_store.path(profile_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type=PROFILE_MEDIA_TYPES[path.suffix], filename=path.name)
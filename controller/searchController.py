@@ -0,0 +1,50 @@
+from fastapi import HTTPException
+from ..apiFeatures.search import search_contract_spaces
+from ..apiFeatures.semanticSearch import clause_index
+from ..repository.contractRepository import find_contract_spaces
+from ..utils.logger import get_logger
+
+logger = get_logger("search")
+
+
+async def search_user_contracts(user: dict, keyword: str, page: int = 1, page_size: int = 10):
+    """
+    Keyword search over the user's contract spaces and contracts
+
+    :param user: Authenticated user
+    :param keyword: Search terms (prefixes match)
+    :param page: 1-based page number
+    :param page_size: Results per page
+    :return: Ranked results with the page echoed back
+    """
+    try:
+        results = await search_contract_spaces(keyword, user.get("contractSpace", []), page, page_size)
+        return {"results": results, "page": page, "page_size": page_size}
+    except HTTPException:
+        # Re-raise HTTP exceptions
+        raise
+    except Exception as e:
+        logger.error("search_user_contracts failed", extra={"error": str(e)})
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+async def search_user_clauses(user: dict, query: str, k: int = 10):
+    """
+    Semantic search for the clauses closest in meaning to the query across the user's spaces
+
+    :param user: Authenticated user
+    :param query: Natural-language query
+    :param k: Number of clauses to return
+    :return: Matching clauses with similarity scores
+    """
+    try:
+        spaces = await find_contract_spaces(user.get("contractSpace", []), {"contracts": 1})
+        contract_ids = {str(contract_id) for space in spaces for contract_id in space.get("contracts", [])}
+        results = await clause_index.search_async(query, contract_ids, k)
+        return {"results": results}
+    except HTTPException:
+        # Re-raise HTTP exceptions
+        raise
+    except Exception as e:
+        logger.error("search_user_clauses failed", extra={"error": str(e)})
+        raise HTTPException(status_code=500, detail=str(e))
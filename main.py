@@ -1,12 +1,47 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+import asyncio
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
+from .config.database import connect_to_mongo, close_mongo_connection
+from .services.ingestionPipeline import ingestion_pipeline
+from .services.jobManager import job_manager
+from .services.passwordHasher import password_hasher
+from .services.outboundGovernor import governor_stats
+from .config.indexes import ensure_schema
+from .middleware.metricsMiddleware import MetricsMiddleware
+from .middleware.profilingMiddleware import ProfilingMiddleware
+from .services.profiler import profiling_enabled
+from .utils.metrics import render_metrics, refresh_stats_periodically
 from .routes.authRoute import auth
 from .routes.contractRoute import contract_router  # Fixed variable name
+from .routes.agentRoute import agent_router
+from .routes.profileRoute import profile_router
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Opens the shared MongoDB connection pool, job workers and ingestion pipeline for the lifetime of the app"""
+    await connect_to_mongo()
+    migrations_task = await ensure_schema()
+    await job_manager.start()
+    await ingestion_pipeline.start()
+    stats_task = asyncio.create_task(refresh_stats_periodically())
+    yield
+    stats_task.cancel()
+    if migrations_task:
+        migrations_task.cancel()
+        await asyncio.gather(migrations_task, return_exceptions=True)
+    await ingestion_pipeline.stop()
+    await job_manager.stop()
+    password_hasher.shutdown()
+    await close_mongo_connection()
+
 
 # Initialize FastAPI app
 app = FastAPI(title="SentientRolodex API", 
               description="API for contract management and analysis",
-              version="1.0.0")
+              version="1.0.0",
+              lifespan=lifespan)
 
 # Configure CORS
 app.add_middleware(
@@ -17,15 +52,45 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Opt-in request profiling; not installed at all unless PROFILE_ADMIN_TOKEN or PROFILE_SAMPLE_RATE is set
+if profiling_enabled():
+    app.add_middleware(ProfilingMiddleware, router_app=app)
+
+# Per-route latency histograms and in-flight gauges (outermost, so it times the whole request)
+app.add_middleware(MetricsMiddleware, router_app=app)
+
 # Include API routes
 app.include_router(auth, prefix="/api/v1/auth", tags=["Authentication"])
 app.include_router(contract_router, prefix="/api/v1", tags=["Contracts"])
+app.include_router(agent_router, prefix="/api/v1/agents", tags=["Agents"])
+app.include_router(profile_router, prefix="/api/v1/admin/profiles", tags=["Profiling"])
 
 # Root endpoint
 @app.get("/")
 async def read_root():
     return {"message": "Welcome to SentientRolodex API", "status": "running"}
 
+# Outbound call limits
+@app.get("/api/v1/outbound/stats")
+async def outbound_stats():
+    """
+    Gets rate limit, queue depth, rejection and circuit breaker stats per external provider
+
+    :return: Stats for each provider called by this worker
+    """
+    return {"providers": governor_stats()}
+
+# Prometheus scrape endpoint
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """
+    Gets request latency, span, MongoDB command and queue/pool stats metrics in the Prometheus text format
+
+    :return: Prometheus exposition
+    """
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
 # User endpoints
 @app.get("/api/v1/user/{user_id}")
 async def get_user(user_id: str):
@@ -37,26 +102,3 @@ async def get_user(user_id: str):
     """
     # TODO: Implement user retrieval logic
     return {"message": "User retrieval endpoint", "user_id": user_id}
-
-# Agent endpoints
-@app.get("/api/v1/agents/{contact_id}")
-async def initiate_agent(contact_id: str):
-    """
-    Initiates an agent to process a contract
-    
-    :param contact_id: Contract ID
-    :return: Agent status
-    """
-    # TODO: Implement agent initiation logic
-    return {"message": "Agent initiated", "contact_id": contact_id}
-
-@app.get("/api/v1/agents/status/{agent_id}")
-async def get_agent_status(agent_id: str):
-    """
-    Gets the status of a running agent
-    
-    :param agent_id: Agent ID
-    :return: Agent status
-    """
-    # TODO: Implement agent status retrieval logic
-    return {"message": "Agent status retrieval endpoint", "agent_id": agent_id}
\ No newline at end of file
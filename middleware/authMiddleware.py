@@ -1,8 +1,11 @@
 from fastapi import Request, HTTPException
 import jwt
+import time
 import os
 from dotenv import load_dotenv
-from motor.motor_asyncio import AsyncIOMotorClient
+from ..repository.userRepository import find_user_by_email
+from ..utils.cache import LRUCache
+from ..utils.metrics import span
 
 
 # Load environment variables
@@ -12,13 +15,25 @@ load_dotenv()
 SECRET_KEY = os.getenv("JWT_KEY")
 ALGORITHM = os.getenv("JWT_ALGORITHM")
 
+# Verified token -> user cache. Invalidation is per worker process,
+# so the TTL bounds how long another worker can serve a stale user.
+AUTH_CACHE_MAX_ENTRIES = int(os.getenv("AUTH_CACHE_MAX_ENTRIES", "10000"))
+AUTH_CACHE_TTL_SECONDS = float(os.getenv("AUTH_CACHE_TTL_SECONDS", "60"))
 
+# Never cache password hashes
+USER_PROJECTION = {"password": 0}
+
+token_cache = LRUCache(maxsize=AUTH_CACHE_MAX_ENTRIES, ttl=AUTH_CACHE_TTL_SECONDS)
+
+
+def invalidate_user(email: str):
+    """
+    Drops cached tokens for a user; call after modifying the user document
+
+    :param email: User email
+    """
+    token_cache.remove_where(lambda user: user.get("email") == email)
 
-# MongoDB Setup
-MONGO_URI = os.getenv("DATABASE_URI")
-client = AsyncIOMotorClient(MONGO_URI)
-db = client["hackathon"]
-users_collection = db["users"]
 
 async def verify_access_token(request: Request):
     """
@@ -28,26 +43,57 @@ async def verify_access_token(request: Request):
     :return: User data if authenticated
     :raises: HTTPException if not authenticated
     """
+    # Already verified earlier in this request
+    user = getattr(request.state, "user", None)
+    if user is not None:
+        return user
+
     token = request.cookies.get("access_token")
     if not token:
         raise HTTPException(status_code=401, detail="Not authenticated")
 
+    user = token_cache.get(token)
+    if user is not None:
+        request.state.user = user
+        return user
+
     try:
         # Decode JWT token
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        with span("jwt_decode"):
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         email = payload.get("sub")
         if not email:
             raise HTTPException(status_code=401, detail="Invalid token")
 
         # Check if user exists in the database
-        user = await users_collection.find_one({"email": email})
+        user = await find_user_by_email(email, USER_PROJECTION)
         if not user:
             raise HTTPException(status_code=401, detail="User not found")
 
+        # Never keep a token cached past its own expiry
+        ttl = AUTH_CACHE_TTL_SECONDS
+        if payload.get("exp"):
+            ttl = min(ttl, payload["exp"] - time.time())
+        if ttl > 0:
+            token_cache.set(token, user, ttl)
+
+        request.state.user = user
         return user  # Return user data if token is valid
+    except HTTPException:
+        raise
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Token expired")
     except jwt.DecodeError:
         raise HTTPException(status_code=401, detail="Invalid token")
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Authentication error: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Authentication error: {str(e)}")
+
+
+async def get_current_user(request: Request):
+    """
+    FastAPI dependency returning the authenticated user
+
+    :param request: FastAPI request object
+    :return: User data (without the password hash)
+    """
+    return await verify_access_token(request)
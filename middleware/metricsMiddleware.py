@@ -0,0 +1,58 @@
+import time
+from ..utils.metrics import HTTP_REQUEST_DURATION, HTTP_REQUESTS_IN_FLIGHT
+from ..utils.logger import get_logger
+
+logger = get_logger("http")
+
+# Requests slower than this are logged (unsampled) with their timing
+SLOW_REQUEST_SECONDS = 2.0
+
+
+def route_template(app, scope):
+    """
+    The matched route's path template (e.g. /api/v1/contracts/{space_id}),
+    so metrics are labelled per route rather than per URL
+
+    :return: Path template, or "unmatched" for 404s
+    """
+    for route in getattr(app, "routes", []):
+        match, _ = route.matches(scope)
+        if match.name == "FULL":
+            return getattr(route, "path", "unmatched")
+    return "unmatched"
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording per-route latency histograms and in-flight gauges"""
+
+    def __init__(self, app, router_app=None):
+        self.app = app
+        # The FastAPI app whose routes are matched (defaults to the wrapped app)
+        self.router_app = router_app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        route = route_template(self.router_app or self.app, scope)
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        in_flight = HTTP_REQUESTS_IN_FLIGHT.labels(method, route)
+        in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            in_flight.dec()
+            HTTP_REQUEST_DURATION.labels(method, route, str(status["code"])).observe(elapsed)
+            if elapsed >= SLOW_REQUEST_SECONDS:
+                logger.warning("Slow request", extra={"method": method, "route": route,
+                                                      "status": status["code"], "seconds": round(elapsed, 3)})
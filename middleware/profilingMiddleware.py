@@ -0,0 +1,102 @@
+from fastapi import Request, HTTPException
+import hmac
+import random
+from ..services.profiler import (
+    RequestProfile,
+    PROFILE_ADMIN_TOKEN,
+    PROFILE_HEADER,
+    PROFILE_MODE,
+    PROFILE_MODE_HEADER,
+    PROFILE_SAMPLE_RATE
+)
+from ..utils.logger import get_logger
+from .metricsMiddleware import route_template
+
+logger = get_logger("profiling")
+
+# Never profiled: the profile endpoints themselves (they carry the token) and the metrics scrape
+UNPROFILED_PREFIXES = ("/api/v1/admin/profiles", "/metrics")
+
+
+def _header(scope, name: str):
+    encoded = name.encode("latin-1")
+    for key, value in scope.get("headers", []):
+        if key == encoded:
+            return value.decode("latin-1")
+    return None
+
+
+def profile_requested(scope):
+    """
+    :return: True if the request carries the admin profiling token
+    """
+    if not PROFILE_ADMIN_TOKEN:
+        return False
+    token = _header(scope, PROFILE_HEADER)
+    return token is not None and hmac.compare_digest(token.encode(), PROFILE_ADMIN_TOKEN.encode())
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware profiling requests that carry the admin token header, or
+    a PROFILE_SAMPLE_RATE fraction of all requests. Only installed when
+    profiling_enabled(), so a disabled deployment pays nothing.
+
+    Header-triggered responses carry X-Profile-Id for the download endpoint.
+    """
+
+    def __init__(self, app, router_app=None):
+        self.app = app
+        self.router_app = router_app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith(UNPROFILED_PREFIXES):
+            await self.app(scope, receive, send)
+            return
+
+        forced = profile_requested(scope)
+        if not forced and not (PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE):
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile.begin(_header(scope, PROFILE_MODE_HEADER) or PROFILE_MODE, forced)
+        if profile is None:
+            # Another request on this worker is being profiled
+            await self.app(scope, receive, send)
+            return
+
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                if forced:
+                    message = {**message, "headers": [*message.get("headers", []),
+                                                      (b"x-profile-id", profile.id.encode())]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            try:
+                profile.finish({
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "route": route_template(self.router_app or self.app, scope),
+                    "status": status["code"]
+                })
+            except Exception as e:
+                logger.error("Saving profile failed", extra={"profile_id": profile.id, "error": str(e)})
+
+
+async def require_profile_admin(request: Request):
+    """
+    Dependency guarding the profile endpoints with the admin profiling token
+
+    :param request: FastAPI request object
+    :raises: HTTPException 404 when no admin token is configured, 403 for a missing or wrong token
+    """
+    if not PROFILE_ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not found")
+    if not profile_requested(request.scope):
+        raise HTTPException(status_code=403, detail="Admin profiling token required")
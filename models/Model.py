@@ -1,5 +1,15 @@
-from pydantic import BaseModel, EmailStr, Field
-from typing import List, Optional
+from pydantic import BaseModel, BeforeValidator, ConfigDict, EmailStr, Field
+from typing import Annotated, Any, Dict, List, Optional
+from bson import ObjectId
+
+
+def _bson_to_str(value):
+    return str(value) if isinstance(value, ObjectId) else value
+
+
+# A Mongo ID in a response: ObjectIds become strings during pydantic-core
+# validation, so handlers can return raw documents without rewriting _id
+PyObjectId = Annotated[str, BeforeValidator(_bson_to_str)]
 
 class UserModel(BaseModel):
     """User registration model"""
@@ -27,10 +37,111 @@ class ContractMetadataModel(BaseModel):
     terms: Optional[List[dict]] = None
     status: Optional[str] = None
     plartform: str
+    failed_chunks: int = 0  # LLM chunks that failed; non-zero marks a partial extraction
     
+class AgentBatchModel(BaseModel):
+    """Contracts to check in one agent run: explicit IDs or a whole contract space"""
+    contract_ids: List[str] = []
+    contract_space_id: Optional[str] = None
+
 class AgentStatusModel(BaseModel):
     """Agent status model"""
     id: str
     status: str
     progress: float = 0.0
-    messages: List[str] = []
\ No newline at end of file
+    messages: List[str] = []
+    kind: Optional[str] = None
+    result: Optional[Any] = None
+    error: Optional[str] = None
+
+class MessageResponse(BaseModel):
+    """Response carrying only a status message"""
+    message: str
+
+class RegistrationResponse(BaseModel):
+    """Response to a successful registration"""
+    message: str
+    user_id: PyObjectId
+
+class SignInResponse(BaseModel):
+    """Response to a successful sign-in"""
+    message: str
+    token: str
+
+class ContractSummaryResponse(BaseModel):
+    """A contract as listed on the user dashboard"""
+    contract_id: PyObjectId
+    title: str
+    parties: List[str] = []
+    status: str
+    platform: str = ""
+
+class ContractSpaceSummaryResponse(BaseModel):
+    """A contract space with its contract summaries"""
+    space_id: PyObjectId
+    name: str
+    contracts: List[ContractSummaryResponse] = []
+
+class UserDetailsResponse(BaseModel):
+    """Authenticated user with their contract spaces"""
+    user_id: PyObjectId
+    email: str
+    contract_spaces: List[ContractSpaceSummaryResponse] = []
+
+class ContractSpaceCreatedResponse(BaseModel):
+    """Response to creating a contract space"""
+    message: str
+    contract_space_id: PyObjectId
+
+class ContractUploadResponse(BaseModel):
+    """Response to a contract upload: a queued job, or a contract linked from the extraction cache"""
+    message: str
+    contract_space_id: str
+    status: str
+    job_id: Optional[str] = None
+    contract_id: Optional[PyObjectId] = None
+    file_count: Optional[int] = None
+    cached: Optional[bool] = None
+
+class ContractResponse(BaseModel):
+    """
+    A stored contract. Every field is optional because listings can project
+    a subset; fields added by metadata overrides are passed through.
+    """
+    model_config = ConfigDict(populate_by_name=True, extra="allow")
+
+    object_id: PyObjectId = Field(alias="_id")
+    id: Optional[str] = None
+    title: Optional[str] = None
+    parties: Optional[List[str]] = None
+    effective_date: Optional[str] = None
+    expiration_date: Optional[str] = None
+    terms: Optional[List[dict]] = None
+    status: Optional[str] = None
+    plartform: Optional[str] = None
+    failed_chunks: Optional[int] = None
+    terms_check: Optional[dict] = None
+
+class ContractPageResponse(BaseModel):
+    """One page of a contract space's contracts"""
+    message: str
+    contracts: List[ContractResponse] = []
+    next_cursor: Optional[PyObjectId] = None
+
+class SearchResultResponse(BaseModel):
+    """One ranked keyword search hit"""
+    kind: str
+    ref_id: PyObjectId
+    space_ids: List[str] = []
+    display: Dict[str, Any] = {}
+    score: float = 0
+
+class SearchResponse(BaseModel):
+    """A page of keyword search results"""
+    results: List[SearchResultResponse] = []
+    page: int
+    page_size: int
+
+class ClauseSearchResponse(BaseModel):
+    """Clauses closest in meaning to a query"""
+    results: List[Dict[str, Any]] = []
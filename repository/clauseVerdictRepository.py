@@ -0,0 +1,37 @@
+from datetime import datetime, timezone
+from pymongo import UpdateOne
+from ..config.database import get_clause_verdicts_collection
+
+
+async def find_verdicts(fingerprints):
+    """
+    Fetches cached clause verdicts
+
+    :param fingerprints: Clause fingerprints
+    :return: Dict of fingerprint -> verdict document
+    """
+    if not fingerprints:
+        return {}
+    cursor = get_clause_verdicts_collection().find({"_id": {"$in": list(fingerprints)}})
+    return {document["_id"]: document async for document in cursor}
+
+
+async def save_verdicts(verdicts):
+    """
+    Stores clause verdicts keyed by fingerprint
+
+    :param verdicts: List of dicts with a fingerprint plus the fields to store
+    :return: Bulk write result, or None if there was nothing to store
+    """
+    if not verdicts:
+        return None
+    now = datetime.now(timezone.utc)
+    operations = [
+        UpdateOne(
+            {"_id": verdict["fingerprint"]},
+            {"$set": {**{k: v for k, v in verdict.items() if k != "fingerprint"}, "checked_at": now}},
+            upsert=True
+        )
+        for verdict in verdicts
+    ]
+    return await get_clause_verdicts_collection().bulk_write(operations, ordered=False)
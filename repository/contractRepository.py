@@ -0,0 +1,318 @@
+from bson import ObjectId
+from pymongo import UpdateOne
+from ..config.database import get_contract_spaces_collection, get_contracts_collection
+
+
+def to_object_id(value):
+    """
+    Converts a string ID to ObjectId, keeping it as-is if it's not a valid ObjectId
+
+    :param value: ID as string or ObjectId
+    :return: ObjectId or the original value
+    """
+    if isinstance(value, ObjectId):
+        return value
+    try:
+        return ObjectId(value)
+    except Exception:
+        return value
+
+
+# Contract spaces
+async def insert_contract_space(space_data: dict):
+    """
+    Inserts a new contract space
+
+    :param space_data: Contract space document
+    :return: Inserted contract space ID as a string
+    """
+    result = await get_contract_spaces_collection().insert_one(space_data)
+    return str(result.inserted_id)
+
+
+async def find_contract_space(space_id, projection: dict = None):
+    """
+    Finds a contract space by ID
+
+    :param space_id: Contract space ID
+    :param projection: Optional field projection
+    :return: Contract space document or None
+    """
+    return await get_contract_spaces_collection().find_one({"_id": to_object_id(space_id)}, projection)
+
+
+async def find_contract_spaces(space_ids, projection: dict = None):
+    """
+    Fetches many contract spaces in a single $in query
+
+    :param space_ids: Contract space IDs
+    :param projection: Optional field projection
+    :return: List of contract space documents (unordered)
+    """
+    if not space_ids:
+        return []
+    cursor = get_contract_spaces_collection().find(
+        {"_id": {"$in": [to_object_id(space_id) for space_id in space_ids]}},
+        projection
+    )
+    return await cursor.to_list(length=None)
+
+
+async def update_contract_space(space_id, details: dict):
+    """
+    Sets fields on a contract space
+
+    :param space_id: Contract space ID
+    :param details: Fields to set
+    :return: Update result
+    """
+    return await get_contract_spaces_collection().update_one(
+        {"_id": to_object_id(space_id)},
+        {"$set": details}
+    )
+
+
+def _summary_fields(summaries: dict):
+    """$set fields storing contract summaries in a space's summaries map"""
+    return {f"summaries.{contract_id}": summary for contract_id, summary in (summaries or {}).items()}
+
+
+async def push_contract_to_space(space_id, contract_id: str, summary: dict = None):
+    """
+    Links a contract to a contract space
+
+    :param space_id: Contract space ID
+    :param contract_id: Contract ID
+    :param summary: Dashboard summary of the contract, stored on the space
+    :return: Update result
+    """
+    update = {"$push": {"contracts": contract_id}}
+    if summary is not None:
+        update["$set"] = _summary_fields({contract_id: summary})
+    return await get_contract_spaces_collection().update_one({"_id": to_object_id(space_id)}, update)
+
+
+async def link_contract_to_space(space_id, contract_id: str, summary: dict = None):
+    """
+    Links an existing contract to a contract space, ignoring it if already linked
+
+    :param space_id: Contract space ID
+    :param contract_id: Contract ID
+    :param summary: Dashboard summary of the contract, stored on the space
+    :return: Update result
+    """
+    update = {"$addToSet": {"contracts": contract_id}}
+    if summary is not None:
+        update["$set"] = _summary_fields({contract_id: summary})
+    return await get_contract_spaces_collection().update_one({"_id": to_object_id(space_id)}, update)
+
+
+async def link_contracts_to_space(space_id, contract_ids, summaries: dict = None):
+    """
+    Links many contracts to a contract space in one update
+
+    :param space_id: Contract space ID
+    :param contract_ids: Contract IDs
+    :param summaries: Dashboard summaries by contract ID, stored on the space
+    :return: Update result, or None if there was nothing to link
+    """
+    if not contract_ids:
+        return None
+    update = {"$addToSet": {"contracts": {"$each": list(contract_ids)}}}
+    if summaries:
+        update["$set"] = _summary_fields(summaries)
+    return await get_contract_spaces_collection().update_one({"_id": to_object_id(space_id)}, update)
+
+
+async def set_contract_summary(contract_id: str, summary: dict):
+    """
+    Refreshes a contract's summary in every space that contains it
+
+    :param contract_id: Contract ID
+    :param summary: Dashboard summary of the contract
+    :return: Update result
+    """
+    return await get_contract_spaces_collection().update_many(
+        {"contracts": str(contract_id)},
+        {"$set": _summary_fields({str(contract_id): summary})}
+    )
+
+
+async def unlink_contract_from_spaces(contract_id: str):
+    """
+    Removes a contract and its summary from every space that contains it
+
+    :param contract_id: Contract ID
+    :return: Update result
+    """
+    return await get_contract_spaces_collection().update_many(
+        {"contracts": str(contract_id)},
+        {"$pull": {"contracts": str(contract_id)}, "$unset": {f"summaries.{contract_id}": ""}}
+    )
+
+
+async def replace_space_summaries(space_id, expected_contracts, summaries: dict, dangling=None):
+    """
+    Replaces a space's whole summaries map, only if its contract list is
+    still the one the summaries were computed from
+
+    :param space_id: Contract space ID
+    :param expected_contracts: The contracts array that was read
+    :param summaries: Summaries by contract ID
+    :param dangling: Contract IDs to drop from the space (the contracts no longer exist)
+    :return: Update result (matched_count is 0 if the space changed meanwhile)
+    """
+    update = {"$set": {"summaries": summaries}}
+    if dangling:
+        update["$pullAll"] = {"contracts": list(dangling)}
+    guard = {"_id": to_object_id(space_id), "contracts": expected_contracts}
+    if not expected_contracts:
+        # A space with no contracts may have no contracts field at all
+        guard = {"_id": to_object_id(space_id), "$or": [{"contracts": None}, {"contracts": {"$size": 0}}]}
+    return await get_contract_spaces_collection().update_one(guard, update)
+
+
+# Contracts
+async def insert_contract(contract_data: dict):
+    """
+    Inserts a new contract
+
+    :param contract_data: Contract document
+    :return: Inserted contract ID as a string
+    """
+    result = await get_contracts_collection().insert_one(contract_data)
+    return str(result.inserted_id)
+
+
+async def insert_contracts(contracts):
+    """
+    Inserts many contracts in one round trip
+
+    :param contracts: Contract documents
+    :return: Inserted contract IDs as strings, in input order
+    """
+    if not contracts:
+        return []
+    result = await get_contracts_collection().insert_many(contracts)
+    return [str(inserted_id) for inserted_id in result.inserted_ids]
+
+async def find_contract(contract_id, projection: dict = None):
+    """
+    Finds a contract by ID
+
+    :param contract_id: Contract ID
+    :param projection: Optional field projection
+    :return: Contract document or None
+    """
+    return await get_contracts_collection().find_one({"_id": to_object_id(contract_id)}, projection)
+
+
+async def find_contracts(contract_ids, projection: dict = None):
+    """
+    Fetches many contracts in a single $in query
+
+    :param contract_ids: Contract IDs
+    :param projection: Optional field projection
+    :return: List of contract documents (unordered)
+    """
+    if not contract_ids:
+        return []
+    cursor = get_contracts_collection().find(
+        {"_id": {"$in": [to_object_id(contract_id) for contract_id in contract_ids]}},
+        projection
+    )
+    return await cursor.to_list(length=None)
+
+async def find_contracts_page(contract_ids, after=None, limit: int = 50, projection: dict = None):
+    """
+    Fetches one keyset page of contracts in a single $in query, ordered by _id
+
+    :param contract_ids: Contract IDs to page through
+    :param after: Cursor (the last _id of the previous page), exclusive
+    :param limit: Maximum number of contracts to return
+    :param projection: Optional field projection
+    :return: List of contract documents
+    """
+    if not contract_ids:
+        return []
+    id_filter = {"$in": [to_object_id(contract_id) for contract_id in contract_ids]}
+    if after is not None:
+        id_filter["$gt"] = to_object_id(after)
+    cursor = get_contracts_collection().find({"_id": id_filter}, projection).sort("_id", 1).limit(limit)
+    return await cursor.to_list(length=limit)
+
+async def iter_contracts(contract_ids, query: dict = None, projection: dict = None, batch_size: int = 500):
+    """
+    Streams contracts from a cursor without loading them all, ordered by _id
+
+    :param contract_ids: Contract IDs to read
+    :param query: Extra filter conditions
+    :param projection: Optional field projection
+    :param batch_size: Documents per cursor batch
+    :return: Async iterator of contract documents
+    """
+    if not contract_ids:
+        return
+    cursor = get_contracts_collection().find(
+        {**(query or {}), "_id": {"$in": [to_object_id(contract_id) for contract_id in contract_ids]}},
+        projection,
+        batch_size=batch_size
+    ).sort("_id", 1)
+    async for contract in cursor:
+        yield contract
+
+
+async def update_contract(contract_id, metadata: dict):
+    """
+    Sets fields on a contract
+
+    :param contract_id: Contract ID
+    :param metadata: Fields to set
+    :return: Update result
+    """
+    return await get_contracts_collection().update_one(
+        {"_id": to_object_id(contract_id)},
+        {"$set": metadata}
+    )
+
+
+async def update_contracts(updates: dict):
+    """
+    Sets fields on many contracts in one bulk write
+
+    :param updates: Fields to set, by contract ID
+    :return: Bulk write result, or None if there was nothing to update
+    """
+    if not updates:
+        return None
+    operations = [
+        UpdateOne({"_id": to_object_id(contract_id)}, {"$set": fields})
+        for contract_id, fields in updates.items()
+    ]
+    return await get_contracts_collection().bulk_write(operations, ordered=False)
+
+
+
+async def delete_contract_by_id(contract_id):
+    """
+    Deletes a contract
+
+    :param contract_id: Contract ID
+    :return: Delete result
+    """
+    return await get_contracts_collection().delete_one({"_id": to_object_id(contract_id)})
+
+
+
+async def delete_contracts(contract_ids):
+    """
+    Deletes many contracts in one round trip
+
+    :param contract_ids: Contract IDs
+    :return: Delete result, or None if there was nothing to delete
+    """
+    if not contract_ids:
+        return None
+    return await get_contracts_collection().delete_many(
+        {"_id": {"$in": [to_object_id(contract_id) for contract_id in contract_ids]}}
+    )
@@ -0,0 +1,51 @@
+from ..config.database import get_users_collection
+
+
+async def find_user_by_email(email: str, projection: dict = None):
+    """
+    Finds a user by email
+
+    :param email: User email
+    :param projection: Optional field projection
+    :return: User document or None
+    """
+    return await get_users_collection().find_one({"email": email}, projection)
+
+
+async def insert_user(user_data: dict):
+    """
+    Inserts a new user
+
+    :param user_data: User document to store
+    :return: Inserted user ID as a string
+    """
+    result = await get_users_collection().insert_one(user_data)
+    return str(result.inserted_id)
+
+
+async def push_contract_space(user_id, space_id: str):
+    """
+    Links a contract space to a user
+
+    :param user_id: User _id
+    :param space_id: Contract space ID
+    :return: Update result
+    """
+    return await get_users_collection().update_one(
+        {"_id": user_id},
+        {"$push": {"contractSpace": space_id}}
+    )
+
+
+async def update_user_password(user_id, hashed_password: str):
+    """
+    Replaces a user's password hash
+
+    :param user_id: User _id
+    :param hashed_password: New password hash
+    :return: Update result
+    """
+    return await get_users_collection().update_one(
+        {"_id": user_id},
+        {"$set": {"password": hashed_password}}
+    )
@@ -0,0 +1,46 @@
+from fastapi import APIRouter
+from ..controller.agentController import initiate_agent, initiate_batch_agent, get_agent_status, cancel_agent
+from ..models.Model import AgentStatusModel, AgentBatchModel
+
+# Create agent router
+agent_router = APIRouter()
+
+@agent_router.post("/batch", response_model=AgentStatusModel)
+async def start_batch_agent(details: AgentBatchModel):
+    """
+    Initiates one agent run that checks many contracts in parallel
+    
+    :param details: Contract IDs, or a contract space whose contracts are checked
+    :return: Agent status
+    """
+    return await initiate_batch_agent(details.contract_ids, details.contract_space_id)
+
+@agent_router.get("/status/{agent_id}", response_model=AgentStatusModel)
+async def agent_status(agent_id: str):
+    """
+    Gets the status of a running agent
+    
+    :param agent_id: Agent ID
+    :return: Agent status
+    """
+    return await get_agent_status(agent_id)
+
+@agent_router.delete("/{agent_id}", response_model=AgentStatusModel)
+async def stop_agent(agent_id: str):
+    """
+    Cancels a queued or running agent
+    
+    :param agent_id: Agent ID
+    :return: Agent status
+    """
+    return await cancel_agent(agent_id)
+
+@agent_router.get("/{contact_id}", response_model=AgentStatusModel)
+async def start_agent(contact_id: str):
+    """
+    Initiates an agent to process a contract
+    
+    :param contact_id: Contract ID
+    :return: Agent status
+    """
+    return await initiate_agent(contact_id)
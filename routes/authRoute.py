@@ -1,30 +1,28 @@
-from fastapi import APIRouter, Response, Request
+from fastapi import APIRouter, Response, Depends
 from ..controller.authController import read_root, user_registration, user_signin, user_signout,get_user_details
-from ..models.Model import UserModel, LoginModel
-
-from ..middleware.authMiddleware import verify_access_token
-from bson import ObjectId
+from ..models.Model import UserModel, LoginModel, MessageResponse, RegistrationResponse, SignInResponse, UserDetailsResponse
+from ..middleware.authMiddleware import get_current_user
 
 # Create auth router
 auth = APIRouter()
 
-@auth.get("/")
+@auth.get("/", response_model=MessageResponse)
 async def auth_root():
     """Root endpoint for auth API"""
     return await read_root()
 
-@auth.get("/get-user")
-async def get_user_data(request: Request):
+@auth.get("/get-user", response_model=UserDetailsResponse)
+async def get_user_data(user: dict = Depends(get_current_user)):
     """
     Get authenticated user details including all contract spaces and their contracts
     
-    :param request: FastAPI request object with access token
+    :param user: Authenticated user
     :return: Aggregated user data with contract spaces and contracts
     """
-    return await get_user_details(request)
+    return await get_user_details(user)
     
 
-@auth.post("/registration")
+@auth.post("/registration", response_model=RegistrationResponse)
 async def register_user(user: UserModel):
     """
     Register a new user
@@ -34,7 +32,7 @@ async def register_user(user: UserModel):
     """
     return await user_registration(user)
 
-@auth.post("/sign-in")
+@auth.post("/sign-in", response_model=SignInResponse)
 async def signin_user(response: Response, user: LoginModel):
     """
     Sign in a user
@@ -45,7 +43,7 @@ async def signin_user(response: Response, user: LoginModel):
     """
     return await user_signin(response, user)
 
-@auth.post("/sign-out")
+@auth.post("/sign-out", response_model=MessageResponse)
 async def signout_user(response: Response):
     """
     Sign out a user
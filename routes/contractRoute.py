@@ -1,49 +1,115 @@
-from fastapi import APIRouter, UploadFile, File, Request
+from fastapi import APIRouter, UploadFile, File, Depends, Query
+from typing import List, Optional
 from ..controller.contractController import (
+    DEFAULT_PAGE_SIZE,
     get_contracts_by_space_id,
     create_contract_space,
     upload_contracts,
+    upload_contracts_bulk,
+    get_ingestion_job,
+    get_extraction_cache_stats,
     update_contract_space,
     update_contract_metadata,
     delete_contract
 )
-from ..models.Model import contractSpaceModel  # Fixed class name and added missing import
+from ..controller.exportController import export_contracts
+from ..controller.searchController import search_user_contracts, search_user_clauses
+from ..models.Model import (
+    contractSpaceModel,
+    MessageResponse,
+    ContractSpaceCreatedResponse,
+    ContractUploadResponse,
+    ContractPageResponse,
+    SearchResponse,
+    ClauseSearchResponse
+)
+from ..middleware.authMiddleware import get_current_user
 
 # Create contract router
 contract_router = APIRouter()  # Fixed variable name
 
-@contract_router.post("/contracts/create-space")
-async def create_space(details: contractSpaceModel, request: Request):
+@contract_router.post("/contracts/create-space", response_model=ContractSpaceCreatedResponse)
+async def create_space(details: contractSpaceModel, user: dict = Depends(get_current_user)):
     """
     Create a new contract space
     
     :param details: Contract space details
-    :param request: FastAPI request object
+    :param user: Authenticated user
     :return: Creation result
     """
-    return await create_contract_space(details, request)
+    return await create_contract_space(details, user)
 
-@contract_router.post("/contracts/add_contracts/{contract_space_id}")
+@contract_router.post("/contracts/add_contracts/{contract_space_id}", response_model=ContractUploadResponse,
+                      response_model_exclude_unset=True)
 async def add_contracts(contract_space_id: str, file: UploadFile = File(...)):
     """
-    Upload and process a contract file
+    Upload a contract file for background processing
     
     :param file: Uploaded contract PDF
-    :return: Processing result
+    :return: Ingestion job ID
     """
     return await upload_contracts(contract_space_id, file)
 
-@contract_router.get("/contracts/{space_id}")
-async def get_contracts(space_id: str):
+@contract_router.post("/contracts/add_contracts_bulk/{contract_space_id}", response_model=ContractUploadResponse,
+                      response_model_exclude_unset=True)
+async def add_contracts_bulk(contract_space_id: str, files: List[UploadFile] = File(...)):
+    """
+    Upload many contract PDFs, or zip archives of PDFs, in one request
+    
+    :param files: Uploaded contract PDFs and/or zip archives
+    :return: Job ID; the job result lists the outcome per file
+    """
+    return await upload_contracts_bulk(contract_space_id, files)
+
+@contract_router.get("/contracts/cache/stats")
+async def extraction_cache_stats():
+    """
+    Get extraction cache statistics
+    
+    :return: Hit/miss counters
+    """
+    return await get_extraction_cache_stats()
+
+@contract_router.get("/contracts/jobs/{job_id}")
+async def get_upload_job(job_id: str):
+    """
+    Get the status of a contract upload
+    
+    :param job_id: Job ID returned by the upload endpoint
+    :return: Job status
+    """
+    return await get_ingestion_job(job_id)
+
+@contract_router.get("/contracts/export")
+async def export(format: str = "ndjson", space_id: Optional[str] = None, status: Optional[str] = None,
+                 date_from: Optional[str] = Query(None, alias="from"), date_to: Optional[str] = Query(None, alias="to"),
+                 user: dict = Depends(get_current_user)):
     """
-    Get contracts under a particular space
+    Stream the user's contracts as NDJSON or CSV
+    
+    :param format: "ndjson" or "csv"
+    :param space_id: Only this contract space
+    :param status: Only contracts with this status
+    :param date_from: Earliest effective date (YYYY-MM-DD)
+    :param date_to: Latest effective date (YYYY-MM-DD)
+    :return: Streamed export file
+    """
+    return await export_contracts(user, format, space_id, status, date_from, date_to)
+
+@contract_router.get("/contracts/{space_id}", response_model=ContractPageResponse, response_model_exclude_unset=True)
+async def get_contracts(space_id: str, fields: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE, after: Optional[str] = None):
+    """
+    Get contracts under a particular space, one page at a time
     
     :param space_id: Contract space ID
-    :return: List of contracts
+    :param fields: Comma-separated contract fields to return (default: all)
+    :param limit: Page size
+    :param after: next_cursor from the previous page
+    :return: List of contracts and next_cursor
     """
-    return await get_contracts_by_space_id(space_id)
+    return await get_contracts_by_space_id(space_id, fields, limit, after)
 
-@contract_router.put("/contracts/update/{space_id}")
+@contract_router.put("/contracts/update/{space_id}", response_model=MessageResponse)
 async def update_space(space_id: str, details: dict):
     """
     Update a contract space
@@ -54,7 +120,7 @@ async def update_space(space_id: str, details: dict):
     """
     return await update_contract_space(space_id, details)
 
-@contract_router.put("/contracts/override/{contract_id}")
+@contract_router.put("/contracts/override/{contract_id}", response_model=MessageResponse)
 async def override_contract(contract_id: str, metadata: dict):
     """
     Override a contract's metadata
@@ -65,7 +131,7 @@ async def override_contract(contract_id: str, metadata: dict):
     """
     return await update_contract_metadata(contract_id, metadata)
 
-@contract_router.delete("/contracts/{contract_id}")
+@contract_router.delete("/contracts/{contract_id}", response_model=MessageResponse)
 async def remove_contract(contract_id: str):
     """
     Delete a contract
@@ -73,4 +139,27 @@ async def remove_contract(contract_id: str):
     :param contract_id: Contract ID
     :return: Delete result
     """
-    return await delete_contract(contract_id)
\ No newline at end of file
+    return await delete_contract(contract_id)
+
+@contract_router.get("/search", response_model=SearchResponse)
+async def search(q: str, page: int = 1, page_size: int = 10, user: dict = Depends(get_current_user)):
+    """
+    Search the user's contract spaces and contracts
+    
+    :param q: Search terms (prefixes match)
+    :param page: 1-based page number
+    :param page_size: Results per page
+    :return: Ranked results
+    """
+    return await search_user_contracts(user, q, page, page_size)
+
+@contract_router.get("/search/clauses", response_model=ClauseSearchResponse)
+async def search_clauses(q: str, k: int = 10, user: dict = Depends(get_current_user)):
+    """
+    Semantic search for the clauses closest in meaning to the query across the user's spaces
+    
+    :param q: Natural-language query
+    :param k: Number of clauses to return
+    :return: Matching clauses with similarity scores
+    """
+    return await search_user_clauses(user, q, k)
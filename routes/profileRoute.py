@@ -0,0 +1,25 @@
+from fastapi import APIRouter, Depends
+from ..controller.profileController import list_profiles, download_profile
+from ..middleware.profilingMiddleware import require_profile_admin
+
+# Create profile router; every endpoint needs the admin profiling token in the X-Profile header
+profile_router = APIRouter(dependencies=[Depends(require_profile_admin)])
+
+@profile_router.get("/")
+async def profiles():
+    """
+    List recent request profiles
+    
+    :return: Profile metadata, newest first
+    """
+    return await list_profiles()
+
+@profile_router.get("/{profile_id}")
+async def profile(profile_id: str):
+    """
+    Download a request profile
+    
+    :param profile_id: Profile ID
+    :return: Folded stacks or a pstats dump
+    """
+    return await download_profile(profile_id)
@@ -0,0 +1,129 @@
+"""
+Keeps the clause vector index in step with the contracts collection.
+
+Contracts are committed to Mongo before their clauses are embedded, so an
+indexing failure must not fail the request: it is logged and a
+clause_reindex job is queued to retry from the stored contracts.
+rebuild_clause_index() re-embeds every contract (the backfill migration).
+
+Rebuild the whole index from the command line (run from the directory containing the package):
+
+    python -m <package>.services.clauseIndexing
+"""
+import asyncio
+from ..apiFeatures.semanticSearch import clause_index
+from ..config.database import get_contracts_collection, connect_to_mongo, close_mongo_connection
+from ..repository.contractRepository import find_contracts
+from ..utils.logger import get_logger
+from .jobManager import job_manager, JobContext
+
+CLAUSE_REINDEX_JOB = "clause_reindex"
+
+# Contracts embedded per index write during a rebuild
+REBUILD_BATCH = 50
+
+logger = get_logger("clause_index")
+
+
+async def queue_reindex(contract_ids):
+    """
+    Queues a clause_reindex job for contracts whose index update failed
+
+    :param contract_ids: Contract IDs to re-embed (or drop, if deleted)
+    """
+    contract_ids = [str(contract_id) for contract_id in contract_ids]
+    try:
+        await job_manager.submit(CLAUSE_REINDEX_JOB, {"contract_ids": contract_ids})
+    except Exception as e:
+        # Left for the next rebuild_clause_index()
+        logger.error("Clause reindex could not be queued", extra={"contract_ids": contract_ids, "error": str(e)})
+
+
+async def index_clauses(contracts):
+    """
+    Adds contracts' clauses to the index without raising; failures are logged and queued for reindex
+
+    :param contracts: List of (contract ID, terms) pairs
+    :return: True if the index was updated
+    """
+    if not contracts:
+        return True
+    try:
+        await clause_index.add_contracts_async(contracts)
+        return True
+    except Exception as e:
+        contract_ids = [str(contract_id) for contract_id, _ in contracts]
+        logger.error("Clause indexing failed", extra={"contract_ids": contract_ids, "error": str(e)})
+        await queue_reindex(contract_ids)
+        return False
+
+
+async def unindex_clauses(contract_id: str):
+    """
+    Removes a contract's clauses from the index without raising; failures are logged and queued for reindex
+
+    :param contract_id: Contract ID
+    :return: True if the index was updated
+    """
+    try:
+        await clause_index.remove_contract_async(contract_id)
+        return True
+    except Exception as e:
+        logger.error("Clause removal failed", extra={"contract_id": str(contract_id), "error": str(e)})
+        await queue_reindex([contract_id])
+        return False
+
+
+async def run_clause_reindex(params: dict, ctx: JobContext):
+    """
+    Job handler re-embedding contracts from their stored terms; contracts that
+    no longer exist are dropped from the index
+
+    :param params: {"contract_ids": [...]}
+    :param ctx: Job context
+    :return: Counts of contracts indexed and removed
+    """
+    contract_ids = [str(contract_id) for contract_id in params.get("contract_ids", [])]
+    contracts = await find_contracts(contract_ids, {"terms": 1})
+    found = {str(contract["_id"]) for contract in contracts}
+
+    await clause_index.add_contracts_async([(str(contract["_id"]), contract.get("terms")) for contract in contracts])
+    removed = [contract_id for contract_id in contract_ids if contract_id not in found]
+    for contract_id in removed:
+        await clause_index.remove_contract_async(contract_id)
+    return {"indexed": len(found), "removed": len(removed)}
+
+
+async def rebuild_clause_index():
+    """
+    Re-embeds the clauses of every stored contract
+
+    :return: Number of contracts indexed
+    """
+    count = 0
+    batch = []
+    async for contract in get_contracts_collection().find({}, {"terms": 1}):
+        batch.append((str(contract["_id"]), contract.get("terms")))
+        if len(batch) >= REBUILD_BATCH:
+            await clause_index.add_contracts_async(batch)
+            count += len(batch)
+            batch = []
+    if batch:
+        await clause_index.add_contracts_async(batch)
+        count += len(batch)
+    return count
+
+
+job_manager.register(CLAUSE_REINDEX_JOB, run_clause_reindex)
+
+
+async def _main():
+    await connect_to_mongo()
+    try:
+        print(await rebuild_clause_index())
+    finally:
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
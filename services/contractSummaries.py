@@ -0,0 +1,109 @@
+"""
+Denormalized contract summaries stored on each contract space.
+
+Every space keeps `summaries: {<contract_id>: {title, parties, status, platform}}`
+next to its `contracts` list, so the dashboard is one read of the user's
+spaces. Writes that add, override or delete contracts keep the map current;
+repair_contract_summaries() rebuilds it from the contracts collection.
+
+Repair every space from the command line (run from the directory containing the package):
+
+    python -m <package>.services.contractSummaries
+"""
+import asyncio
+from ..config.database import get_contract_spaces_collection, connect_to_mongo, close_mongo_connection
+from ..repository.contractRepository import find_contracts, replace_space_summaries
+from ..utils.logger import get_logger
+
+# Fields a summary is built from
+SUMMARY_PROJECTION = {"title": 1, "parties": 1, "status": 1, "plartform": 1}
+SUMMARY_SOURCE_FIELDS = {"title", "parties", "status", "plartform"}
+
+REPAIR_RETRIES = 3
+
+logger = get_logger("summaries")
+
+
+def contract_summary(contract: dict):
+    """
+    Dashboard summary of a contract
+
+    :param contract: Contract document or metadata dict
+    :return: Dict with title, parties, status and platform
+    """
+    return {
+        "title": contract.get("title"),
+        "parties": contract.get("parties") or [],
+        "status": contract.get("status"),
+        "platform": contract.get("plartform")  # Note the misspelling in the model
+    }
+
+
+async def summaries_for(contract_ids):
+    """
+    Builds summaries for existing contracts with one query
+
+    :param contract_ids: Contract IDs
+    :return: Dict of contract ID -> summary (missing contracts are left out)
+    """
+    contracts = await find_contracts(contract_ids, SUMMARY_PROJECTION)
+    return {str(contract["_id"]): contract_summary(contract) for contract in contracts}
+
+
+async def repair_space_summaries(space_id):
+    """
+    Rebuilds one space's summaries from its contracts and drops IDs of
+    contracts that no longer exist. Retries if the space changes while it
+    is being repaired.
+
+    :param space_id: Contract space ID
+    :return: (summaries written, dangling IDs removed), or None if the space keeps changing
+    """
+    collection = get_contract_spaces_collection()
+    for _ in range(REPAIR_RETRIES):
+        space = await collection.find_one({"_id": space_id}, {"contracts": 1})
+        if not space:
+            return 0, 0
+        contract_ids = space.get("contracts", [])
+        summaries = await summaries_for(contract_ids)
+        dangling = [contract_id for contract_id in contract_ids if str(contract_id) not in summaries]
+        result = await replace_space_summaries(space_id, contract_ids, summaries, dangling)
+        if result.matched_count:
+            return len(summaries), len(dangling)
+    logger.warning("Summary repair skipped: space kept changing", extra={"space_id": str(space_id)})
+    return None
+
+
+async def repair_contract_summaries():
+    """
+    Consistency repair: rebuilds the summaries of every contract space
+
+    :return: Counts of spaces repaired, summaries written, dangling IDs removed and spaces skipped
+    """
+    collection = get_contract_spaces_collection()
+    report = {"spaces": 0, "summaries": 0, "dangling_removed": 0, "skipped": 0}
+    skipped = []
+    async for space in collection.find({}, {"_id": 1}):
+        outcome = await repair_space_summaries(space["_id"])
+        if outcome is None:
+            report["skipped"] += 1
+            skipped.append(str(space["_id"]))
+        else:
+            report["spaces"] += 1
+            report["summaries"] += outcome[0]
+            report["dangling_removed"] += outcome[1]
+    if skipped:
+        logger.warning("Summary repair skipped spaces", extra={"skipped": len(skipped), "space_ids": skipped})
+    return report
+
+
+async def _main():
+    await connect_to_mongo()
+    try:
+        print(await repair_contract_summaries())
+    finally:
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
@@ -0,0 +1,121 @@
+from datetime import datetime, timedelta, timezone
+import os
+from dotenv import load_dotenv
+from ..config.database import get_database
+from ..utils.cache import LRUCache
+
+# Load environment variables
+load_dotenv()
+
+# In-process front cache (metadata and contract link only, never the text)
+EXTRACTION_CACHE_MAX_ENTRIES = int(os.getenv("EXTRACTION_CACHE_MAX_ENTRIES", "2048"))
+
+# Extracted text above this size is not persisted (MongoDB documents are capped at 16 MB)
+EXTRACTION_CACHE_MAX_TEXT_BYTES = 8 * 1024 * 1024
+
+# Memory hits refresh the stored entry's last_used_at (and so its TTL) at most this often
+EXTRACTION_CACHE_TOUCH_INTERVAL = timedelta(days=1)
+
+
+def _now():
+    return datetime.now(timezone.utc)
+
+
+def _as_utc(value: datetime):
+    # Motor returns naive datetimes (in UTC) unless the client is tz-aware
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+class ExtractionCache:
+    """
+    Content-addressed cache of contract extraction results keyed by the SHA-256
+    of the uploaded bytes. A small LRU sits in front of the extraction_cache collection,
+    whose entries expire through the TTL index declared in config/indexes.py.
+    """
+
+    def __init__(self, max_entries: int = EXTRACTION_CACHE_MAX_ENTRIES):
+        self.memory = LRUCache(maxsize=max_entries)
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _collection():
+        return get_database()["extraction_cache"]
+
+    async def lookup(self, content_hash: str):
+        """
+        Finds a previous extraction of the same file
+
+        :param content_hash: SHA-256 hex digest of the upload
+        :return: Entry with metadata and contract_id, or None
+        """
+        entry = self.memory.get(content_hash)
+        if entry is None:
+            # Touch last_used_at so entries that keep getting hit don't expire
+            now = _now()
+            entry = await self._collection().find_one_and_update(
+                {"_id": content_hash},
+                {"$set": {"last_used_at": now}},
+                {"text": 0}
+            )
+            if entry is not None:
+                entry["last_used_at"] = now
+                self.memory.set(content_hash, entry)
+        elif _now() - _as_utc(entry.get("last_used_at") or datetime.min) >= EXTRACTION_CACHE_TOUCH_INTERVAL:
+            # Hits served from memory would otherwise let the stored entry expire; touch it once a day
+            now = _now()
+            entry["last_used_at"] = now
+            await self._collection().update_one({"_id": content_hash}, {"$set": {"last_used_at": now}})
+
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return entry
+
+    async def store(self, content_hash: str, text: str, metadata: dict, contract_id: str):
+        """
+        Records an extraction result
+
+        :param content_hash: SHA-256 hex digest of the upload
+        :param text: Extracted PDF text
+        :param metadata: Structured contract metadata (ContractMetadataModel dict)
+        :param contract_id: Contract created from this file
+        """
+        entry = {"metadata": metadata, "contract_id": contract_id, "last_used_at": _now()}
+        persisted = dict(entry)
+        if text and len(text.encode("utf-8")) <= EXTRACTION_CACHE_MAX_TEXT_BYTES:
+            persisted["text"] = text
+        await self._collection().update_one(
+            {"_id": content_hash},
+            {"$set": persisted, "$setOnInsert": {"created_at": _now()}},
+            upsert=True
+        )
+        self.memory.set(content_hash, {"_id": content_hash, **entry})
+
+    async def link_contract(self, content_hash: str, contract_id: str):
+        """Points an existing entry at a (re-)created contract"""
+        await self._collection().update_one({"_id": content_hash}, {"$set": {"contract_id": contract_id}})
+        entry = self.memory.pop(content_hash)
+        if entry is not None:
+            self.memory.set(content_hash, {**entry, "contract_id": contract_id})
+
+    async def forget_contract(self, contract_id: str):
+        """
+        Unlinks a deleted contract. The extraction result is kept so a later
+        upload of the same file can skip extraction and the LLM.
+        """
+        await self._collection().update_many({"contract_id": contract_id}, {"$set": {"contract_id": None}})
+        self.memory.remove_where(lambda entry: entry.get("contract_id") == contract_id)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "memory": self.memory.stats()
+        }
+
+
+extraction_cache = ExtractionCache()
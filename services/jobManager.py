@@ -0,0 +1,385 @@
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, Optional
+import asyncio
+import socket
+import uuid
+import os
+from dotenv import load_dotenv
+from pymongo import ReturnDocument
+from ..config.database import get_database
+from ..models.Model import AgentStatusModel
+from ..utils.logger import get_logger
+
+# Load environment variables
+load_dotenv()
+
+logger = get_logger("jobs")
+
+# "mongo" persists jobs in the jobs collection, "memory" keeps them in-process (testing)
+JOB_STORE_BACKEND = os.getenv("JOB_STORE_BACKEND", "mongo")
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+JOB_QUEUE_SIZE = int(os.getenv("JOB_QUEUE_SIZE", "1000"))
+JOB_MAX_MESSAGES = 50
+
+# A worker owning a job renews its lease every third of this; a lapsed lease means the owner died.
+# Cancellation made through any worker is noticed by the owner at the next renewal or progress report.
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "60"))
+
+# At startup, requeue queued jobs and fail jobs whose owner's lease has lapsed.
+# Safe on every worker: live workers keep their leases current and claims are atomic.
+JOB_RECOVER_ON_START = os.getenv("JOB_RECOVER_ON_START", "true").lower() == "true"
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATES = (COMPLETED, FAILED, CANCELLED)
+ACTIVE_STATES = (QUEUED, RUNNING)
+
+
+def _now():
+    return datetime.now(timezone.utc)
+
+
+def _lease_expiry():
+    return _now() + timedelta(seconds=JOB_LEASE_SECONDS)
+
+
+class JobCancelled(Exception):
+    """Raised inside a job handler once its job has been cancelled"""
+
+
+class InMemoryJobStore:
+    """Process-local job store, used for tests and single-worker development"""
+
+    def __init__(self):
+        self._jobs = {}
+
+    async def create(self, job: dict):
+        self._jobs[job["id"]] = dict(job)
+
+    async def get(self, job_id: str):
+        job = self._jobs.get(job_id)
+        return dict(job) if job else None
+
+    async def update(self, job_id: str, fields: dict, message: str = None, statuses=None):
+        job = self._jobs.get(job_id)
+        if not job or (statuses is not None and job["status"] not in statuses):
+            return False
+        job.update(fields)
+        job["updated_at"] = _now()
+        if message:
+            job["messages"] = (job.get("messages", []) + [message])[-JOB_MAX_MESSAGES:]
+        return True
+
+    async def claim(self, job_id: str, owner: str, lease_expires_at: datetime):
+        job = self._jobs.get(job_id)
+        if not job or job["status"] != QUEUED:
+            return None
+        job.update({"status": RUNNING, "owner": owner, "lease_expires_at": lease_expires_at, "updated_at": _now()})
+        return dict(job)
+
+    async def find_recoverable(self, now: datetime):
+        return [dict(job) for job in self._jobs.values()
+                if job["status"] in ACTIVE_STATES
+                and (job.get("lease_expires_at") is None or job["lease_expires_at"] < now)]
+
+
+class MongoJobStore:
+    """Job store persisted in the jobs collection so status survives restarts"""
+
+    @staticmethod
+    def _collection():
+        return get_database()["jobs"]
+
+    async def create(self, job: dict):
+        await self._collection().insert_one({**job, "_id": job["id"]})
+
+    async def get(self, job_id: str):
+        return await self._collection().find_one({"_id": job_id}, {"_id": 0})
+
+    async def update(self, job_id: str, fields: dict, message: str = None, statuses=None):
+        """
+        :param statuses: Only update a job currently in one of these states
+        :return: True if the job was updated
+        """
+        query = {"_id": job_id}
+        if statuses is not None:
+            query["status"] = {"$in": list(statuses)}
+        update = {"$set": {**fields, "updated_at": _now()}}
+        if message:
+            update["$push"] = {"messages": {"$each": [message], "$slice": -JOB_MAX_MESSAGES}}
+        result = await self._collection().update_one(query, update)
+        return result.matched_count > 0
+
+    async def claim(self, job_id: str, owner: str, lease_expires_at: datetime):
+        """
+        Atomically moves a queued job to running for this owner
+
+        :return: The claimed job, or None if it was already claimed, cancelled or finished
+        """
+        job = await self._collection().find_one_and_update(
+            {"_id": job_id, "status": QUEUED},
+            {"$set": {"status": RUNNING, "owner": owner, "lease_expires_at": lease_expires_at, "updated_at": _now()}},
+            return_document=ReturnDocument.AFTER
+        )
+        if job:
+            job.pop("_id")
+        return job
+
+    async def find_recoverable(self, now: datetime):
+        """Active jobs with no lease (never claimed) or a lapsed one (owner died)"""
+        cursor = self._collection().find(
+            {"status": {"$in": list(ACTIVE_STATES)},
+             "$or": [{"lease_expires_at": None}, {"lease_expires_at": {"$lt": now}}]},
+            {"_id": 0}
+        )
+        return await cursor.to_list(length=None)
+
+
+class JobContext:
+    """Handed to job handlers for reporting progress and observing cancellation"""
+
+    def __init__(self, manager: "JobManager", job_id: str):
+        self.manager = manager
+        self.job_id = job_id
+
+    @property
+    def cancelled(self):
+        return self.manager.is_cancelled(self.job_id)
+
+    def check_cancelled(self):
+        """Raises JobCancelled if the job was cancelled; call between units of work"""
+        if self.cancelled:
+            raise JobCancelled()
+
+    async def progress(self, progress: float, message: str = None):
+        """
+        Records job progress
+
+        :param progress: Completion between 0 and 1
+        :param message: Optional message appended to the job's messages
+        :raises: JobCancelled if the job is no longer running (e.g. cancelled through another worker)
+        """
+        self.check_cancelled()
+        running = await self.manager.store.update(
+            self.job_id, {"progress": max(0.0, min(progress, 1.0))}, message, statuses=[RUNNING]
+        )
+        if not running:
+            self.manager.mark_cancelled(self.job_id)
+            raise JobCancelled()
+
+
+JobHandler = Callable[[dict, JobContext], Awaitable[Optional[dict]]]
+
+
+class JobManager:
+    """
+    Runs registered job handlers off the request path on a fixed-size worker pool.
+    Job state is written to the configured store as AgentStatusModel documents.
+
+    Workers claim jobs atomically and hold a renewed lease while they run
+    them, so several processes can share one store.
+    """
+
+    def __init__(self, store=None, workers: int = JOB_WORKERS, queue_size: int = JOB_QUEUE_SIZE):
+        self.store = store or (InMemoryJobStore() if JOB_STORE_BACKEND == "memory" else MongoJobStore())
+        self.workers = workers
+        self.queue_size = queue_size
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.handlers: Dict[str, JobHandler] = {}
+        self._cancelled = set()
+        self._running: Dict[str, asyncio.Task] = {}
+        self._leases: Dict[str, asyncio.Task] = {}
+        self._workers = []
+        self._recovery = None
+
+    def register(self, kind: str, handler: JobHandler):
+        """
+        Registers a job handler
+
+        :param kind: Job kind name used when submitting
+        :param handler: async handler(params, ctx) returning the job result
+        """
+        self.handlers[kind] = handler
+
+    async def start(self):
+        """Starts the worker pool and, in the background, recovers jobs left over by dead workers"""
+        if self._workers:
+            return
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        if JOB_RECOVER_ON_START:
+            self._recovery = asyncio.create_task(self._recover())
+
+    async def stop(self):
+        """Cancels running jobs and stops the worker pool"""
+        tasks = self._workers + list(self._leases.values()) + ([self._recovery] if self._recovery else [])
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._workers = []
+        self._leases = {}
+        self._recovery = None
+
+    async def _recover(self):
+        """
+        Requeues jobs nobody has claimed and fails jobs whose owner stopped
+        renewing its lease. Claims are atomic, so a job requeued by several
+        workers still runs once.
+        """
+        try:
+            for job in await self.store.find_recoverable(_now()):
+                if job["status"] == QUEUED and job.get("kind") in self.handlers:
+                    await self._queue.put(job["id"])
+                else:
+                    await self.store.update(job["id"], {"status": FAILED, "error": "Interrupted by restart"},
+                                            "Failed: interrupted by restart", statuses=[job["status"]])
+        except Exception as e:
+            logger.error("Job recovery failed", extra={"error": str(e)})
+
+    async def create(self, kind: str, params: dict = None, status: str = QUEUED, hold: bool = False):
+        """
+        Records a new job without scheduling it (for work driven elsewhere, e.g. ingestion)
+
+        :param hold: Take a lease on the job for this worker until release() (see hold())
+        :return: The job as an AgentStatusModel
+        """
+        job = {
+            "id": uuid.uuid4().hex,
+            "kind": kind,
+            "params": params or {},
+            "status": status,
+            "progress": 0.0,
+            "messages": [],
+            "result": None,
+            "error": None,
+            "created_at": _now(),
+            "updated_at": _now()
+        }
+        if hold:
+            job.update({"owner": self.owner, "lease_expires_at": _lease_expiry()})
+        await self.store.create(job)
+        if hold:
+            self.hold(job["id"])
+        return AgentStatusModel(**job)
+
+    async def submit(self, kind: str, params: dict = None):
+        """
+        Creates a job and queues it on the worker pool
+
+        :param kind: Registered job kind
+        :param params: Parameters passed to the handler
+        :return: The queued job as an AgentStatusModel
+        :raises: KeyError for an unknown kind, asyncio.QueueFull if the queue is full
+        """
+        if kind not in self.handlers:
+            raise KeyError(f"Unknown job kind: {kind}")
+        if self._queue.full():
+            raise asyncio.QueueFull()
+        job = await self.create(kind, params)
+        self._queue.put_nowait(job.id)
+        return job
+
+    async def get(self, job_id: str):
+        """
+        :return: AgentStatusModel for the job, or None
+        """
+        job = await self.store.get(job_id)
+        return AgentStatusModel(**job) if job else None
+
+    async def cancel(self, job_id: str):
+        """
+        Cancels a queued or running job. The worker running it may be another
+        process; it stops at its next lease renewal or progress report.
+
+        :return: Updated AgentStatusModel, or None if the job doesn't exist
+        """
+        job = await self.store.get(job_id)
+        if not job:
+            return None
+        if job["status"] in FINISHED_STATES:
+            return AgentStatusModel(**job)
+
+        if await self.store.update(job_id, {"status": CANCELLED}, "Cancelled", statuses=ACTIVE_STATES):
+            self.mark_cancelled(job_id)
+        return await self.get(job_id)
+
+    def mark_cancelled(self, job_id: str):
+        """Records that a job was cancelled and stops its task if it runs in this worker"""
+        self._cancelled.add(job_id)
+        task = self._running.get(job_id)
+        if task:
+            task.cancel()
+
+    def is_cancelled(self, job_id: str):
+        return job_id in self._cancelled
+
+    def hold(self, job_id: str):
+        """Keeps this worker's lease on a job it drives outside the worker pool, until release()"""
+        self._leases[job_id] = asyncio.create_task(self._renew_lease(job_id))
+
+    def release(self, job_id: str):
+        """Drops the lease and cancellation state for a job driven outside the worker pool"""
+        lease = self._leases.pop(job_id, None)
+        if lease:
+            lease.cancel()
+        self._cancelled.discard(job_id)
+
+    async def _renew_lease(self, job_id: str):
+        while True:
+            await asyncio.sleep(JOB_LEASE_SECONDS / 3)
+            try:
+                active = await self.store.update(job_id, {"lease_expires_at": _lease_expiry()}, statuses=ACTIVE_STATES)
+            except Exception as e:
+                logger.warning("Job lease renewal failed", extra={"job_id": job_id, "error": str(e)})
+                continue
+            if not active:
+                # Cancelled through any worker, or failed by recovery
+                self.mark_cancelled(job_id)
+                return
+
+    async def _worker(self):
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job_id: str):
+        if job_id in self._cancelled:
+            self._cancelled.discard(job_id)
+            return
+        job = await self.store.claim(job_id, self.owner, _lease_expiry())
+        if not job:
+            # Claimed by another worker, cancelled or finished
+            return
+
+        await self.store.update(job_id, {}, "Started", statuses=[RUNNING])
+        context = JobContext(self, job_id)
+        task = asyncio.create_task(self.handlers[job["kind"]](job.get("params", {}), context))
+        self._running[job_id] = task
+        self.hold(job_id)
+        try:
+            result = await task
+            completed = await self.store.update(job_id, {"status": COMPLETED, "progress": 1.0, "result": result},
+                                                "Completed", statuses=[RUNNING])
+            if not completed:
+                logger.warning("Job finished after it was cancelled; result discarded", extra={"job_id": job_id})
+        except (asyncio.CancelledError, JobCancelled):
+            # Cancelled through cancel(); the store was already updated there
+            if job_id not in self._cancelled:
+                raise
+        except Exception as e:
+            logger.error("Job failed", extra={"job_id": job_id, "error": str(e)})
+            await self.store.update(job_id, {"status": FAILED, "error": str(e)}, f"Failed: {str(e)}",
+                                    statuses=[RUNNING])
+        finally:
+            self._running.pop(job_id, None)
+            self.release(job_id)
+
+
+job_manager = JobManager()
@@ -0,0 +1,304 @@
+from abc import ABC, abstractmethod
+from typing import List, Optional
+from pydantic import BaseModel, ValidationError
+import asyncio
+import json
+import uuid
+import re
+import os
+from dotenv import load_dotenv
+from ..models.Model import ContractMetadataModel
+from .outboundGovernor import get_governor, OutboundRejected, CircuitOpenError
+from ..utils.metrics import span
+from ..utils.logger import get_logger
+
+# Load environment variables
+load_dotenv()
+
+logger = get_logger("llm")
+
+# "gemini" calls the Gemini API, "fake" is a deterministic local extractor for tests and benchmarks
+LLM_BACKEND = os.getenv("LLM_BACKEND", "gemini")
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-1.5-flash")
+API_KEY = os.getenv("GOOGLE_API_KEY")
+
+# Token budgeting (tokens are estimated from characters)
+CHARS_PER_TOKEN = 4
+LLM_CHUNK_TOKENS = int(os.getenv("LLM_CHUNK_TOKENS", "6000"))
+LLM_CHUNK_OVERLAP_TOKENS = int(os.getenv("LLM_CHUNK_OVERLAP_TOKENS", "200"))
+
+# Outbound limits shared by every extraction in this worker (see outboundGovernor)
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "4"))
+LLM_REQUESTS_PER_MINUTE = float(os.getenv("LLM_REQUESTS_PER_MINUTE", "60"))
+
+# Times a whole document is retried when the governor sheds one of its chunks
+LLM_DOCUMENT_RETRIES = int(os.getenv("LLM_DOCUMENT_RETRIES", "2"))
+
+EXTRACTION_PROMPT = """You extract structured metadata from contracts.
+The text below is part {part} of {parts} of one contract.
+Return ONLY a JSON object with these keys (use null or [] when this part doesn't say):
+  "title": string,
+  "parties": [string],
+  "effective_date": "YYYY-MM-DD",
+  "expiration_date": "YYYY-MM-DD",
+  "terms": [{{"clause": string, "description": string}}],
+  "status": string,
+  "plartform": string (the website or platform the contract covers)
+
+Contract text:
+{text}"""
+
+
+class ChunkExtraction(BaseModel):
+    """What the LLM returns for one chunk; every field is optional"""
+    title: Optional[str] = None
+    parties: List[str] = []
+    effective_date: Optional[str] = None
+    expiration_date: Optional[str] = None
+    terms: List[dict] = []
+    status: Optional[str] = None
+    plartform: Optional[str] = None
+
+
+class LLMBackend(ABC):
+    """Interface for LLM providers used by the extraction stage"""
+    name = "base"
+
+    @abstractmethod
+    async def generate(self, prompt: str) -> str:
+        """
+        :param prompt: Full extraction prompt for one chunk
+        :return: The model's raw text response
+        """
+
+
+class GeminiBackend(LLMBackend):
+    """Gemini backend; one model client is reused for every call"""
+    name = "gemini"
+
+    def __init__(self, model_name: str = GEMINI_MODEL):
+        # Imported on first use so workers on the fake backend, or serving no uploads, never load the SDK
+        import google.generativeai as genai
+        genai.configure(api_key=API_KEY)
+        self.model = genai.GenerativeModel(
+            model_name,
+            generation_config={"response_mime_type": "application/json"}
+        )
+
+    async def generate(self, prompt: str) -> str:
+        response = await self.model.generate_content_async(prompt)
+        return response.text
+
+
+class FakeBackend(LLMBackend):
+    """Deterministic, offline extractor that pulls metadata out of the text with regexes"""
+    name = "fake"
+
+    PARTIES = re.compile(r"between\s+(.+?)\s+and\s+(.+?)(?:[,.(\n]|$)", re.IGNORECASE)
+    DATE = re.compile(r"\b(\d{4}-\d{2}-\d{2})\b")
+    CLAUSE = re.compile(r"^\s*(?:\d+[.)]\s*)?([A-Z][A-Za-z ]{2,40}):\s*(.+)$", re.MULTILINE)
+    DOMAIN = re.compile(r"\b((?:https?://)?(?:www\.)?[a-z0-9-]+\.(?:com|org|net|io|in|tv))\b", re.IGNORECASE)
+
+    async def generate(self, prompt: str) -> str:
+        text = prompt.split("Contract text:\n", 1)[-1]
+        lines = [line.strip() for line in text.splitlines() if line.strip()]
+        parties = self.PARTIES.search(text)
+        dates = self.DATE.findall(text)
+        domain = self.DOMAIN.search(text)
+        return json.dumps({
+            "title": lines[0][:120] if lines else None,
+            "parties": [party.strip() for party in parties.groups()] if parties else [],
+            "effective_date": dates[0] if dates else None,
+            "expiration_date": dates[-1] if len(dates) > 1 else None,
+            "terms": [{"clause": clause.strip(), "description": description.strip()}
+                      for clause, description in self.CLAUSE.findall(text)],
+            "status": "Active" if lines else None,
+            "plartform": domain.group(1) if domain else None
+        })
+
+
+_backend = None
+
+
+def get_llm_backend():
+    """
+    :return: The process-wide LLM backend selected by LLM_BACKEND
+    """
+    global _backend
+    if _backend is None:
+        _backend = FakeBackend() if LLM_BACKEND == "fake" else GeminiBackend()
+    return _backend
+
+
+def llm_governor():
+    """
+    :return: The outbound governor for the active LLM backend
+    """
+    return get_governor(
+        f"llm:{get_llm_backend().name}",
+        requests_per_minute=LLM_REQUESTS_PER_MINUTE,
+        max_in_flight=LLM_MAX_CONCURRENCY
+    )
+
+
+def chunk_text(text: str, chunk_tokens: int = LLM_CHUNK_TOKENS, overlap_tokens: int = LLM_CHUNK_OVERLAP_TOKENS):
+    """
+    Splits text into chunks that fit the token budget, preferring paragraph breaks
+
+    :param text: Document text
+    :return: List of chunks
+    """
+    max_chars = chunk_tokens * CHARS_PER_TOKEN
+    overlap = overlap_tokens * CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return [text]
+
+    chunks = []
+    start = 0
+    while start < len(text):
+        end = min(start + max_chars, len(text))
+        if end < len(text):
+            # Break at the last paragraph (or line) boundary in the back half of the window
+            boundary = text.rfind("\n\n", start + max_chars // 2, end)
+            if boundary == -1:
+                boundary = text.rfind("\n", start + max_chars // 2, end)
+            if boundary != -1:
+                end = boundary
+        chunks.append(text[start:end])
+        if end >= len(text):
+            break
+        start = max(end - overlap, start + 1)
+    return chunks
+
+
+def parse_chunk_response(raw: str):
+    """
+    Parses and validates one LLM response
+
+    :return: ChunkExtraction
+    :raises: ValueError if the response isn't valid extraction JSON
+    """
+    cleaned = raw.strip()
+    if cleaned.startswith("```"):
+        cleaned = re.sub(r"^```(?:json)?\s*|\s*```$", "", cleaned)
+    try:
+        data = json.loads(cleaned)
+        if not isinstance(data, dict):
+            raise ValueError("Expected a JSON object")
+        parties = data.get("parties") or []
+        terms = data.get("terms") or []
+        # A lone string or object stands for a one-item list; iterating it would split it up
+        if isinstance(parties, str):
+            parties = [parties]
+        if isinstance(terms, dict):
+            terms = [terms]
+        if not isinstance(parties, list) or not isinstance(terms, list):
+            raise ValueError("Expected \"parties\" and \"terms\" to be lists")
+        data["parties"] = [str(party) for party in parties]
+        data["terms"] = [term for term in terms if isinstance(term, dict)]
+        return ChunkExtraction(**data)
+    except (json.JSONDecodeError, ValidationError, TypeError) as e:
+        raise ValueError(f"Invalid extraction JSON: {str(e)}")
+
+
+async def _extract_chunk(chunk: str, part: int, parts: int):
+    prompt = EXTRACTION_PROMPT.format(part=part, parts=parts, text=chunk)
+    async with span("llm_chunk"):
+        raw = await llm_governor().call(get_llm_backend().generate, prompt)
+    return parse_chunk_response(raw)
+
+
+def merge_extractions(extractions: List[ChunkExtraction], failed_chunks: int = 0):
+    """
+    Merges per-chunk results in document order
+
+    :param extractions: Chunks that were extracted successfully
+    :param failed_chunks: Chunks that failed, recorded so partial extractions can be told apart
+    :return: Dict of merged ContractMetadataModel fields
+    """
+    def first(field):
+        return next((getattr(e, field) for e in extractions if getattr(e, field)), None)
+
+    parties = list(dict.fromkeys(party.strip() for e in extractions for party in e.parties if party.strip()))
+
+    terms = []
+    seen = set()
+    for e in extractions:
+        for term in e.terms:
+            clause = str(term.get("clause") or "").strip()
+            description = str(term.get("description") or "").strip()
+            key = (clause.lower(), description.lower())
+            if (clause or description) and key not in seen:
+                seen.add(key)
+                terms.append({"clause": clause, "description": description})
+
+    expiration_dates = [e.expiration_date for e in extractions if e.expiration_date]
+    return {
+        "title": first("title"),
+        "parties": parties,
+        "effective_date": first("effective_date"),
+        "expiration_date": expiration_dates[-1] if expiration_dates else None,
+        "terms": terms,
+        "status": first("status"),
+        "plartform": first("plartform") or "",
+        "failed_chunks": failed_chunks
+    }
+
+
+async def _extract_chunks(chunks):
+    """
+    Runs a document's chunks through the governor, at most max_in_flight at a
+    time so one long document never fills the governor's pending queue
+
+    :return: Outcome per chunk: a ChunkExtraction or the exception it raised
+    """
+    slots = asyncio.Semaphore(llm_governor().max_in_flight)
+
+    async def extract(index: int, chunk: str):
+        async with slots:
+            return await _extract_chunk(chunk, index + 1, len(chunks))
+
+    return await asyncio.gather(*(extract(index, chunk) for index, chunk in enumerate(chunks)),
+                                return_exceptions=True)
+
+
+@span("llm_extract")
+async def extract_contract_metadata(text: str, contract_ref: str = None):
+    """
+    Extracts contract metadata from document text: chunks it to the token
+    budget, runs the chunks concurrently through the LLM governor and merges them.
+
+    A chunk shed by the governor is not a failed chunk: the whole document is
+    retried after the governor's retry_after, and fails if it is still shed.
+
+    :param text: Extracted contract text
+    :param contract_ref: Value for the model's id field (defaults to a random reference)
+    :return: ContractMetadataModel; failed_chunks is non-zero when some chunks could not be extracted
+    :raises: ValueError if no chunk produced a valid result, OutboundRejected if the provider was shed
+    """
+    chunks = chunk_text(text)
+    for attempt in range(LLM_DOCUMENT_RETRIES + 1):
+        outcomes = await _extract_chunks(chunks)
+        rejected = next((outcome for outcome in outcomes if isinstance(outcome, OutboundRejected)), None)
+        if rejected is None:
+            break
+        if isinstance(rejected, CircuitOpenError) or attempt == LLM_DOCUMENT_RETRIES:
+            # Surface shedding as-is so callers can tell "provider unavailable" from bad output
+            raise rejected
+        logger.warning("LLM extraction shed, retrying document",
+                       extra={"chunks": len(chunks), "attempt": attempt + 1, "error": str(rejected)})
+        await asyncio.sleep(rejected.retry_after or 0)
+
+    extractions = [outcome for outcome in outcomes if isinstance(outcome, ChunkExtraction)]
+    errors = [outcome for outcome in outcomes if isinstance(outcome, BaseException)]
+    for error in errors:
+        logger.warning("LLM chunk extraction failed", extra={"chunks": len(chunks), "error": str(error)})
+    if not extractions:
+        raise ValueError(f"LLM extraction failed for all {len(chunks)} chunk(s)")
+    if errors:
+        logger.warning("Partial LLM extraction", extra={"chunks": len(chunks), "failed_chunks": len(errors)})
+
+    return ContractMetadataModel(
+        id=contract_ref or f"contract_{uuid.uuid4().hex[:12]}",
+        **merge_extractions(extractions, len(errors))
+    )
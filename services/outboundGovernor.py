@@ -0,0 +1,306 @@
+from typing import Callable, Dict
+import threading
+import asyncio
+import random
+import time
+import os
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Defaults for governors created without explicit limits
+OUTBOUND_REQUESTS_PER_MINUTE = float(os.getenv("OUTBOUND_REQUESTS_PER_MINUTE", "60"))
+OUTBOUND_MAX_IN_FLIGHT = int(os.getenv("OUTBOUND_MAX_IN_FLIGHT", "4"))
+OUTBOUND_MAX_PENDING = int(os.getenv("OUTBOUND_MAX_PENDING", "100"))
+OUTBOUND_MAX_RETRIES = int(os.getenv("OUTBOUND_MAX_RETRIES", "4"))
+OUTBOUND_BACKOFF_BASE = float(os.getenv("OUTBOUND_BACKOFF_BASE", "0.5"))
+OUTBOUND_BACKOFF_MAX = float(os.getenv("OUTBOUND_BACKOFF_MAX", "30"))
+
+# Circuit breaker: open after this many consecutive failures, retry after the cool-down
+OUTBOUND_FAILURE_THRESHOLD = int(os.getenv("OUTBOUND_FAILURE_THRESHOLD", "5"))
+OUTBOUND_RESET_TIMEOUT = float(os.getenv("OUTBOUND_RESET_TIMEOUT", "30"))
+
+RETRYABLE_STATUS_CODES = {408, 425, 429, 500, 502, 503, 504}
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class OutboundRejected(Exception):
+    """Raised without calling the provider when the governor sheds the call"""
+
+    def __init__(self, provider: str, reason: str, retry_after: float = None):
+        super().__init__(f"{provider}: {reason}")
+        self.provider = provider
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class CircuitOpenError(OutboundRejected):
+    """Raised while a provider's circuit breaker is open"""
+
+
+def status_code_of(error: Exception):
+    """Best-effort HTTP status of a provider error (google-api-core, requests, httpx)"""
+    for candidate in (getattr(error, "code", None), getattr(error, "status_code", None),
+                      getattr(getattr(error, "response", None), "status_code", None)):
+        if isinstance(candidate, int):
+            return candidate
+    return None
+
+
+def is_retryable(error: Exception):
+    """Throttling, server errors, timeouts and connection failures are worth retrying"""
+    if isinstance(error, OutboundRejected):
+        return False
+    if isinstance(error, (TimeoutError, ConnectionError, asyncio.TimeoutError)):
+        return True
+    return status_code_of(error) in RETRYABLE_STATUS_CODES
+
+
+class OutboundGovernor:
+    """
+    Limits calls to one external provider: a token-bucket rate limit, a cap
+    on calls in flight, a cap on callers waiting, retries with jittered
+    exponential backoff, and a circuit breaker.
+
+    Usable from the event loop (call) and from worker threads (call_sync).
+    The in-flight cap is enforced separately for each of the two.
+    """
+
+    def __init__(self, name: str,
+                 requests_per_minute: float = OUTBOUND_REQUESTS_PER_MINUTE,
+                 max_in_flight: int = OUTBOUND_MAX_IN_FLIGHT,
+                 max_pending: int = OUTBOUND_MAX_PENDING,
+                 max_retries: int = OUTBOUND_MAX_RETRIES,
+                 backoff_base: float = OUTBOUND_BACKOFF_BASE,
+                 backoff_max: float = OUTBOUND_BACKOFF_MAX,
+                 failure_threshold: int = OUTBOUND_FAILURE_THRESHOLD,
+                 reset_timeout: float = OUTBOUND_RESET_TIMEOUT,
+                 retryable: Callable[[Exception], bool] = is_retryable):
+        self.name = name
+        self.rate = requests_per_minute / 60.0
+        self.capacity = max(1.0, self.rate)
+        self.max_in_flight = max_in_flight
+        self.max_pending = max_pending
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.retryable = retryable
+
+        self._lock = threading.Lock()
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._thread_slots = threading.BoundedSemaphore(max_in_flight)
+        self._async_slots = None
+
+        self.state = CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+
+        self.pending = 0
+        self.in_flight = 0
+        self.counters = {"calls": 0, "succeeded": 0, "failed": 0, "retries": 0,
+                         "rejected_queue_full": 0, "rejected_circuit_open": 0}
+
+    # Rate limit
+    def _reserve(self):
+        """Takes a token, returning how long the caller must wait before using it"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    # Circuit breaker
+    def _check_circuit(self):
+        with self._lock:
+            if self.state == OPEN:
+                remaining = self._opened_at + self.reset_timeout - time.monotonic()
+                if remaining > 0:
+                    self.counters["rejected_circuit_open"] += 1
+                    raise CircuitOpenError(self.name, "circuit open", retry_after=remaining)
+                self.state = HALF_OPEN
+            if self.state == HALF_OPEN:
+                # Let a single trial call through to probe the provider
+                if self._trial_in_flight:
+                    self.counters["rejected_circuit_open"] += 1
+                    raise CircuitOpenError(self.name, "circuit half-open", retry_after=self.backoff_base)
+                self._trial_in_flight = True
+
+    def _record(self, success: bool):
+        with self._lock:
+            self._trial_in_flight = False
+            if success:
+                self.counters["succeeded"] += 1
+                self._consecutive_failures = 0
+                self.state = CLOSED
+                return
+            self.counters["failed"] += 1
+            self._consecutive_failures += 1
+            if self.state == HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+                self.state = OPEN
+                self._opened_at = time.monotonic()
+
+    def _release_trial(self):
+        """Frees a half-open trial slot when the call was cancelled rather than failed"""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def is_open(self):
+        """True while calls would be rejected by the circuit breaker"""
+        with self._lock:
+            return self.state == OPEN and time.monotonic() < self._opened_at + self.reset_timeout
+
+    def _enter_queue(self):
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.counters["rejected_queue_full"] += 1
+                raise OutboundRejected(self.name, "too many pending calls", retry_after=self.backoff_base)
+            self.pending += 1
+            self.counters["calls"] += 1
+
+    def _leave_queue(self):
+        with self._lock:
+            self.pending -= 1
+
+    def _set_in_flight(self, delta: int):
+        with self._lock:
+            self.in_flight += delta
+
+    def _backoff(self, attempt: int, error: Exception):
+        """Full-jitter exponential backoff, honouring a Retry-After header when the provider sends one"""
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+        headers = getattr(getattr(error, "response", None), "headers", None) or {}
+        try:
+            delay = max(delay, min(self.backoff_max, float(headers.get("Retry-After"))))
+        except (TypeError, ValueError):
+            pass
+        with self._lock:
+            self.counters["retries"] += 1
+        return delay
+
+    async def call(self, fn: Callable, *args, **kwargs):
+        """
+        Awaits fn(*args, **kwargs) under the governor's limits
+
+        :param fn: Coroutine function performing one provider request
+        :return: fn's result
+        :raises: OutboundRejected/CircuitOpenError when shed, or fn's last error
+        """
+        if self._async_slots is None:
+            self._async_slots = asyncio.Semaphore(self.max_in_flight)
+        for attempt in range(self.max_retries + 1):
+            self._check_circuit()
+            try:
+                self._enter_queue()
+            except OutboundRejected:
+                self._release_trial()
+                raise
+            left = False
+            try:
+                async with self._async_slots:
+                    await asyncio.sleep(self._reserve())
+                    self._leave_queue()
+                    left = True
+                    self._set_in_flight(1)
+                    try:
+                        result = await fn(*args, **kwargs)
+                    finally:
+                        self._set_in_flight(-1)
+            except BaseException as e:
+                if not left:
+                    self._leave_queue()
+                if isinstance(e, Exception):
+                    self._record(False)
+                    if attempt < self.max_retries and self.retryable(e):
+                        await asyncio.sleep(self._backoff(attempt, e))
+                        continue
+                else:
+                    self._release_trial()
+                raise
+            self._record(True)
+            return result
+
+    def call_sync(self, fn: Callable, *args, **kwargs):
+        """
+        Blocking counterpart of call() for worker threads
+
+        :param fn: Function performing one provider request
+        :return: fn's result
+        """
+        for attempt in range(self.max_retries + 1):
+            self._check_circuit()
+            try:
+                self._enter_queue()
+            except OutboundRejected:
+                self._release_trial()
+                raise
+            left = False
+            try:
+                with self._thread_slots:
+                    time.sleep(self._reserve())
+                    self._leave_queue()
+                    left = True
+                    self._set_in_flight(1)
+                    try:
+                        result = fn(*args, **kwargs)
+                    finally:
+                        self._set_in_flight(-1)
+            except BaseException as e:
+                if not left:
+                    self._leave_queue()
+                if isinstance(e, Exception):
+                    self._record(False)
+                    if attempt < self.max_retries and self.retryable(e):
+                        time.sleep(self._backoff(attempt, e))
+                        continue
+                else:
+                    self._release_trial()
+                raise
+            self._record(True)
+            return result
+
+    def stats(self):
+        """Current queue depth, in-flight calls, breaker state and counters"""
+        with self._lock:
+            return {
+                "provider": self.name,
+                "state": self.state,
+                "pending": self.pending,
+                "in_flight": self.in_flight,
+                "tokens": round(max(self._tokens, 0.0), 2),
+                **self.counters
+            }
+
+
+_governors: Dict[str, OutboundGovernor] = {}
+_governors_lock = threading.Lock()
+
+
+def get_governor(name: str, **limits):
+    """
+    Gets the process-wide governor for a provider, creating it on first use
+
+    :param name: Provider name, e.g. "gemini" or "scraper:netflix"
+    :param limits: OutboundGovernor keyword arguments used when it is created
+    :return: OutboundGovernor
+    """
+    with _governors_lock:
+        governor = _governors.get(name)
+        if governor is None:
+            governor = _governors[name] = OutboundGovernor(name, **limits)
+        return governor
+
+
+def governor_stats():
+    """Stats for every provider governed in this worker"""
+    with _governors_lock:
+        governors = list(_governors.values())
+    return [governor.stats() for governor in governors]
@@ -0,0 +1,92 @@
+from concurrent.futures import ThreadPoolExecutor
+from passlib.context import CryptContext
+from fastapi import HTTPException
+import asyncio
+import os
+from dotenv import load_dotenv
+from ..utils.metrics import span, publish_stats
+
+# Load environment variables
+load_dotenv()
+
+# bcrypt cost. Hashes with any other cost are transparently rehashed on the next login.
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+
+# bcrypt releases the GIL, so a small thread pool runs hashes in parallel
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# Requests beyond this many pending hash operations are shed with a 503
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "64"))
+
+# Password hashing configuration
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_rounds=BCRYPT_ROUNDS
+)
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt on a dedicated, size-limited thread pool so logins never block
+    the event loop, and sheds load once too many operations are waiting.
+    """
+
+    def __init__(self, workers: int = PASSWORD_HASH_WORKERS, max_pending: int = PASSWORD_HASH_MAX_PENDING):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+
+    async def _run(self, fn, *args):
+        # Only touched from the event loop thread, so plain counters are safe
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=503,
+                detail="Authentication service is busy, retry shortly",
+                headers={"Retry-After": "1"}
+            )
+        self.pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        finally:
+            self.pending -= 1
+            self.completed += 1
+
+    async def hash(self, password: str):
+        """
+        :return: bcrypt hash of the password
+        """
+        async with span("bcrypt_hash"):
+            return await self._run(pwd_context.hash, password)
+
+    async def verify_and_update(self, password: str, hashed: str):
+        """
+        Verifies a password and rehashes it if the stored hash uses outdated parameters
+
+        :return: (valid, new_hash) where new_hash is None unless the stored hash should be replaced
+        """
+        async with span("bcrypt_verify"):
+            return await self._run(pwd_context.verify_and_update, password, hashed)
+
+    def stats(self):
+        return {
+            "workers": self.workers,
+            "pending": self.pending,
+            "queued": max(0, self.pending - self.workers),
+            "max_pending": self.max_pending,
+            "completed": self.completed,
+            "rejected": self.rejected
+        }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+password_hasher = PasswordHasher()
+publish_stats("password_hasher", password_hasher.stats, "bcrypt pool workers, pending, queued and rejected operations")
@@ -0,0 +1,151 @@
+from concurrent.futures import Executor
+from dataclasses import dataclass
+from itertools import islice
+from typing import Optional
+import asyncio
+import time
+import os
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Pages handed to one worker process at a time
+PDF_PAGES_PER_CHUNK = int(os.getenv("PDF_PAGES_PER_CHUNK", "25"))
+
+# Budgets: past these, extraction stops and returns what it has
+PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", "1000"))
+PDF_TIME_BUDGET_SECONDS = float(os.getenv("PDF_TIME_BUDGET_SECONDS", "120"))
+
+# Cap on extracted characters per document (bounds worker and parent memory)
+PDF_MAX_CHARS = int(os.getenv("PDF_MAX_CHARS", "5000000"))
+
+
+@dataclass
+class PdfText:
+    """Extracted document text plus how much of the document it covers"""
+    text: str
+    pages_total: int
+    pages_extracted: int
+    truncated: bool = False
+    reason: Optional[str] = None
+
+
+def load_pdf_library():
+    """
+    Imports pdfplumber on first use; only processes that actually parse PDFs pay for it.
+    Also the process pool initializer, so spawned workers import it before their first job.
+
+    :return: The pdfplumber module
+    """
+    import pdfplumber
+    return pdfplumber
+
+
+def iter_page_text(pdf_path, start: int = 0, end: Optional[int] = None, deadline: Optional[float] = None):
+    """
+    Yields the text of each page in [start, end), releasing each page after use
+
+    :param pdf_path: Path to the PDF file
+    :param start: First page index
+    :param end: Page index to stop before (None for the last page)
+    :param deadline: time.time() after which no further pages are read
+    """
+    with load_pdf_library().open(pdf_path) as pdf:
+        for page in islice(pdf.pages, start, end):
+            if deadline is not None and time.time() > deadline:
+                return
+            try:
+                # extract_text() returns None for pages without a text layer
+                yield page.extract_text() or ""
+            finally:
+                page.close()
+
+
+def count_pages(pdf_path):
+    with load_pdf_library().open(pdf_path) as pdf:
+        return len(pdf.pages)
+
+
+def extract_page_range(pdf_path, start: int, end: int, deadline: float, max_chars: int):
+    """
+    Worker-process entry point: extracts one page range
+
+    :return: (text of the range, pages read)
+    """
+    parts = []
+    chars = 0
+    pages = 0
+    for page_text in iter_page_text(pdf_path, start, end, deadline):
+        pages += 1
+        parts.append(page_text)
+        chars += len(page_text) + 1
+        if chars >= max_chars:
+            break
+    return "\n".join(parts), pages
+
+
+async def extract_pdf_text(pdf_path, executor: Executor,
+                           pages_per_chunk: int = PDF_PAGES_PER_CHUNK,
+                           max_pages: int = PDF_MAX_PAGES,
+                           time_budget: float = PDF_TIME_BUDGET_SECONDS,
+                           max_chars: int = PDF_MAX_CHARS):
+    """
+    Extracts a PDF's text by fanning page ranges out across a process pool.
+    Ranges are joined in page order once; page, time and size budgets yield
+    partial text rather than failing.
+
+    :param pdf_path: Path to the PDF file
+    :param executor: Process pool to run page ranges on
+    :return: PdfText
+    """
+    loop = asyncio.get_running_loop()
+    pdf_path = str(pdf_path)
+    started = time.time()
+    deadline = started + time_budget
+
+    pages_total = await loop.run_in_executor(executor, count_pages, pdf_path)
+    page_limit = min(pages_total, max_pages)
+    futures = [
+        loop.run_in_executor(executor, extract_page_range, pdf_path, start,
+                             min(start + pages_per_chunk, page_limit), deadline, max_chars)
+        for start in range(0, page_limit, pages_per_chunk)
+    ]
+
+    parts = []
+    chars = 0
+    pages_extracted = 0
+    reason = "page_budget" if page_limit < pages_total else None
+    try:
+        # Consume in page order so the text is assembled without reordering
+        for index, future in enumerate(futures):
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                reason = "time_budget"
+                break
+            try:
+                range_text, range_pages = await asyncio.wait_for(asyncio.shield(future), timeout=remaining)
+            except asyncio.TimeoutError:
+                reason = "time_budget"
+                break
+            pages_extracted += range_pages
+            if range_pages < min(pages_per_chunk, page_limit - index * pages_per_chunk) and reason is None:
+                reason = "time_budget" if time.time() > deadline else "size_budget"
+            if chars + len(range_text) >= max_chars:
+                parts.append(range_text[:max_chars - chars])
+                reason = "size_budget"
+                break
+            parts.append(range_text)
+            chars += len(range_text) + 1
+    finally:
+        for future in futures:
+            future.cancel()
+
+    text = "\n".join(parts).strip()
+    return PdfText(
+        text=text,
+        pages_total=pages_total,
+        pages_extracted=pages_extracted,
+        truncated=reason is not None,
+        reason=reason
+    )
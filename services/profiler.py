@@ -0,0 +1,234 @@
+"""
+On-demand request profiling.
+
+Two profilers are available:
+
+    sample    a background thread samples every thread's stack every
+              PROFILE_SAMPLE_INTERVAL_MS and writes folded stacks
+              (flamegraph.pl, inferno, speedscope)
+    cprofile  deterministic cProfile of the event loop thread, written as a
+              pstats dump (snakeviz, flameprof, python -m pstats)
+
+Both see the whole worker while the request runs, so work done for
+concurrent requests shows up too; the sampler also covers the bcrypt and
+to_thread pools, which cProfile does not. Only one request per worker is
+profiled at a time.
+
+Profiles are kept in a bounded ring buffer on disk: each one is a data file
+plus a JSON sidecar, and the oldest are deleted beyond PROFILE_MAX_FILES.
+"""
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+import threading
+import cProfile
+import marshal
+import json
+import uuid
+import time
+import sys
+import os
+import re
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Requests carrying this token in PROFILE_HEADER are profiled; unset disables the header trigger
+PROFILE_ADMIN_TOKEN = os.getenv("PROFILE_ADMIN_TOKEN")
+PROFILE_HEADER = "x-profile"
+PROFILE_MODE_HEADER = "x-profile-mode"
+
+# Fraction of requests profiled without the header (0 disables sampling)
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+
+# Sampled profiles of requests faster than this are discarded
+PROFILE_MIN_DURATION_MS = float(os.getenv("PROFILE_MIN_DURATION_MS", "0"))
+
+PROFILE_MODE = os.getenv("PROFILE_MODE", "sample")
+PROFILE_SAMPLE_INTERVAL_MS = float(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", "2"))
+PROFILE_DIR = Path(os.getenv("PROFILE_DIR", "profiles"))
+PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", "50"))
+
+PROFILE_MODES = {"sample": "folded", "cprofile": "prof"}
+
+PROFILE_ID_PATTERN = re.compile(r"^\d{20}-[0-9a-f]{8}$")
+
+
+def profiling_enabled():
+    """
+    :return: True if any trigger is configured; otherwise the middleware is not installed at all
+    """
+    return bool(PROFILE_ADMIN_TOKEN) or PROFILE_SAMPLE_RATE > 0
+
+
+def new_profile_id():
+    """Sortable by creation time, so the ring buffer can trim by name"""
+    return f"{datetime.now(timezone.utc).strftime('%Y%m%d%H%M%S%f')}-{uuid.uuid4().hex[:8]}"
+
+
+def _frame_label(code):
+    parts = Path(code.co_filename).parts
+    return f"{code.co_name} ({'/'.join(parts[-2:])}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """Samples every other thread's Python stack into folded-stack counts"""
+
+    def __init__(self, interval_ms: float = PROFILE_SAMPLE_INTERVAL_MS):
+        self.interval = interval_ms / 1000
+        self.counts = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame.f_code))
+                    frame = frame.f_back
+                stack.append(f"thread:{names.get(thread_id, thread_id)}")
+                self.counts[";".join(reversed(stack))] += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        return "".join(f"{stack} {count}\n" for stack, count in self.counts.most_common()).encode("utf-8")
+
+
+class CProfileCapture:
+    """cProfile of the calling (event loop) thread"""
+
+    def __init__(self):
+        self.profiler = cProfile.Profile()
+
+    def start(self):
+        self.profiler.enable()
+
+    def stop(self):
+        self.profiler.disable()
+        self.profiler.create_stats()
+        # Same bytes as Profile.dump_stats(), loadable with pstats.Stats(path)
+        return marshal.dumps(self.profiler.stats)
+
+
+class ProfileStore:
+    """Bounded on-disk ring buffer of profiles"""
+
+    def __init__(self, directory: Path = PROFILE_DIR, max_files: int = PROFILE_MAX_FILES):
+        self.directory = Path(directory)
+        self.max_files = max_files
+        self._lock = threading.Lock()
+
+    def save(self, profile_id: str, data: bytes, meta: dict):
+        """
+        Writes a profile and its metadata, then trims the oldest beyond max_files
+
+        :param profile_id: ID from new_profile_id()
+        :param data: Profile body
+        :param meta: Request details (method, route, status, duration_ms, mode, ...)
+        """
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            extension = PROFILE_MODES[meta["mode"]]
+            data_path = self.directory / f"{profile_id}.{extension}"
+            with open(data_path.with_suffix(".tmp"), "wb") as f:
+                f.write(data)
+            os.replace(data_path.with_suffix(".tmp"), data_path)
+            with open(self.directory / f"{profile_id}.json", "w") as f:
+                json.dump({**meta, "id": profile_id, "file": data_path.name, "size": len(data)}, f)
+            self._trim()
+
+    def _trim(self):
+        sidecars = sorted(self.directory.glob("*.json"))
+        for sidecar in sidecars[:max(0, len(sidecars) - self.max_files)]:
+            for path in self.directory.glob(f"{sidecar.stem}.*"):
+                path.unlink(missing_ok=True)
+
+    def list(self):
+        """
+        :return: Metadata of the stored profiles, newest first
+        """
+        profiles = []
+        for sidecar in sorted(self.directory.glob("*.json"), reverse=True):
+            try:
+                with open(sidecar) as f:
+                    profiles.append(json.load(f))
+            except (FileNotFoundError, json.JSONDecodeError):
+                # Trimmed or still being written by another worker
+                continue
+        return profiles
+
+    def path(self, profile_id: str):
+        """
+        :return: Path of a stored profile, or None (IDs that aren't well-formed never touch the filesystem)
+        """
+        if not PROFILE_ID_PATTERN.match(profile_id):
+            return None
+        for extension in PROFILE_MODES.values():
+            path = self.directory / f"{profile_id}.{extension}"
+            if path.exists():
+                return path
+        return None
+
+
+profile_store = ProfileStore()
+
+
+class RequestProfile:
+    """One profiled request; only one can be active per worker"""
+    _active = False
+
+    def __init__(self, mode: str, forced: bool):
+        self.id = new_profile_id()
+        self.mode = mode if mode in PROFILE_MODES else PROFILE_MODE
+        self.forced = forced
+        self._capture = None
+        self._started = None
+
+    @classmethod
+    def begin(cls, mode: str = PROFILE_MODE, forced: bool = False):
+        """
+        :param mode: "sample" or "cprofile"
+        :param forced: Requested by header (kept regardless of PROFILE_MIN_DURATION_MS)
+        :return: A started RequestProfile, or None if another request is being profiled
+        """
+        if cls._active:
+            return None
+        cls._active = True
+        profile = cls(mode, forced)
+        profile._capture = StackSampler() if profile.mode == "sample" else CProfileCapture()
+        profile._started = time.perf_counter()
+        profile._capture.start()
+        return profile
+
+    def finish(self, meta: dict, store: ProfileStore = profile_store):
+        """
+        Stops profiling and stores the profile unless the request was too fast to be interesting
+
+        :param meta: Request details added to the stored metadata
+        :return: Profile ID if stored, else None
+        """
+        try:
+            data = self._capture.stop()
+        finally:
+            RequestProfile._active = False
+        duration_ms = (time.perf_counter() - self._started) * 1000
+        if not self.forced and duration_ms < PROFILE_MIN_DURATION_MS:
+            return None
+        store.save(self.id, data, {
+            **meta,
+            "mode": self.mode,
+            "trigger": "header" if self.forced else "sample",
+            "duration_ms": round(duration_ms, 2),
+            "created_at": datetime.now(timezone.utc).isoformat()
+        })
+        return self.id
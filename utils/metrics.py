@@ -0,0 +1,151 @@
+"""
+Prometheus metrics: request latency, named spans around hot paths,
+MongoDB command timings, and the stats() of in-process queues and pools.
+
+With several uvicorn workers set PROMETHEUS_MULTIPROC_DIR to an empty,
+writable directory so /metrics aggregates every worker.
+"""
+from functools import wraps
+import asyncio
+import time
+import os
+from prometheus_client import (
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    generate_latest,
+    multiprocess
+)
+from pymongo import monitoring
+
+# Latency buckets in seconds, from sub-millisecond Mongo reads to multi-minute LLM runs
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route",
+    ["method", "route", "status"], buckets=LATENCY_BUCKETS
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight", "HTTP requests being served", ["method", "route"],
+    multiprocess_mode="livesum"
+)
+SPAN_DURATION = Histogram(
+    "span_duration_seconds", "Duration of named spans inside request and job handlers",
+    ["span"], buckets=LATENCY_BUCKETS
+)
+SPAN_ERRORS = Counter("span_errors_total", "Spans that raised", ["span"])
+MONGO_COMMAND_DURATION = Histogram(
+    "mongo_command_duration_seconds", "MongoDB command latency", ["command", "outcome"], buckets=LATENCY_BUCKETS
+)
+
+# How often each worker republishes its stats gauges in multiprocess mode
+STATS_REFRESH_SECONDS = float(os.getenv("METRICS_STATS_REFRESH_SECONDS", "5"))
+
+# name -> (gauge, stats function) registered with publish_stats()
+_STATS_SOURCES = {}
+
+
+def publish_stats(name: str, stats, documentation: str):
+    """
+    Exposes a component's stats() dict as a gauge labelled by stat, e.g.
+    password_hasher{stat="pending"}. Values are summed across workers.
+
+    :param name: Metric name
+    :param stats: Function returning a dict of stat name -> number
+    :param documentation: Metric help text
+    """
+    gauge = Gauge(name, documentation, ["stat"], multiprocess_mode="livesum")
+    _STATS_SOURCES[name] = (gauge, stats)
+
+
+def refresh_stats():
+    """Copies the current value of every published stat into its gauge"""
+    for gauge, stats in _STATS_SOURCES.values():
+        for stat, value in stats().items():
+            gauge.labels(stat).set(value)
+
+
+async def refresh_stats_periodically(interval: float = STATS_REFRESH_SECONDS):
+    """
+    Keeps this worker's stats gauges current in multiprocess mode, where a
+    scrape is served by one worker but reads every worker's values
+    """
+    if not os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        return
+    while True:
+        refresh_stats()
+        await asyncio.sleep(interval)
+
+
+class span:
+    """
+    Times a block or function as a named span:
+
+        with span("pdf_extract"): ...
+        async with span("llm_chunk"): ...
+
+        @span("bcrypt_hash")
+        def hash(...): ...
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._started = []
+
+    def __enter__(self):
+        self._started.append(time.perf_counter())
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        SPAN_DURATION.labels(self.name).observe(time.perf_counter() - self._started.pop())
+        if exc_type is not None and not issubclass(exc_type, asyncio.CancelledError):
+            SPAN_ERRORS.labels(self.name).inc()
+        return False
+
+    async def __aenter__(self):
+        return self.__enter__()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return self.__exit__(exc_type, exc, tb)
+
+    def __call__(self, fn):
+        if asyncio.iscoroutinefunction(fn):
+            @wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with span(self.name):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(self.name):
+                return fn(*args, **kwargs)
+        return wrapper
+
+
+class MongoCommandListener(monitoring.CommandListener):
+    """Records every MongoDB command's server round-trip time"""
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        MONGO_COMMAND_DURATION.labels(event.command_name, "ok").observe(event.duration_micros / 1e6)
+
+    def failed(self, event):
+        MONGO_COMMAND_DURATION.labels(event.command_name, "error").observe(event.duration_micros / 1e6)
+
+
+def render_metrics():
+    """
+    :return: (body, content type) of the Prometheus exposition for this worker, or all workers in multiprocess mode
+    """
+    refresh_stats()
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST